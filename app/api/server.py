@@ -0,0 +1,242 @@
+"""
+HTTP query service.
+
+The embedding model, vector store and RAG pipeline are loaded once per
+process at startup and shared by every request, so replicas can be
+scaled behind a load balancer without per-user model copies.
+
+Every query, ingestion and source endpoint takes an optional
+``collection``; without it the default store is used. Collections are
+loaded on first use and unloaded least recently used first under
+``settings.COLLECTIONS_MEMORY_BUDGET_MB``.
+
+Run:
+    uvicorn app.api.server:app --host 0.0.0.0 --port 8000
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from langchain_core.documents import Document
+from pydantic import BaseModel
+
+from app.core.logging import get_logger, setup_logging
+from app.core.exceptions import ProjectReportAnalyzerError, VectorStoreError
+from app.core.metrics import metrics
+from app.core.resources import resources
+from app.ingestion.pipeline import SourceFile
+from app.api.service import QueryService
+
+logger = get_logger(__name__)
+
+
+class QueryRequest(BaseModel):
+    query: str
+    stream: bool = False
+    collection: Optional[str] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    # Model load and index mmap happen once, off the event loop
+    app.state.service = await asyncio.to_thread(QueryService)
+    logger.info("Query service started")
+    yield
+
+
+app = FastAPI(title="Project Report Analyzer", lifespan=lifespan)
+
+
+async def _service(
+    request: Request,
+    collection: Optional[str] = None,
+    create: bool = False,
+) -> QueryService:
+    if collection is None:
+        return request.app.state.service
+
+    # Loading a collection reads its index from disk
+    try:
+        return await asyncio.to_thread(
+            QueryService, collection=collection, create=create
+        )
+    except VectorStoreError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@app.exception_handler(ProjectReportAnalyzerError)
+async def _handle_app_error(request: Request, exc: ProjectReportAnalyzerError):
+    logger.error("Request failed | path=%s", request.url.path, exc_info=exc)
+    return JSONResponse(status_code=500, content={"detail": str(exc)})
+
+
+# ============================================================
+# Serialization
+# ============================================================
+
+def _document_json(doc: Document) -> Dict:
+    return {"content": doc.page_content, "metadata": doc.metadata}
+
+
+def _event_json(event: Dict) -> Dict:
+    for key in ("retrieved_docs", "context_docs"):
+        if key in event:
+            event = {**event, key: [_document_json(d) for d in event[key]]}
+    return event
+
+
+def _sse(event: Dict) -> str:
+    payload = json.dumps(_event_json(event), default=str)
+    return f"event: {event['type']}\ndata: {payload}\n\n"
+
+
+# ============================================================
+# Endpoints
+# ============================================================
+
+@app.get("/health")
+async def health(request: Request) -> Dict:
+    service = await _service(request)
+    return {
+        "status": "ok",
+        "ready": service.ready,
+        "sources": len(service.store.sources),
+        "index_version": service.store.version,
+        "collections_loaded": len(resources.collections().loaded()),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint() -> str:
+    return metrics.render()
+
+
+@app.get("/collections")
+async def list_collections() -> List[Dict]:
+    collections = resources.collections()
+    loaded = collections.loaded()
+    return [
+        {"name": name, "loaded": name in loaded, "memory_bytes": loaded.get(name, 0)}
+        for name in collections.names()
+    ]
+
+
+@app.delete("/collections/{name}")
+async def delete_collection(name: str) -> Dict:
+    try:
+        deleted = await asyncio.to_thread(resources.collections().delete, name)
+    except VectorStoreError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Collection not found: {name}")
+    return {"collection": name, "deleted": True}
+
+
+@app.get("/sources")
+async def list_sources(request: Request, collection: Optional[str] = None) -> List[str]:
+    service = await _service(request, collection)
+    await asyncio.to_thread(service.refresh)
+    return service.store.sources
+
+
+@app.delete("/sources/{source_name}")
+async def delete_source(
+    source_name: str,
+    request: Request,
+    collection: Optional[str] = None,
+) -> Dict:
+    service = await _service(request, collection)
+    try:
+        removed = await asyncio.to_thread(service.remove_source, source_name)
+    except VectorStoreError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+    return {"source": source_name, "removed_chunks": removed}
+
+
+@app.post("/query")
+async def query(body: QueryRequest, request: Request):
+    """
+    Answer a question. With ``stream`` the response is Server-Sent
+    Events: retrieval, token (repeated), citations and trace.
+    """
+
+    service = await _service(request, body.collection)
+    await asyncio.to_thread(service.refresh)
+
+    if not service.ready:
+        raise HTTPException(status_code=409, detail="No documents indexed")
+
+    if body.stream:
+        async def events() -> AsyncIterator[str]:
+            try:
+                async for event in service.pipeline.astream(body.query):
+                    yield _sse(event)
+            except ProjectReportAnalyzerError as exc:
+                logger.error("Streaming query failed", exc_info=True)
+                yield _sse({"type": "error", "detail": str(exc)})
+
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    result = await service.pipeline.arun(body.query)
+
+    payload = {
+        "query": result["query"],
+        "answer": result["answer"],
+        "citations": result["citations"],
+        "retrieval_mode": result["retrieval_mode"],
+        "source_filter": result["source_filter"],
+        "retrieved_docs": [_document_json(d) for d in result["retrieved_docs"]],
+        "trace": result["trace"],
+    }
+
+    # default=str: chunk metadata may hold values JSON cannot encode
+    return Response(
+        content=json.dumps(payload, default=str),
+        media_type="application/json",
+    )
+
+
+@app.post("/ingest")
+async def ingest(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    collection: Optional[str] = Query(None),
+) -> List[Dict]:
+    """
+    Parse, embed and index uploaded PDFs into the shared store, or into
+    ``collection`` (created if it does not exist yet).
+    """
+
+    service = await _service(request, collection, create=True)
+
+    # One read per upload; the spooled request files are closed right after
+    sources = []
+    for f in files:
+        try:
+            sources.append(SourceFile(name=f.filename, data=await f.read()))
+        finally:
+            await f.close()
+
+    results = await asyncio.to_thread(service.ingest, sources)
+
+    return [
+        {
+            "name": r.name,
+            "ok": r.ok,
+            "cached": r.cached,
+            "chunks": len(r.documents),
+            "seconds": round(r.seconds, 3),
+            "error": r.error,
+        }
+        for r in results
+    ]
@@ -0,0 +1,170 @@
+from typing import Callable, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.core.logging import get_logger
+from app.core.config import settings
+from app.core.resources import ResourceRegistry, resources
+from app.ingestion.cache import IngestionCache
+from app.ingestion.pdf_loader import PDFLoader
+from app.ingestion.pipeline import IngestionPipeline, IngestionResult, SourceFile
+
+logger = get_logger(__name__)
+
+
+class QueryService:
+    """
+    Query and ingestion operations over the process-wide resources.
+
+    Queries run concurrently; ingestion and removal are serialized and
+    persist the store, and other replicas pick the new index up on their
+    next query (``settings.VECTOR_STORE_AUTO_RELOAD``).
+
+    With ``collection`` the service works on that named collection
+    instead of the default store; ``create`` allows a new one.
+    """
+
+    def __init__(
+        self,
+        registry: ResourceRegistry = resources,
+        collection: Optional[str] = None,
+        create: bool = False,
+    ) -> None:
+        self._registry = registry
+        self.collection = collection
+        self._create = create
+        self.embedder = registry.embedder()
+        self.store = registry.store(collection, create=create)
+        self.pipeline = registry.pipeline(collection)
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.store.sources)
+
+    def refresh(self) -> bool:
+        return self._registry.refresh_store(collection=self.collection)
+
+    def _pin(self) -> None:
+        """
+        Fetch the store and pipeline again; call with the write lock held.
+
+        A named collection may have been unloaded since this service was
+        created (e.g. while uploads were read), and changes to that store
+        object would never be saved. While the lock is held the collection
+        stays loaded.
+        """
+
+        self.store = self._registry.store(self.collection, create=self._create)
+        self.pipeline = self._registry.pipeline(self.collection)
+
+    def ingest(
+        self,
+        files: List[SourceFile],
+        progress: Optional[Callable[[str, int, int], None]] = None,
+    ) -> List[IngestionResult]:
+        """
+        Ingest files into the shared store; a file whose name is already
+        indexed replaces the previous version.
+
+        Large PDFs are indexed page range by page range, so their first
+        chunks are searchable before the whole file is parsed;
+        ``progress(name, pages_done, total_pages)`` is called per range.
+        """
+
+        with self._registry.lock_for(self.collection):
+            self._pin()
+            self.refresh()
+
+            pipeline = IngestionPipeline(
+                self.embedder,
+                cache=IngestionCache() if settings.INGESTION_CACHE_ENABLED else None,
+            )
+
+            large = {f.name for f in files if pipeline.should_stream(f)}
+            results = {
+                r.name: r
+                for r in pipeline.run([f for f in files if f.name not in large])
+            }
+            succeeded = [r for r in results.values() if r.ok]
+
+            if succeeded:
+                for r in succeeded:
+                    if r.name in self.store.sources:
+                        self.store.remove_source(r.name)
+
+                self.store.add_documents(
+                    [doc for r in succeeded for doc in r.documents],
+                    embeddings=np.vstack([r.vectors for r in succeeded]),
+                )
+
+            for f in files:
+                if f.name in large:
+                    results[f.name] = self._ingest_streaming(pipeline, f, progress)
+
+            if any(r.ok for r in results.values()):
+                self._registry.save_store(self.collection, store=self.store)
+
+            return [results[f.name] for f in files]
+
+    def _ingest_streaming(
+        self,
+        pipeline: IngestionPipeline,
+        source_file: SourceFile,
+        progress: Optional[Callable[[str, int, int], None]],
+    ) -> IngestionResult:
+        name = source_file.name
+        total = IngestionResult(name=name)
+        total_pages = PDFLoader.page_count(source_file.data)
+
+        # The indexed version stays searchable until the new file's first
+        # range has parsed, and is put back if the new one fails later
+        replaced = name not in self.store.sources
+        previous = None
+
+        try:
+            for batch in pipeline.iter_ranges(source_file):
+                if not replaced:
+                    snapshot = self.store.export_source(name)
+                    self.store.remove_source(name)
+                    previous, replaced = snapshot, True
+
+                if batch.documents:
+                    self.store.add_documents(batch.documents, embeddings=batch.vectors)
+
+                total.documents.extend(batch.documents)
+                total.cached = batch.cached
+                for stage, seconds in batch.timings.items():
+                    total.timings[stage] = total.timings.get(stage, 0.0) + seconds
+
+                if progress is not None:
+                    progress(name, batch.pages[1] if batch.pages else total_pages, total_pages)
+
+        except Exception as exc:
+            logger.error("Streaming ingestion failed | file=%s", name, exc_info=True)
+            total.error = str(exc) or type(exc).__name__
+            # Do not leave a partially indexed report behind
+            if replaced and name in self.store.sources:
+                self.store.remove_source(name)
+            if previous is not None:
+                self._restore(name, *previous)
+
+        return total
+
+    def _restore(self, name: str, documents: List[Document], vectors: np.ndarray) -> None:
+        try:
+            self.store.add_documents(documents, embeddings=vectors)
+            logger.info("Previous version restored | file=%s | chunks=%d", name, len(documents))
+        except Exception:
+            logger.error("Restoring the previous version failed | file=%s", name, exc_info=True)
+
+    def remove_source(self, source_name: str) -> int:
+        with self._registry.lock_for(self.collection):
+            self._pin()
+            self.refresh()
+
+            removed = self.store.remove_source(source_name)
+            if removed:
+                self._registry.save_store(self.collection, store=self.store)
+
+            return removed
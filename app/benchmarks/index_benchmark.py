@@ -0,0 +1,235 @@
+"""
+Recall / latency benchmark for the FAISS index types used by FAISSStore.
+
+Every candidate index is compared with an exact flat index over the same
+vectors: recall@k is the overlap of the top-k ids, latency is measured
+per single-query search (the online serving pattern).
+
+Each index type is also checked through FAISSStore: after removing one
+source and adding another, every search hit must resolve to a surviving
+chunk.
+
+Usage:
+    python -m app.benchmarks.index_benchmark --vectors 200000 --queries 500
+    python -m app.benchmarks.index_benchmark --from-store vector_store --k 4
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+from app.vectorstore.faiss_store import FAISSStore, persisted_files
+from app.vectorstore.index_factory import INDEX_TYPES, configure_search, create_index, index_type_of
+from app.vectorstore.sharded_store import VectorOnlyEmbedder
+
+
+def synthetic_vectors(num_vectors: int, dim: int, seed: int = 0) -> np.ndarray:
+    """
+    Clustered, L2-normalized vectors that roughly mimic sentence
+    embeddings (uniform random data makes IVF look unrealistically bad).
+    """
+
+    rng = np.random.default_rng(seed)
+    num_clusters = max(1, num_vectors // 500)
+    centers = rng.standard_normal((num_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, num_clusters, num_vectors)
+
+    vectors = centers[labels] + 0.5 * rng.standard_normal((num_vectors, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    return np.ascontiguousarray(vectors, dtype=np.float32)
+
+
+def store_vectors(store_dir: str) -> np.ndarray:
+    """
+    Reconstruct the vectors of a persisted FAISSStore index.
+    """
+
+    files = persisted_files(Path(store_dir))
+    if files is None:
+        raise SystemExit(f"No saved FAISS index in {store_dir}")
+
+    index = faiss.read_index(str(files["index"]))
+    return np.ascontiguousarray(index.reconstruct_n(0, index.ntotal), dtype=np.float32)
+
+
+def make_queries(vectors: np.ndarray, num_queries: int, seed: int = 1) -> np.ndarray:
+    """
+    Perturbed corpus vectors, so queries land near real data.
+    """
+
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(vectors), num_queries)
+    queries = vectors[rows] + 0.1 * rng.standard_normal((num_queries, vectors.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    return np.ascontiguousarray(queries, dtype=np.float32)
+
+
+def measure(index: faiss.Index, queries: np.ndarray, k: int, truth: np.ndarray) -> Dict:
+    latencies = []
+    hits = 0
+
+    for i in range(len(queries)):
+        start = time.perf_counter()
+        _, ids = index.search(queries[i:i + 1], k)
+        latencies.append(time.perf_counter() - start)
+
+        hits += len(set(ids[0]) & set(truth[i]))
+
+    latencies_ms = np.array(latencies) * 1000
+
+    return {
+        f"recall@{k}": round(hits / (len(queries) * k), 4),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+    }
+
+
+def run(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    index_types: List[str],
+    nprobes: List[int],
+    ef_searches: List[int],
+) -> List[Dict]:
+    flat = faiss.IndexFlatL2(vectors.shape[1])
+    flat.add(vectors)
+    _, truth = flat.search(queries, k)
+
+    results = []
+
+    for index_type in index_types:
+        start = time.perf_counter()
+        index = create_index(vectors, index_type)
+        index.add(vectors)
+        build_s = time.perf_counter() - start
+
+        size_mb = faiss.serialize_index(index).nbytes / 2 ** 20
+
+        if index_type.startswith("ivf"):
+            sweep = [{"nprobe": n} for n in nprobes]
+        elif index_type == "hnsw":
+            sweep = [{"ef_search": ef} for ef in ef_searches]
+        else:
+            sweep = [{}]
+
+        for params in sweep:
+            configure_search(index, **params)
+            results.append(
+                {
+                    "index_type": index_type,
+                    "params": params,
+                    "build_s": round(build_s, 3),
+                    "size_mb": round(size_mb, 2),
+                    **measure(index, queries, k, truth),
+                }
+            )
+
+    return results
+
+
+def check_removal(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    index_type: str,
+    max_vectors: int = 20_000,
+) -> Dict:
+    """
+    Index two sources, remove one, add a third, then search: all hits
+    must come from the surviving sources and resolve to documents.
+    """
+
+    vectors = vectors[:max_vectors]
+    half = len(vectors) // 2
+    documents = [
+        Document(
+            page_content=f"chunk {i}",
+            metadata={"source": "A.pdf" if i < half else "B.pdf", "page": 1},
+        )
+        for i in range(len(vectors))
+    ]
+    added = [
+        Document(page_content=f"added {i}", metadata={"source": "C.pdf", "page": 1})
+        for i in range(min(100, half))
+    ]
+
+    store = FAISSStore(VectorOnlyEmbedder(), index_type=index_type)
+    result = {"index_type": index_type}
+
+    try:
+        store.build(documents, embeddings=vectors)
+        result["built_as"] = index_type_of(store._vectorstore.index)
+        store.remove_source("A.pdf")
+        store.add_documents(added, embeddings=vectors[:len(added)])
+
+        hits = store.batch_search_by_vector(queries, k)
+        sources = {doc.metadata["source"] for h in hits for doc in h.documents}
+        result["removal_ok"] = (
+            sources <= {"B.pdf", "C.pdf"}
+            and all(len(h.documents) == k for h in hits)
+        )
+    except Exception as exc:
+        result.update(removal_ok=False, error=f"{type(exc).__name__}: {exc}")
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--from-store", help="Benchmark vectors of a persisted store directory")
+    parser.add_argument("--vectors", type=int, default=100_000, help="Synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic vector dimension")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", default=list(INDEX_TYPES), choices=INDEX_TYPES)
+    parser.add_argument("--nprobe", nargs="+", type=int, default=[4, 16, 64])
+    parser.add_argument("--ef-search", nargs="+", type=int, default=[32, 64, 128])
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    args = parser.parse_args()
+
+    if args.from_store:
+        vectors = store_vectors(args.from_store)
+    else:
+        vectors = synthetic_vectors(args.vectors, args.dim)
+
+    queries = make_queries(vectors, args.queries)
+
+    print(f"Vectors: {len(vectors)} x {vectors.shape[1]} | queries: {len(queries)} | k: {args.k}")
+
+    results = run(vectors, queries, args.k, args.types, args.nprobe, args.ef_search)
+
+    print(f"\n{'index':<10} {'params':<18} {'build_s':>8} {'size_mb':>8} {'recall':>8} {'p50_ms':>8} {'p99_ms':>8}")
+    for r in results:
+        params = ",".join(f"{key}={value}" for key, value in r["params"].items()) or "-"
+        print(
+            f"{r['index_type']:<10} {params:<18} {r['build_s']:>8} {r['size_mb']:>8} "
+            f"{r[f'recall@{args.k}']:>8} {r['p50_ms']:>8} {r['p99_ms']:>8}"
+        )
+
+    checks = [check_removal(vectors, queries, args.k, t) for t in args.types]
+
+    print("\nRemove-then-search check")
+    for c in checks:
+        status = "ok" if c["removal_ok"] else f"FAILED {c.get('error', '')}"
+        print(f"{c['index_type']:<10} built as {c.get('built_as', '-'):<10} {status}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"results": results, "removal_checks": checks}, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if not all(c["removal_ok"] for c in checks):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+"""
+End-to-end throughput / latency benchmark over the bundled PDF corpus.
+
+Runs the PDFs in data/raw_pdfs through ingestion (parse, classify, chunk,
+embed), index build, retrieval and generation. Generation talks to a
+local stub LLM server (app.benchmarks.stub_llm), so runs need no network
+and measure the pipeline rather than a model. Caches are disabled so
+every run does the full work.
+
+Usage:
+    python -m app.benchmarks.pipeline_benchmark --output bench.json
+    python -m app.benchmarks.pipeline_benchmark --baseline bench.json --repeat 5
+"""
+
+import argparse
+import io
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pdfplumber
+
+from app.benchmarks.stub_llm import StubLLMServer
+from app.core.config import settings
+from app.embeddings.embedder import Embedder
+from app.ingestion.pipeline import IngestionPipeline, SourceFile
+from app.rag.rag_pipeline import RAGPipeline
+from app.vectorstore.faiss_store import FAISSStore
+from app.vectorstore.index_factory import index_type_of
+
+DEFAULT_PDF_DIR = Path(__file__).resolve().parents[2] / "data" / "raw_pdfs"
+
+DEFAULT_QUERIES = [
+    "What is the total project budget of the Freeport petroleum refinery?",
+    "When is construction of the Racine coal generating station expected to complete?",
+    "Who is the owner of the Xianyang polysilicon manufacturing plant?",
+    "What is the capacity of the Racine generating station?",
+    "Compare the timelines of the refinery and the polysilicon plant.",
+    "Which contractors are involved across the projects?",
+    "What are the deliverables of the technical assessment?",
+    "Summarize the current status of each project.",
+]
+
+# Metrics where a higher value is better; everything else is lower-is-better
+HIGHER_IS_BETTER = {"pages_per_s", "chunks_per_s"}
+
+
+def latency_summary(seconds: List[float]) -> Dict:
+    ms = np.array(seconds) * 1000
+    return {
+        "count": len(ms),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+    }
+
+
+def peak_rss_mb() -> Dict:
+    """
+    Peak resident set size of this process and of reaped children
+    (the ingestion worker pool). Not available on Windows.
+    """
+
+    try:
+        import resource
+    except ImportError:
+        return {"self": None, "children": None}
+
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 2 ** 20 if sys.platform == "darwin" else 2 ** 10
+
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def load_corpus(pdf_dir: Path) -> List[SourceFile]:
+    paths = sorted(pdf_dir.glob("*.pdf"))
+    if not paths:
+        raise SystemExit(f"No PDFs found in {pdf_dir}")
+    return [SourceFile(name=p.name, data=p.read_bytes()) for p in paths]
+
+
+def count_pages(files: List[SourceFile]) -> int:
+    total = 0
+    for f in files:
+        with pdfplumber.open(io.BytesIO(f.data)) as pdf:
+            total += len(pdf.pages)
+    return total
+
+
+def time_queries(fn: Callable[[str], object], queries: List[str], repeat: int) -> List[float]:
+    latencies = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            fn(query)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def run(
+    pdf_dir: Path,
+    queries: List[str],
+    repeat: int,
+    workers: int,
+    index_type: str,
+    stub_tokens: int,
+    stub_token_delay_s: float,
+) -> Dict:
+    files = load_corpus(pdf_dir)
+    pages = count_pages(files)
+    print(f"Corpus: {len(files)} files | {pages} pages | {sum(len(f.data) for f in files) / 2 ** 20:.1f} MB")
+
+    # Embedding model load, kept out of the throughput numbers.
+    # No query cache: repeated queries must pay for their embedding.
+    start = time.perf_counter()
+    embedder = Embedder(query_cache_size=0)
+    model_load_s = time.perf_counter() - start
+
+    # Ingestion: parse, classify, chunk, embed
+    start = time.perf_counter()
+    results = IngestionPipeline(embedder, max_workers=workers, cache=None).run(files)
+    ingest_s = time.perf_counter() - start
+
+    failed = [r.name for r in results if not r.ok]
+    if failed:
+        raise SystemExit(f"Ingestion failed for: {', '.join(failed)}")
+
+    documents = [doc for r in results for doc in r.documents]
+    vectors = np.vstack([r.vectors for r in results])
+    stage_s = {
+        stage: round(sum(r.timings.get(stage, 0.0) for r in results), 3)
+        for stage in ("parse", "classify", "chunk", "embed")
+    }
+
+    # Index build
+    store = FAISSStore(embedder, index_type=index_type)
+    start = time.perf_counter()
+    store.build(documents, embeddings=vectors)
+    index_build_s = time.perf_counter() - start
+
+    # Retrieval, per mode
+    retrieval = {
+        mode: latency_summary(time_queries(fn, queries, repeat))
+        for mode, fn in (
+            ("similarity", store.similarity_search),
+            ("hybrid", store.hybrid_search),
+            ("mmr", store.mmr_search),
+        )
+    }
+
+    # End-to-end RAG against the stub LLM, answer cache off
+    with StubLLMServer(num_tokens=stub_tokens, token_delay_s=stub_token_delay_s) as stub:
+        settings.LMSTUDIO_API_BASE = stub.url
+        settings.ANSWER_CACHE_SIZE = 0
+        pipeline = RAGPipeline(store)
+
+        ttft = []
+
+        def ask(query: str) -> None:
+            ttft.append(pipeline.run(query)["trace"]["ttft_s"])
+
+        rag = latency_summary(time_queries(ask, queries, repeat))
+        rag["ttft"] = latency_summary(ttft)
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "embedding_model": embedder.model_name,
+            # The requested type may still be a flat stand-in
+            "index_type": index_type_of(store._vectorstore.index),
+            "retrieval_mode": settings.RETRIEVAL_MODE,
+            "ingestion_workers": workers,
+            "stub_tokens": stub_tokens,
+            "stub_token_delay_ms": stub_token_delay_s * 1000,
+            "queries": len(queries),
+            "repeat": repeat,
+        },
+        "corpus": {
+            "files": len(files),
+            "pages": pages,
+            "chunks": len(documents),
+            "megabytes": round(sum(len(f.data) for f in files) / 2 ** 20, 2),
+        },
+        "ingestion": {
+            "model_load_s": round(model_load_s, 3),
+            "wall_s": round(ingest_s, 3),
+            "pages_per_s": round(pages / ingest_s, 2),
+            "chunks_per_s": round(len(documents) / ingest_s, 2),
+            "stage_s": stage_s,
+        },
+        "index": {
+            "build_s": round(index_build_s, 3),
+            "vectors": int(len(vectors)),
+        },
+        "retrieval": retrieval,
+        "rag": rag,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Return the metrics that regressed by more than ``tolerance`` (a
+    fraction) relative to ``baseline``.
+    """
+
+    current_flat = flatten({k: current[k] for k in ("ingestion", "index", "retrieval", "rag")})
+    baseline_flat = flatten({k: baseline.get(k, {}) for k in ("ingestion", "index", "retrieval", "rag")})
+
+    regressions = []
+    print(f"\n{'metric':<34} {'baseline':>10} {'current':>10} {'change':>8}")
+
+    for name, value in current_flat.items():
+        base = baseline_flat.get(name)
+        if not base or name.endswith("count"):
+            continue
+
+        change = (value - base) / base
+        worse = -change if name.rsplit(".", 1)[-1] in HIGHER_IS_BETTER else change
+        flag = "  !" if worse > tolerance else ""
+        if flag:
+            regressions.append(name)
+
+        print(f"{name:<34} {base:>10} {value:>10} {change:>+8.1%}{flag}")
+
+    return regressions
+
+
+def report(results: Dict) -> None:
+    ingestion = results["ingestion"]
+    print(
+        f"\nIngestion: {ingestion['wall_s']} s | {ingestion['pages_per_s']} pages/s | "
+        f"{ingestion['chunks_per_s']} chunks/s | stages {ingestion['stage_s']}"
+    )
+    print(f"Index build: {results['index']['build_s']} s ({results['index']['vectors']} vectors)")
+
+    print(f"\n{'query path':<14} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}")
+    rows = {**results["retrieval"], "rag": results["rag"], "rag ttft": results["rag"]["ttft"]}
+    for name, r in rows.items():
+        print(f"{name:<14} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}")
+
+    rss = results["peak_rss_mb"]
+    print(f"\nPeak RSS: {rss['self']} MB (workers: {rss['children']} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pdf-dir", type=Path, default=DEFAULT_PDF_DIR)
+    parser.add_argument("--queries", type=Path, help="Text file with one query per line")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the query set")
+    parser.add_argument("--workers", type=int, default=settings.INGESTION_MAX_WORKERS)
+    parser.add_argument("--index-type", default=settings.FAISS_INDEX_TYPE)
+    parser.add_argument("--stub-tokens", type=int, default=64)
+    parser.add_argument("--stub-token-delay-ms", type=float, default=0.0)
+    parser.add_argument("--output", help="Write results as JSON to this path")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Relative slowdown reported as a regression (default 0.10)",
+    )
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        queries = [q.strip() for q in args.queries.read_text().splitlines() if q.strip()]
+
+    results = run(
+        pdf_dir=args.pdf_dir,
+        queries=queries,
+        repeat=args.repeat,
+        workers=args.workers,
+        index_type=args.index_type,
+        stub_tokens=args.stub_tokens,
+        stub_token_delay_s=args.stub_token_delay_ms / 1000,
+    )
+
+    report(results)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
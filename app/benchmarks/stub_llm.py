@@ -0,0 +1,189 @@
+"""
+Local OpenAI-compatible chat server with a fixed, deterministic answer.
+
+Lets benchmarks exercise the full generation path (HTTP, SSE streaming,
+token handling) without network access or a model. Token count and
+per-token delay are configurable so generation cost can be modelled.
+
+Usage:
+    python -m app.benchmarks.stub_llm --port 8089 --tokens 64 --token-delay-ms 5
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+
+class StubLLMServer:
+    """
+    Serves ``/v1/chat/completions`` (streaming and non-streaming) and
+    ``/v1/models`` from a daemon thread.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        num_tokens: int = 64,
+        token_delay_s: float = 0.0,
+        model: str = "stub-llm",
+    ) -> None:
+        self.num_tokens = num_tokens
+        self.token_delay_s = token_delay_s
+        self.model = model
+        self.requests = 0
+
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def tokens(self) -> List[str]:
+        return [f"token{i} " for i in range(self.num_tokens)]
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="stub-llm",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path.rstrip("/") != "/v1/models":
+                    self.send_error(404)
+                    return
+                self._send_json({"object": "list", "data": [{"id": stub.model, "object": "model"}]})
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self.send_error(404)
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests += 1
+
+                if body.get("stream"):
+                    self._stream()
+                else:
+                    time.sleep(stub.token_delay_s * stub.num_tokens)
+                    self._send_json(self._completion("".join(stub.tokens())))
+
+            def _stream(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+                deltas = [{"role": "assistant", "content": ""}]
+                deltas += [{"content": token} for token in stub.tokens()]
+
+                for i, delta in enumerate(deltas):
+                    if i and stub.token_delay_s:
+                        time.sleep(stub.token_delay_s)
+                    self._event(self._chunk(completion_id, delta, None))
+
+                self._event(self._chunk(completion_id, {}, "stop"))
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+            def _event(self, payload: dict) -> None:
+                self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            def _chunk(self, completion_id: str, delta: dict, finish_reason):
+                return {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": stub.model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }
+
+            def _completion(self, content: str) -> dict:
+                return {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": stub.model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 0,
+                        "completion_tokens": stub.num_tokens,
+                        "total_tokens": stub.num_tokens,
+                    },
+                }
+
+            def _send_json(self, payload: dict) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--tokens", type=int, default=64)
+    parser.add_argument("--token-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubLLMServer(
+        host=args.host,
+        port=args.port,
+        num_tokens=args.tokens,
+        token_delay_s=args.token_delay_ms / 1000,
+    ).start()
+
+    print(f"Stub LLM serving at {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
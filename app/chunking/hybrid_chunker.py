@@ -20,6 +20,8 @@ class HybridChunker:
         chunk_size: int = 900,
         chunk_overlap: int = 150,
     ) -> None:
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
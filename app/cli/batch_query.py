@@ -0,0 +1,210 @@
+"""
+Headless batch querying over a persisted vector store.
+
+Reads questions from a JSONL file (one object per line with a "query" or
+"question" field and an optional "id"), runs RAGPipeline over them with
+bounded concurrency and writes one JSON result per line as soon as each
+question finishes: answer, citations, retrieval mode, per-stage trace,
+wall time and error (if any). Logs go to stderr so the output can be
+piped.
+
+Usage:
+    python -m app.cli.batch_query questions.jsonl -o answers.jsonl --concurrency 8
+    python -m app.cli.batch_query questions.jsonl --store vector_store --no-answer-cache
+    python -m app.cli.batch_query questions.jsonl --collection portfolio-a
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, Set, TextIO
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.exceptions import VectorStoreError
+from app.core.logging import get_logger, setup_logging
+from app.core.resources import resources
+from app.rag.rag_pipeline import RAGPipeline
+
+logger = get_logger(__name__)
+
+
+def read_questions(path: Path) -> Iterator[Dict]:
+    """
+    Yield {"id", "line", "query"} per non-empty input line.
+
+    Malformed lines are yielded with an "error" instead of a query so
+    they show up in the output rather than aborting the run.
+    """
+
+    with path.open("r", encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+                query = record.get("query") or record.get("question")
+                if not query:
+                    raise ValueError("missing 'query' field")
+            except (ValueError, AttributeError) as exc:
+                yield {"id": line_no, "line": line_no, "error": f"invalid input: {exc}"}
+                continue
+
+            yield {"id": record.get("id", line_no), "line": line_no, "query": query}
+
+
+def answer(pipeline: RAGPipeline, question: Dict) -> Dict:
+    """
+    Run one question, capturing failures in the result.
+    """
+
+    row = {
+        "id": question["id"],
+        "line": question["line"],
+        "query": question.get("query"),
+    }
+
+    if "error" in question:
+        return {**row, "error": question["error"]}
+
+    start = time.perf_counter()
+    try:
+        result = pipeline.run(question["query"])
+        row.update(
+            answer=result["answer"],
+            citations=result["citations"],
+            retrieval_mode=result["retrieval_mode"],
+            source_filter=result["source_filter"],
+            trace=result["trace"],
+            error=None,
+        )
+    except Exception as exc:
+        logger.error("Question failed | id=%s", question["id"], exc_info=True)
+        row["error"] = f"{type(exc).__name__}: {exc}"
+
+    row["seconds"] = round(time.perf_counter() - start, 4)
+    return row
+
+
+def run_batch(
+    pipeline: RAGPipeline,
+    questions: Iterator[Dict],
+    out: TextIO,
+    concurrency: int,
+) -> Dict:
+    """
+    Answer questions with at most ``concurrency`` in flight and stream
+    results to ``out`` in completion order.
+
+    Questions are pulled lazily, so memory stays bounded for large files.
+    """
+
+    latencies = []
+    failed = 0
+    in_flight: Set[Future] = set()
+
+    def drain(block_until: str) -> None:
+        nonlocal failed, in_flight
+        done, in_flight = wait(in_flight, return_when=block_until)
+        for future in done:
+            row = future.result()
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+            out.flush()
+            if row.get("error"):
+                failed += 1
+            else:
+                latencies.append(row["seconds"])
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch-query") as pool:
+        for question in questions:
+            if len(in_flight) >= concurrency:
+                drain(FIRST_COMPLETED)
+            in_flight.add(pool.submit(answer, pipeline, question))
+
+        while in_flight:
+            drain(FIRST_COMPLETED)
+
+    wall_s = time.perf_counter() - start
+    total = len(latencies) + failed
+
+    summary = {
+        "questions": total,
+        "failed": failed,
+        "wall_s": round(wall_s, 3),
+        "questions_per_s": round(total / wall_s, 3) if wall_s else None,
+    }
+    if latencies:
+        ms = np.array(latencies) * 1000
+        summary.update(
+            p50_ms=round(float(np.percentile(ms, 50)), 1),
+            p95_ms=round(float(np.percentile(ms, 95)), 1),
+            p99_ms=round(float(np.percentile(ms, 99)), 1),
+        )
+
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("questions", type=Path, help="JSONL file of questions")
+    parser.add_argument("-o", "--output", type=Path, help="JSONL output path (default: stdout)")
+    parser.add_argument("--store", default=settings.VECTOR_STORE_DIR, help="Persisted vector store directory")
+    parser.add_argument("--collection", help="Named collection to query instead of the store")
+    parser.add_argument("--concurrency", type=int, default=4, help="Questions in flight at once")
+    parser.add_argument(
+        "--no-answer-cache",
+        action="store_true",
+        help="Always query the LLM, even for repeated questions",
+    )
+    parser.add_argument("--log-level", default="INFO")
+    args = parser.parse_args()
+
+    setup_logging(level=getattr(logging, args.log_level.upper()), stream=sys.stderr)
+
+    settings.VECTOR_STORE_DIR = args.store
+    if args.no_answer_cache:
+        settings.ANSWER_CACHE_SIZE = 0
+
+    try:
+        store = resources.store(args.collection)
+    except VectorStoreError as exc:
+        raise SystemExit(str(exc)) from exc
+    if not store.sources:
+        raise SystemExit(f"No indexed documents found in {store.path}")
+    pipeline = resources.pipeline(args.collection)
+
+    logger.info(
+        "Batch query started | questions=%s | concurrency=%d | sources=%d",
+        args.questions,
+        args.concurrency,
+        len(store.sources),
+    )
+
+    out = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        summary = run_batch(
+            pipeline,
+            read_questions(args.questions),
+            out,
+            max(1, args.concurrency),
+        )
+    finally:
+        if args.output:
+            out.close()
+
+    logger.info("Batch query completed | %s", json.dumps(summary))
+
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
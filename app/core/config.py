@@ -22,6 +22,10 @@ class Settings:
         "EMBEDDING_MODEL_NAME",
         "sentence-transformers/all-MiniLM-L6-v2"
     )
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+    QUERY_EMBEDDING_CACHE_SIZE: int = int(
+        os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024")
+    )
     # LLM (LM Studio / OpenAI-compatible)
     LMSTUDIO_API_KEY: str = os.getenv("LMSTUDIO_API_KEY", "lm-studio")
     LMSTUDIO_API_BASE: str = os.getenv("LMSTUDIO_API_BASE",
@@ -32,8 +36,120 @@ class Settings:
 )
 
 
+    # Chunks retrieved per query; the context packer keeps what fits the prompt
+    RETRIEVAL_K: int = int(os.getenv("RETRIEVAL_K", "8"))
+    # Candidates MMR diversifies over for comparative queries
+    MMR_FETCH_K: int = int(os.getenv("MMR_FETCH_K", "200"))
+
+    # Optional cross-encoder reranking of RERANK_CANDIDATES retrieved chunks
+    RERANK_ENABLED: bool = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_MODEL: str = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_CANDIDATES: int = int(os.getenv("RERANK_CANDIDATES", "30"))
+    RERANK_TIME_BUDGET_MS: int = int(os.getenv("RERANK_TIME_BUDGET_MS", "300"))
+    RERANK_BATCH_SIZE: int = int(os.getenv("RERANK_BATCH_SIZE", "32"))
+    RERANK_CACHE_SIZE: int = int(os.getenv("RERANK_CACHE_SIZE", "20000"))
+
+    # Prompt context packing (token budget = window - answer - template)
+    LLM_CONTEXT_WINDOW: int = int(os.getenv("LLM_CONTEXT_WINDOW", "4096"))
+    LLM_MAX_ANSWER_TOKENS: int = int(os.getenv("LLM_MAX_ANSWER_TOKENS", "512"))
+    # Hugging Face tokenizer of the LLM; empty = estimate ~4 characters per token
+    LLM_TOKENIZER: str = os.getenv("LLM_TOKENIZER", "")
+    # Extra share added to estimated counts; tokenizers often beat 4 chars/token
+    LLM_TOKEN_ESTIMATE_MARGIN: float = float(os.getenv("LLM_TOKEN_ESTIMATE_MARGIN", "0.2"))
+    # LLM calls in flight at once in RAGPipeline.run_batch
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    CONTEXT_MAX_TABLE_TOKENS: int = int(os.getenv("CONTEXT_MAX_TABLE_TOKENS", "512"))
+    CONTEXT_DEDUP_THRESHOLD: float = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.8"))
+
+    # Retrieval: "hybrid" fuses BM25 keyword and vector rankings, "dense" is vector-only
+    RETRIEVAL_MODE: str = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+    # Restrict retrieval to reports named in the question
+    AUTO_SOURCE_FILTER: bool = (
+        os.getenv("AUTO_SOURCE_FILTER", "true").lower() == "true"
+    )
+
+    # Answer cache (size 0 disables it)
+    ANSWER_CACHE_SIZE: int = int(os.getenv("ANSWER_CACHE_SIZE", "256"))
+    ANSWER_CACHE_SEMANTIC: bool = (
+        os.getenv("ANSWER_CACHE_SEMANTIC", "false").lower() == "true"
+    )
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = float(
+        os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", "0.95")
+    )
+
     # Vector Store
     VECTOR_STORE_DIR: str = os.getenv("VECTOR_STORE_DIR", "vector_store")
+    VECTOR_STORE_MMAP: bool = (
+        os.getenv("VECTOR_STORE_MMAP", "true").lower() == "true"
+    )
+    # Only needed once to read stores saved in the old index.pkl format
+    VECTOR_STORE_ALLOW_PICKLE: bool = (
+        os.getenv("VECTOR_STORE_ALLOW_PICKLE", "false").lower() == "true"
+    )
+
+    # FAISS index type: flat | ivf_flat | hnsw | ivf_pq
+    FAISS_INDEX_TYPE: str = os.getenv("FAISS_INDEX_TYPE", "flat")
+    FAISS_NLIST: int = int(os.getenv("FAISS_NLIST", "0"))  # 0 = auto
+    FAISS_NPROBE: int = int(os.getenv("FAISS_NPROBE", "16"))
+    FAISS_HNSW_M: int = int(os.getenv("FAISS_HNSW_M", "32"))
+    FAISS_EF_CONSTRUCTION: int = int(os.getenv("FAISS_EF_CONSTRUCTION", "200"))
+    FAISS_EF_SEARCH: int = int(os.getenv("FAISS_EF_SEARCH", "64"))
+    FAISS_PQ_M: int = int(os.getenv("FAISS_PQ_M", "48"))
+    FAISS_PQ_NBITS: int = int(os.getenv("FAISS_PQ_NBITS", "8"))
+    FAISS_TRAIN_SAMPLE_SIZE: int = int(os.getenv("FAISS_TRAIN_SAMPLE_SIZE", "50000"))
+
+    # Ingestion cache
+    INGESTION_CACHE_ENABLED: bool = (
+        os.getenv("INGESTION_CACHE_ENABLED", "true").lower() == "true"
+    )
+    INGESTION_CACHE_DIR: str = os.getenv("INGESTION_CACHE_DIR", "ingestion_cache")
+    # Disk size bound; least recently used entries go first (0 = unbounded)
+    INGESTION_CACHE_MAX_MB: int = int(os.getenv("INGESTION_CACHE_MAX_MB", "2048"))
+
+    # Parallel ingestion (1 = parse files sequentially in-process)
+    INGESTION_MAX_WORKERS: int = int(os.getenv("INGESTION_MAX_WORKERS", "4"))
+    # Where uploads are spooled for parse workers; empty = system temp dir
+    # (/dev/shm keeps them in memory)
+    INGESTION_SPOOL_DIR: str = os.getenv("INGESTION_SPOOL_DIR", "")
+    # PDFs with at least this many pages are parsed in page ranges and
+    # indexed range by range, bounding memory and showing progress
+    INGESTION_STREAM_MIN_PAGES: int = int(os.getenv("INGESTION_STREAM_MIN_PAGES", "100"))
+    INGESTION_PAGES_PER_RANGE: int = int(os.getenv("INGESTION_PAGES_PER_RANGE", "25"))
+
+    # Prometheus-style /metrics endpoint (0 = disabled)
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "0"))
+
+    # Query service; when API_BASE_URL is set the Streamlit UI is a thin client of it
+    API_BASE_URL: str = os.getenv("API_BASE_URL", "")
+    # Reload the persisted index when another replica has saved a newer one
+    VECTOR_STORE_AUTO_RELOAD: bool = (
+        os.getenv("VECTOR_STORE_AUTO_RELOAD", "true").lower() == "true"
+    )
+
+    # Named collections, each persisted in COLLECTIONS_DIR/<name>
+    # ("" = VECTOR_STORE_DIR/collections); least recently used ones are
+    # unloaded once the loaded indexes exceed the budget
+    COLLECTIONS_DIR: str = os.getenv("COLLECTIONS_DIR", "")
+    COLLECTIONS_MEMORY_BUDGET_MB: int = int(
+        os.getenv("COLLECTIONS_MEMORY_BUDGET_MB", "2048")
+    )
+
+    # Sharded default store: chunks partitioned by source over SHARD_COUNT local
+    # worker processes (persisted in SHARD_DIR/shard-<i>, "" =
+    # VECTOR_STORE_DIR/shards), or over remote shard servers listed in
+    # SHARD_ADDRESSES as comma-separated host:port
+    SHARD_ENABLED: bool = (
+        os.getenv("SHARD_ENABLED", "false").lower() == "true"
+    )
+    SHARD_COUNT: int = int(os.getenv("SHARD_COUNT", "4"))
+    SHARD_DIR: str = os.getenv("SHARD_DIR", "")
+    SHARD_ADDRESSES: str = os.getenv("SHARD_ADDRESSES", "")
+    # Shared secret for shard servers; required, requests are unpickled
+    SHARD_AUTHKEY: str = os.getenv("SHARD_AUTHKEY", "")
+    SHARD_THREADS: int = int(os.getenv("SHARD_THREADS", "4"))
+    # Longest wait for shard replies to a search, and to a change, load or save
+    SHARD_TIMEOUT_S: float = float(os.getenv("SHARD_TIMEOUT_S", "30"))
+    SHARD_WRITE_TIMEOUT_S: float = float(os.getenv("SHARD_WRITE_TIMEOUT_S", "600"))
 
     @property
     def is_production(self) -> bool:
@@ -0,0 +1,231 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, Optional, Tuple
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+
+SIZE_BUCKETS = (
+    1, 2, 5, 10, 20, 50, 100, 200, 500,
+    1_000, 5_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels.
+    """
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return "\n".join(lines)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with optional labels, Prometheus style.
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        # label key -> (per-bucket counts incl. +Inf, sum, count)
+        self._series: Dict[LabelKey, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][slot] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels(key, ('le', le))} {cumulative}"
+                    )
+                lines.append(f"{self.name}_sum{_format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return "\n".join(lines)
+
+
+class MetricsRegistry:
+    """
+    Process-wide collection of counters and histograms.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Counter(name, help_text)
+            return self._metrics[name]
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        with self._lock:
+            if name not in self._metrics:
+                self._metrics[name] = Histogram(name, help_text, buckets)
+            return self._metrics[name]
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format.
+        """
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+# Singleton registry
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "rag_stage_seconds",
+    "Duration of ingestion and query pipeline stages in seconds.",
+)
+STAGE_SIZE = metrics.histogram(
+    "rag_stage_size",
+    "Item counts and sizes processed by pipeline stages.",
+    SIZE_BUCKETS,
+)
+EVENTS = metrics.counter(
+    "rag_events_total",
+    "Pipeline events such as cache hits and failures.",
+)
+INGEST_BYTES = metrics.counter(
+    "rag_ingest_bytes_total",
+    "Bytes of uploaded PDFs ingested.",
+)
+
+
+def observe_seconds(stage: str, seconds: float, trace: Optional[Dict] = None) -> None:
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    if trace is not None:
+        trace[f"{stage}_s"] = round(seconds, 6)
+
+
+def observe_size(stage: str, unit: str, value: float, trace: Optional[Dict] = None) -> None:
+    STAGE_SIZE.observe(value, stage=stage, unit=unit)
+    if trace is not None:
+        trace[f"{stage}_{unit}"] = value
+
+
+@contextmanager
+def timed(stage: str, trace: Optional[Dict] = None) -> Iterator[None]:
+    """
+    Time a block into ``rag_stage_seconds`` and, optionally, a trace dict
+    under ``<stage>_s``.
+    """
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_seconds(stage, time.perf_counter() - start, trace)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+
+        body = metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0") -> None:
+    """
+    Serve ``/metrics`` from a daemon thread. Safe to call repeatedly
+    (e.g. on every Streamlit rerun); only the first call starts a server.
+    """
+
+    global _server
+
+    with _server_lock:
+        if _server is not None:
+            return
+
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        threading.Thread(
+            target=_server.serve_forever,
+            name="metrics-server",
+            daemon=True,
+        ).start()
+
+    logger.info("Metrics endpoint started | port=%d", port)
@@ -0,0 +1,227 @@
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from langchain_openai import ChatOpenAI
+
+from app.core.logging import get_logger
+from app.core.config import settings
+from app.core.exceptions import VectorStoreError
+from app.embeddings.embedder import Embedder
+from app.rag.context_packer import ContextPacker
+from app.rag.rag_pipeline import RAGPipeline
+from app.rag.reranker import CrossEncoderReranker
+from app.vectorstore.faiss_store import FAISSStore
+from app.vectorstore.registry import CollectionRegistry, persisted_mtime
+from app.vectorstore.sharded_store import ShardedStore
+
+logger = get_logger(__name__)
+
+
+class ResourceRegistry:
+    """
+    Process-wide embedding model, LLM client, reranker, context packer,
+    vector store and RAG pipeline.
+
+    Each resource is created on first use and then shared by every caller
+    (Streamlit sessions, API requests), so the SentenceTransformer weights
+    and the persisted index are loaded once per process instead of once
+    per user. The store and pipeline are thread-safe; ``write_lock``
+    serializes multi-step changes (ingest or remove, then save).
+
+    Passing ``collection`` selects a named store from ``collections()``
+    instead of the default one in ``settings.VECTOR_STORE_DIR``; all
+    collections share the embedding model, LLM client, reranker and
+    context packer (with its tokenizer).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._embedder: Optional[Embedder] = None
+        self._llm: Optional[ChatOpenAI] = None
+        self._reranker: Optional[CrossEncoderReranker] = None
+        self._context_packer: Optional[ContextPacker] = None
+        self._store: Optional[FAISSStore | ShardedStore] = None
+        self._pipeline: Optional[RAGPipeline] = None
+        self._index_mtime: Optional[int] = None
+        self._collections: Optional[CollectionRegistry] = None
+        self._collection_pipelines: Dict[str, RAGPipeline] = {}
+        self.write_lock = threading.Lock()
+
+    def embedder(self) -> Embedder:
+        with self._lock:
+            if self._embedder is None:
+                self._embedder = Embedder()
+            return self._embedder
+
+    def llm(self) -> ChatOpenAI:
+        with self._lock:
+            if self._llm is None:
+                # LM Studio (OpenAI-compatible, streaming enabled)
+                self._llm = ChatOpenAI(
+                    model=settings.LMSTUDIO_MODEL,
+                    temperature=0,
+                    base_url=settings.LMSTUDIO_API_BASE.strip(),
+                    api_key=settings.LMSTUDIO_API_KEY,
+                    max_tokens=settings.LLM_MAX_ANSWER_TOKENS,
+                    streaming=True,
+                )
+            return self._llm
+
+    def reranker(self) -> Optional[CrossEncoderReranker]:
+        if not settings.RERANK_ENABLED:
+            return None
+        with self._lock:
+            if self._reranker is None:
+                self._reranker = CrossEncoderReranker()
+            return self._reranker
+
+    def context_packer(self) -> ContextPacker:
+        with self._lock:
+            if self._context_packer is None:
+                self._context_packer = ContextPacker()
+            return self._context_packer
+
+    def collections(self) -> CollectionRegistry:
+        with self._lock:
+            if self._collections is None:
+                self._collections = CollectionRegistry(self.embedder)
+                # An unloaded collection's pipeline would keep its index alive
+                self._collections.on_evict(
+                    lambda name: self._collection_pipelines.pop(name, None)
+                )
+            return self._collections
+
+    def store(
+        self,
+        collection: Optional[str] = None,
+        create: bool = False,
+    ) -> FAISSStore | ShardedStore:
+        """
+        The store persisted in ``settings.VECTOR_STORE_DIR``, loaded on
+        first use (empty if nothing has been saved yet), or the named
+        collection (see ``CollectionRegistry.get``).
+
+        With ``settings.SHARD_ENABLED`` the default store is a
+        ``ShardedStore``; its shards load their own persisted indexes.
+        """
+
+        if collection is not None:
+            return self.collections().get(collection, create=create)
+
+        with self._lock:
+            if self._store is None and settings.SHARD_ENABLED:
+                self._store = ShardedStore(self.embedder())
+            if self._store is None:
+                self._store = FAISSStore(self.embedder())
+                self.refresh_store(force=True)
+            return self._store
+
+    def pipeline(self, collection: Optional[str] = None) -> RAGPipeline:
+        if collection is not None:
+            # Loads outside self._lock so other collections are not blocked
+            store = self.collections().get(collection)
+            with self._lock:
+                pipeline = self._collection_pipelines.get(collection)
+                # A collection reloaded after eviction is a new store
+                if pipeline is None or pipeline.vectorstore is not store:
+                    pipeline = RAGPipeline(
+                        store,
+                        llm=self.llm(),
+                        reranker=self.reranker(),
+                        context_packer=self.context_packer(),
+                    )
+                    self._collection_pipelines[collection] = pipeline
+                return pipeline
+
+        with self._lock:
+            if self._pipeline is None:
+                self._pipeline = RAGPipeline(
+                    self.store(),
+                    llm=self.llm(),
+                    reranker=self.reranker(),
+                    context_packer=self.context_packer(),
+                )
+            return self._pipeline
+
+    def lock_for(self, collection: Optional[str] = None) -> threading.Lock:
+        if collection is not None:
+            return self.collections().lock(collection)
+        return self.write_lock
+
+    # --------------------------------------------------------
+    # Persistence
+    # --------------------------------------------------------
+
+    @staticmethod
+    def _persisted_mtime() -> Optional[int]:
+        return persisted_mtime(Path(settings.VECTOR_STORE_DIR))
+
+    def refresh_store(self, force: bool = False, collection: Optional[str] = None) -> bool:
+        """
+        Reload the persisted index if another process saved a newer one
+        since it was last loaded or saved here. Returns True on reload.
+        """
+
+        if collection is not None:
+            return self.collections().refresh(collection, force=force)
+
+        if not (force or settings.VECTOR_STORE_AUTO_RELOAD):
+            return False
+
+        if settings.SHARD_ENABLED:
+            # Shards reload their own indexes; the coordinator follows them
+            return self.store().refresh()
+
+        mtime = self._persisted_mtime()
+        if mtime is None or mtime == self._index_mtime:
+            return False
+
+        with self._lock:
+            if mtime == self._index_mtime:
+                return False
+
+            store = self.store()
+            # Recorded even on failure, so a bad store is not retried per query
+            self._index_mtime = mtime
+
+            try:
+                store.load()
+            except VectorStoreError:
+                logger.warning(
+                    "Persisted vector store could not be loaded, keeping the current index "
+                    "(empty on first load); the next save replaces it | path=%s",
+                    settings.VECTOR_STORE_DIR,
+                    exc_info=True,
+                )
+                return False
+
+        logger.info(
+            "Vector store reloaded | sources=%d | version=%d",
+            len(store.sources),
+            store.version,
+        )
+
+        return True
+
+    def save_store(
+        self,
+        collection: Optional[str] = None,
+        store: Optional[FAISSStore | ShardedStore] = None,
+    ) -> None:
+        """
+        Persist the default store or a collection. Pass the ``store`` that
+        was changed, so it is saved even if it has since been unloaded.
+        """
+
+        if collection is not None:
+            self.collections().save(collection, store=store)
+            return
+
+        (self.store() if store is None else store).save()
+        # Our own save is not a reason to reload
+        self._index_mtime = self._persisted_mtime()
+
+
+# Singleton registry
+resources = ResourceRegistry()
@@ -1,11 +1,15 @@
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import List, Tuple
 
+import numpy as np
 from langchain_core.documents import Document
 from langchain_community.embeddings import SentenceTransformerEmbeddings
 
 from app.core.logging import get_logger
 from app.core.exceptions import EmbeddingError
 from app.core.config import settings
+from app.core.metrics import EVENTS, observe_size, timed
 
 logger = get_logger(__name__)
 
@@ -18,15 +22,33 @@ class Embedder:
     model or provider can be swapped without affecting callers.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        batch_size: int | None = None,
+        query_cache_size: int | None = None,
+    ) -> None:
+        self.model_name = settings.EMBEDDING_MODEL_NAME
+        self.batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+
+        # LRU of query vectors keyed by (model name, normalized query)
+        self.query_cache_size = (
+            settings.QUERY_EMBEDDING_CACHE_SIZE
+            if query_cache_size is None
+            else query_cache_size
+        )
+        self._query_cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self.query_cache_hits = 0
+        self.query_cache_misses = 0
+
         logger.info(
             "Initializing embedding model | model=%s",
-            settings.EMBEDDING_MODEL_NAME,
+            self.model_name,
         )
 
         try:
             self._embedding_model = SentenceTransformerEmbeddings(
-                model_name=settings.EMBEDDING_MODEL_NAME
+                model_name=self.model_name
             )
         except Exception as exc:
             logger.error(
@@ -37,7 +59,7 @@ class Embedder:
                 "Embedding model initialization failed"
             ) from exc
 
-    def embed_documents(self, documents: List[Document]) -> List[List[float]]:
+    def embed_documents(self, documents: List[Document]) -> np.ndarray:
         """
         Generate embeddings for a list of documents.
 
@@ -48,21 +70,63 @@ class Embedder:
 
         Returns
         -------
-        List[List[float]]
-            Embedding vectors.
+        np.ndarray
+            float32 array of shape (len(documents), dim), in input order.
         """
 
         if not documents:
             raise EmbeddingError("No documents provided for embedding")
 
         logger.info(
-            "Embedding documents | count=%d",
+            "Embedding documents | count=%d | batch_size=%d",
             len(documents),
+            self.batch_size,
         )
 
+        with timed("embed_documents"):
+            embeddings = self.embed_texts([doc.page_content for doc in documents])
+
+        observe_size("embed_documents", "texts", len(documents))
+
+        logger.info(
+            "Embedding completed | vectors=%d | dim=%d",
+            embeddings.shape[0],
+            embeddings.shape[1],
+        )
+
+        return embeddings
+
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed raw texts in length-sorted batches.
+
+        Texts are encoded longest-first so each batch holds similarly sized
+        inputs and little padding, and results are written straight into a
+        preallocated float32 array rather than accumulated as Python lists.
+        """
+
+        if not texts:
+            raise EmbeddingError("No texts provided for embedding")
+
+        model = self._embedding_model.client
+        encode_kwargs = self._embedding_model.encode_kwargs
+
         try:
-            texts = [doc.page_content for doc in documents]
-            embeddings = self._embedding_model.embed_documents(texts)
+            order = np.argsort([-len(t) for t in texts], kind="stable")
+            embeddings = np.empty(
+                (len(texts), model.get_sentence_embedding_dimension()),
+                dtype=np.float32,
+            )
+
+            for start in range(0, len(texts), self.batch_size):
+                batch_idx = order[start:start + self.batch_size]
+                embeddings[batch_idx] = model.encode(
+                    [texts[i] for i in batch_idx],
+                    batch_size=self.batch_size,
+                    convert_to_numpy=True,
+                    show_progress_bar=False,
+                    **encode_kwargs,
+                )
         except Exception as exc:
             logger.error(
                 "Document embedding failed",
@@ -72,24 +136,40 @@ class Embedder:
                 "Failed to generate document embeddings"
             ) from exc
 
-        logger.info(
-            "Embedding completed | vectors=%d | dim=%d",
-            len(embeddings),
-            len(embeddings[0]) if embeddings else 0,
-        )
-
         return embeddings
 
-    def embed_query(self, query: str) -> List[float]:
+    def embed_query(self, query: str) -> np.ndarray:
         """
         Generate an embedding for a user query.
+
+        Vectors are served from an LRU cache, so retries and repeated
+        questions skip the model forward pass. The returned float32 array
+        is shared with the cache and marked read-only.
         """
 
         if not query or not query.strip():
             raise EmbeddingError("Query text is empty")
 
+        normalized = " ".join(query.split())
+        key = (self.model_name, normalized)
+
+        with self._query_cache_lock:
+            vector = self._query_cache.get(key)
+            if vector is not None:
+                self._query_cache.move_to_end(key)
+                self.query_cache_hits += 1
+                EVENTS.inc(event="query_embedding_cache", result="hit")
+                return vector
+            self.query_cache_misses += 1
+
+        EVENTS.inc(event="query_embedding_cache", result="miss")
+
         try:
-            return self._embedding_model.embed_query(query)
+            with timed("embed_query"):
+                vector = np.asarray(
+                    self._embedding_model.embed_query(normalized),
+                    dtype=np.float32,
+                )
         except Exception as exc:
             logger.error(
                 "Query embedding failed",
@@ -98,3 +178,57 @@ class Embedder:
             raise EmbeddingError(
                 "Failed to generate query embedding"
             ) from exc
+
+        vector.setflags(write=False)
+
+        if self.query_cache_size > 0:
+            with self._query_cache_lock:
+                self._query_cache[key] = vector
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+
+        return vector
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed several queries with one model call.
+
+        Cached queries are served from the LRU cache, and the rest are
+        encoded together and added to it, so later ``embed_query`` calls
+        for the same questions are cache hits.
+        """
+
+        if not queries or any(not q or not q.strip() for q in queries):
+            raise EmbeddingError("Query text is empty")
+
+        normalized = [" ".join(q.split()) for q in queries]
+        vectors = {}
+
+        with self._query_cache_lock:
+            for text in normalized:
+                vector = self._query_cache.get((self.model_name, text))
+                if vector is not None:
+                    self._query_cache.move_to_end((self.model_name, text))
+                    vectors[text] = vector
+
+            missing = [text for text in dict.fromkeys(normalized) if text not in vectors]
+            self.query_cache_hits += len(normalized) - len(missing)
+            self.query_cache_misses += len(missing)
+
+        EVENTS.inc(len(normalized) - len(missing), event="query_embedding_cache", result="hit")
+        EVENTS.inc(len(missing), event="query_embedding_cache", result="miss")
+
+        if missing:
+            with timed("embed_query"):
+                embedded = self.embed_texts(missing)
+            embedded.setflags(write=False)
+
+            with self._query_cache_lock:
+                for text, vector in zip(missing, embedded):
+                    vectors[text] = vector
+                    if self.query_cache_size > 0:
+                        self._query_cache[(self.model_name, text)] = vector
+                while len(self._query_cache) > self.query_cache_size:
+                    self._query_cache.popitem(last=False)
+
+        return np.vstack([vectors[text] for text in normalized])
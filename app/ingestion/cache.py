@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.core.logging import get_logger
+from app.core.config import settings
+
+logger = get_logger(__name__)
+
+# Bump when the on-disk layout changes so old entries are ignored.
+CACHE_FORMAT_VERSION = 1
+
+
+@dataclass
+class CachedIngestion:
+    """
+    Chunks and vectors restored from the ingestion cache.
+    """
+
+    key: str
+    documents: List[Document]
+    vectors: np.ndarray
+
+
+class IngestionCache:
+    """
+    Content-addressed, on-disk cache of parsed, chunked and embedded PDFs.
+
+    Entries are keyed by the SHA-256 of the file bytes combined with the
+    chunker and embedding-model settings, so changing any of them produces
+    a new key rather than serving stale chunks or vectors.
+
+    The cache stays under ``max_bytes`` (``settings.INGESTION_CACHE_MAX_MB``)
+    by removing the least recently used entries after each write; a hit
+    refreshes its entry's modification time, which serves as last use.
+    """
+
+    CHUNKS_FILE = "chunks.json"
+    VECTORS_FILE = "vectors.npy"
+
+    def __init__(
+        self,
+        cache_dir: str | None = None,
+        max_bytes: int | None = None,
+    ) -> None:
+        self._cache_dir = Path(cache_dir or settings.INGESTION_CACHE_DIR)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = (
+            settings.INGESTION_CACHE_MAX_MB * 1024 * 1024
+            if max_bytes is None
+            else max_bytes
+        )
+
+    @staticmethod
+    def make_key(
+        data: bytes,
+        chunk_size: int,
+        chunk_overlap: int,
+        model_name: str,
+    ) -> str:
+        """
+        Build a cache key from file content and pipeline settings.
+        """
+
+        digest = hashlib.sha256()
+        digest.update(data)
+        digest.update(
+            (
+                f"|v={CACHE_FORMAT_VERSION}"
+                f"|chunk_size={chunk_size}"
+                f"|chunk_overlap={chunk_overlap}"
+                f"|model={model_name}"
+            ).encode("utf-8")
+        )
+        return digest.hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self._cache_dir / key
+
+    def get(self, key: str) -> Optional[CachedIngestion]:
+        """
+        Return cached chunks and vectors for a key, or None on a miss.
+        """
+
+        entry = self._entry_dir(key)
+        chunks_path = entry / self.CHUNKS_FILE
+        vectors_path = entry / self.VECTORS_FILE
+
+        if not (chunks_path.exists() and vectors_path.exists()):
+            return None
+
+        try:
+            with chunks_path.open("r", encoding="utf-8") as fh:
+                records = json.load(fh)
+
+            documents = [
+                Document(
+                    page_content=record["page_content"],
+                    metadata=record["metadata"],
+                )
+                for record in records
+            ]
+            vectors = np.load(vectors_path)
+        except Exception:
+            logger.warning(
+                "Ignoring unreadable ingestion cache entry | key=%s",
+                key,
+                exc_info=True,
+            )
+            return None
+
+        if len(documents) != len(vectors):
+            logger.warning(
+                "Ignoring inconsistent ingestion cache entry | key=%s",
+                key,
+            )
+            return None
+
+        try:
+            # Marks the entry as recently used for eviction
+            os.utime(entry)
+        except OSError:
+            pass
+
+        logger.info(
+            "Ingestion cache hit | key=%s | chunks=%d",
+            key[:12],
+            len(documents),
+        )
+
+        return CachedIngestion(key=key, documents=documents, vectors=vectors)
+
+    def put(
+        self,
+        key: str,
+        documents: List[Document],
+        vectors,
+    ) -> None:
+        """
+        Store chunks and vectors under a key.
+
+        The entry is written to a temporary directory and moved into place,
+        so readers never observe a partially written entry. Failures are
+        logged and swallowed: the cache must never break ingestion.
+        """
+
+        entry = self._entry_dir(key)
+
+        if entry.exists():
+            return
+
+        tmp_dir = Path(tempfile.mkdtemp(dir=self._cache_dir, prefix=".tmp-"))
+
+        try:
+            with (tmp_dir / self.CHUNKS_FILE).open("w", encoding="utf-8") as fh:
+                json.dump(
+                    [
+                        {
+                            "page_content": doc.page_content,
+                            "metadata": doc.metadata,
+                        }
+                        for doc in documents
+                    ],
+                    fh,
+                )
+
+            np.save(
+                tmp_dir / self.VECTORS_FILE,
+                np.asarray(vectors, dtype=np.float32),
+            )
+
+            os.replace(tmp_dir, entry)
+        except OSError:
+            # Another session stored the same entry first.
+            if not entry.exists():
+                logger.warning(
+                    "Failed to write ingestion cache entry | key=%s",
+                    key,
+                    exc_info=True,
+                )
+            return
+        except Exception:
+            logger.warning(
+                "Failed to write ingestion cache entry | key=%s",
+                key,
+                exc_info=True,
+            )
+            return
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        logger.info(
+            "Ingestion cache stored | key=%s | chunks=%d",
+            key[:12],
+            len(documents),
+        )
+
+        self._evict(keep=entry)
+
+    def _evict(self, keep: Path) -> None:
+        """
+        Remove least recently used entries until the cache fits
+        ``max_bytes``; the entry just written is kept even if it alone is
+        larger. Entries other processes remove concurrently are skipped.
+        """
+
+        if self.max_bytes <= 0:
+            return
+
+        entries = []
+        total = 0
+        for entry in self._cache_dir.iterdir():
+            if entry.name.startswith(".tmp-") or not entry.is_dir():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                entries.append((entry.stat().st_mtime, size, entry))
+            except OSError:
+                continue
+            total += size
+
+        removed = 0
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.info(
+                "Ingestion cache evicted | entries=%d | bytes=%d",
+                removed,
+                total,
+            )
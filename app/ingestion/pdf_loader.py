@@ -1,6 +1,9 @@
-from typing import List
+import io
+from typing import BinaryIO, Iterator, List, Tuple
 
 from streamlit.runtime.uploaded_file_manager import UploadedFile
+from unstructured.documents.elements import Element
+from pypdf import PdfReader, PdfWriter
 from unstructured.partition.pdf import partition_pdf
 
 from app.core.logging import get_logger
@@ -18,27 +21,75 @@ class PDFLoader:
         all_elements = []
 
         for uploaded_file in uploaded_files:
-            logger.info(
-                "PDF ingestion started | file=%s",
-                uploaded_file.name,
+            all_elements.extend(
+                self.load_file(uploaded_file.name, uploaded_file)
             )
 
-            elements = partition_pdf(
-                file=uploaded_file,
-                strategy="fast",              # Windows-safe
-                infer_table_structure=True,
-            )
-
-            # Attach source metadata early
-            for el in elements:
-                if hasattr(el, "metadata"):
-                    el.metadata.source = uploaded_file.name
-
-            all_elements.extend(elements)
-
         logger.info(
             "PDF ingestion completed | total_elements=%d",
             len(all_elements),
         )
 
         return all_elements
+
+    def load_file(
+        self,
+        name: str,
+        file: BinaryIO,
+        starting_page_number: int = 1,
+    ) -> List[Element]:
+        """
+        Parse a single PDF from a binary file object.
+
+        ``starting_page_number`` is the page number of the first page, for
+        parsing a page range split out of a larger document.
+        """
+
+        logger.info(
+            "PDF ingestion started | file=%s | first_page=%d",
+            name,
+            starting_page_number,
+        )
+
+        elements = partition_pdf(
+            file=file,
+            strategy="fast",              # Windows-safe
+            infer_table_structure=True,
+            starting_page_number=starting_page_number,
+        )
+
+        # Attach source metadata early
+        for el in elements:
+            if hasattr(el, "metadata"):
+                el.metadata.source = name
+
+        return elements
+
+    @staticmethod
+    def page_count(data: bytes) -> int:
+        return len(PdfReader(io.BytesIO(data)).pages)
+
+    @staticmethod
+    def split_pages(
+        data: bytes,
+        pages_per_range: int,
+    ) -> Iterator[Tuple[int, int, bytes]]:
+        """
+        Lazily yield (first_page, last_page, pdf_bytes) page ranges of a
+        PDF, 1-based and inclusive, each as a standalone document.
+        """
+
+        reader = PdfReader(io.BytesIO(data))
+        total = len(reader.pages)
+
+        for start in range(0, total, pages_per_range):
+            end = min(start + pages_per_range, total)
+
+            writer = PdfWriter()
+            for page in reader.pages[start:end]:
+                writer.add_page(page)
+
+            buffer = io.BytesIO()
+            writer.write(buffer)
+
+            yield start + 1, end, buffer.getvalue()
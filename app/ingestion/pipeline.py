@@ -0,0 +1,537 @@
+import io
+import multiprocessing
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import BinaryIO, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.core.logging import get_logger
+from app.core.config import settings
+from app.core.exceptions import ChunkingError
+from app.core.metrics import EVENTS, INGEST_BYTES, observe_seconds, observe_size
+from app.chunking.page_classifier import PageClassifier
+from app.chunking.hybrid_chunker import HybridChunker
+from app.embeddings.embedder import Embedder
+from app.ingestion.cache import IngestionCache
+from app.ingestion.pdf_loader import PDFLoader
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class SourceFile:
+    """
+    An uploaded PDF held in memory.
+    """
+
+    name: str
+    data: bytes
+
+
+@dataclass
+class IngestionResult:
+    """
+    Outcome of ingesting a single file.
+    """
+
+    name: str
+    documents: List[Document] = field(default_factory=list)
+    vectors: Optional[np.ndarray] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    cached: bool = False
+    error: Optional[str] = None
+    # (first, last) page for one range of a streamed file
+    pages: Optional[Tuple[int, int]] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.timings.values())
+
+
+def _parse_and_chunk(
+    name: str,
+    data: bytes,
+    chunk_size: int,
+    chunk_overlap: int,
+    starting_page: int = 1,
+) -> Tuple[int, List[Document], Dict[str, float]]:
+    """
+    Parse, classify and chunk one PDF held in memory. Returns the number
+    of parsed elements (not the elements, which nothing downstream needs
+    and which would otherwise be pickled back from pool workers), the
+    chunks and per-stage timings.
+
+    Module-level so it can be shipped to a process pool worker.
+    """
+
+    # BytesIO shares an unmodified bytes buffer instead of copying it
+    return _parse_and_chunk_file(
+        name, io.BytesIO(data), chunk_size, chunk_overlap, starting_page
+    )
+
+
+def _parse_and_chunk_path(
+    name: str,
+    path: str,
+    chunk_size: int,
+    chunk_overlap: int,
+) -> Tuple[int, List[Document], Dict[str, float]]:
+    """
+    Process pool entry point: parse a PDF spooled to disk by the parent,
+    so the upload does not have to be pickled through the pool's pipe.
+    """
+
+    with open(path, "rb") as fh:
+        return _parse_and_chunk_file(name, fh, chunk_size, chunk_overlap)
+
+
+def _parse_and_chunk_file(
+    name: str,
+    file: BinaryIO,
+    chunk_size: int,
+    chunk_overlap: int,
+    starting_page: int = 1,
+) -> Tuple[int, List[Document], Dict[str, float]]:
+    timings: Dict[str, float] = {}
+
+    start = time.perf_counter()
+    elements = PDFLoader().load_file(name, file, starting_page)
+    timings["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    classified = PageClassifier().classify(elements)
+    timings["classify"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    documents = HybridChunker(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    ).chunk(classified)
+    timings["chunk"] = time.perf_counter() - start
+
+    # Attach source metadata
+    for doc in documents:
+        doc.metadata["source"] = name
+
+    return len(elements), documents, timings
+
+
+def _parse_and_chunk_range(
+    name: str,
+    data: bytes,
+    chunk_size: int,
+    chunk_overlap: int,
+    starting_page: int,
+) -> Tuple[List[Document], Dict[str, float]]:
+    """
+    Parse and chunk one page range of a larger PDF.
+
+    Only chunks cross the process boundary; a range without text (e.g. scanned or blank pages) yields
+    no chunks instead of failing the file.
+    """
+
+    try:
+        _, documents, timings = _parse_and_chunk(
+            name, data, chunk_size, chunk_overlap, starting_page
+        )
+    except ChunkingError:
+        return [], {}
+
+    return documents, timings
+
+
+class IngestionPipeline:
+    """
+    Turns uploaded PDFs into embedded chunks.
+
+    Cached files are served from the ingestion cache; the remaining files
+    are parsed and chunked on a process pool, then embedded in one batch
+    in the calling process where the embedding model is loaded. A failing
+    file is reported in its result instead of aborting the batch.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        chunk_size: int = 900,
+        chunk_overlap: int = 150,
+        max_workers: int | None = None,
+        cache: IngestionCache | None = None,
+    ) -> None:
+        self._embedder = embedder
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_workers = max(1, max_workers or settings.INGESTION_MAX_WORKERS)
+        self._cache = cache
+
+    def run(self, files: List[SourceFile]) -> List[IngestionResult]:
+        """
+        Ingest files, returning one result per file in upload order.
+        """
+
+        logger.info(
+            "Ingestion batch started | files=%d | max_workers=%d",
+            len(files),
+            self.max_workers,
+        )
+
+        results: List[IngestionResult] = [
+            IngestionResult(name=f.name) for f in files
+        ]
+        cache_keys: List[Optional[str]] = [None] * len(files)
+        pending: List[int] = []
+
+        for i, source_file in enumerate(files):
+            if self._cache is None:
+                pending.append(i)
+                continue
+
+            cache_keys[i] = IngestionCache.make_key(
+                source_file.data,
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                model_name=self._embedder.model_name,
+            )
+            cached = self._cache.get(cache_keys[i])
+
+            if cached is None:
+                pending.append(i)
+                continue
+
+            for doc in cached.documents:
+                doc.metadata["source"] = source_file.name
+
+            results[i].documents = cached.documents
+            results[i].vectors = cached.vectors
+            results[i].cached = True
+
+        self._parse_pending(files, pending, results)
+        self._embed_pending(pending, results)
+
+        if self._cache is not None:
+            for i in pending:
+                if results[i].ok:
+                    self._cache.put(
+                        cache_keys[i],
+                        results[i].documents,
+                        results[i].vectors,
+                    )
+
+        for source_file, result in zip(files, results):
+            self._record(source_file, result)
+
+        logger.info(
+            "Ingestion batch completed | ok=%d | cached=%d | failed=%d",
+            sum(r.ok for r in results),
+            sum(r.cached for r in results),
+            sum(not r.ok for r in results),
+        )
+
+        return results
+
+    def _parse_pending(
+        self,
+        files: List[SourceFile],
+        pending: List[int],
+        results: List[IngestionResult],
+    ) -> None:
+        """
+        Parse and chunk uncached files, in parallel when enabled.
+        """
+
+        workers = min(self.max_workers, len(pending))
+
+        if workers <= 1:
+            outcomes = []
+            for i in pending:
+                try:
+                    outcomes.append(
+                        _parse_and_chunk(
+                            files[i].name,
+                            files[i].data,
+                            self.chunk_size,
+                            self.chunk_overlap,
+                        )
+                    )
+                except Exception as exc:
+                    outcomes.append(exc)
+        else:
+            # Each upload is written once to a spool file that workers read
+            # (from the page cache) and that is removed with the directory,
+            # even if parsing fails. spawn: forking a threaded Streamlit
+            # server is unsafe.
+            with tempfile.TemporaryDirectory(
+                prefix="ingest-",
+                dir=settings.INGESTION_SPOOL_DIR or None,
+            ) as spool_dir, ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                futures = []
+                for i in pending:
+                    path = os.path.join(spool_dir, f"{i}.pdf")
+                    with open(path, "wb") as fh:
+                        fh.write(files[i].data)
+
+                    futures.append(
+                        pool.submit(
+                            _parse_and_chunk_path,
+                            files[i].name,
+                            path,
+                            self.chunk_size,
+                            self.chunk_overlap,
+                        )
+                    )
+
+                outcomes = []
+                for future in futures:
+                    try:
+                        outcomes.append(future.result())
+                    except Exception as exc:
+                        outcomes.append(exc)
+
+        for i, outcome in zip(pending, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(
+                    "Ingestion failed | file=%s",
+                    files[i].name,
+                    exc_info=outcome,
+                )
+                results[i].error = str(outcome) or type(outcome).__name__
+                continue
+
+            elements, documents, timings = outcome
+            observe_size("ingest", "elements", elements)
+            results[i].documents = documents
+            results[i].timings.update(timings)
+
+    def _embed_pending(
+        self,
+        pending: List[int],
+        results: List[IngestionResult],
+    ) -> None:
+        """
+        Embed all freshly chunked files in a single call.
+        """
+
+        parsed = [i for i in pending if results[i].ok]
+        if not parsed:
+            return
+
+        documents = [
+            doc for i in parsed for doc in results[i].documents
+        ]
+
+        start = time.perf_counter()
+        try:
+            vectors = self._embedder.embed_documents(documents)
+        except Exception as exc:
+            for i in parsed:
+                results[i].error = str(exc) or type(exc).__name__
+            return
+        elapsed = time.perf_counter() - start
+
+        offset = 0
+        for i in parsed:
+            count = len(results[i].documents)
+            results[i].vectors = vectors[offset:offset + count]
+            # Attribute the shared embedding time by chunk count
+            results[i].timings["embed"] = elapsed * count / len(documents)
+            offset += count
+
+    def should_stream(self, source_file: SourceFile) -> bool:
+        """
+        Whether a file is large enough to ingest range by range.
+        """
+
+        try:
+            pages = PDFLoader.page_count(source_file.data)
+        except Exception:
+            # Unreadable here; let the regular path report the error
+            return False
+
+        return pages >= settings.INGESTION_STREAM_MIN_PAGES
+
+    def iter_ranges(
+        self,
+        source_file: SourceFile,
+        pages_per_range: int | None = None,
+    ) -> Iterator[IngestionResult]:
+        """
+        Ingest one large PDF as a stream of page-range results, in page
+        order, each already embedded and ready to index.
+
+        Ranges are parsed on the process pool with at most ``max_workers``
+        in flight, so memory stays bounded by a few ranges regardless of
+        file size and callers can index each range as soon as it arrives.
+        Errors propagate to the caller. A cache hit yields one result for
+        the whole file.
+        """
+
+        pages_per_range = pages_per_range or settings.INGESTION_PAGES_PER_RANGE
+        name = source_file.name
+
+        key = None
+        if self._cache is not None:
+            key = IngestionCache.make_key(
+                source_file.data,
+                chunk_size=self.chunk_size,
+                chunk_overlap=self.chunk_overlap,
+                model_name=self._embedder.model_name,
+            )
+            cached = self._cache.get(key)
+            if cached is not None:
+                for doc in cached.documents:
+                    doc.metadata["source"] = name
+                EVENTS.inc(event="ingest_file", status="cached")
+                self._record_bytes(len(source_file.data), 0.0, "cached")
+                yield IngestionResult(
+                    name=name,
+                    documents=cached.documents,
+                    vectors=cached.vectors,
+                    cached=True,
+                )
+                return
+
+        logger.info(
+            "Streaming ingestion started | file=%s | pages_per_range=%d",
+            name,
+            pages_per_range,
+        )
+
+        start = time.perf_counter()
+        ranges = PDFLoader.split_pages(source_file.data, pages_per_range)
+        documents: List[Document] = []
+        vectors: List[np.ndarray] = []
+
+        for result in self._parse_ranges(name, ranges):
+            self._embed_range(result)
+            documents.extend(result.documents)
+            if result.vectors is not None:
+                vectors.append(result.vectors)
+            yield result
+
+        EVENTS.inc(event="ingest_file", status="ok")
+        self._record_bytes(len(source_file.data), time.perf_counter() - start, "ok")
+        observe_size("ingest", "chunks", len(documents))
+
+        if self._cache is not None and documents:
+            self._cache.put(key, documents, np.vstack(vectors))
+
+        logger.info(
+            "Streaming ingestion completed | file=%s | chunks=%d",
+            name,
+            len(documents),
+        )
+
+    def _parse_ranges(
+        self,
+        name: str,
+        ranges: Iterator[Tuple[int, int, bytes]],
+    ) -> Iterator[IngestionResult]:
+        """
+        Parse page ranges with a bounded window of in-flight work,
+        yielding results in page order.
+        """
+
+        def result_for(first: int, last: int, outcome) -> IngestionResult:
+            documents, timings = outcome
+            return IngestionResult(
+                name=name,
+                documents=documents,
+                timings=dict(timings),
+                pages=(first, last),
+            )
+
+        if self.max_workers <= 1:
+            for first, last, data in ranges:
+                yield result_for(
+                    first,
+                    last,
+                    _parse_and_chunk_range(
+                        name, data, self.chunk_size, self.chunk_overlap, first
+                    ),
+                )
+            return
+
+        # spawn: forking a threaded Streamlit server is unsafe
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            window: Deque[Tuple[int, int, Future]] = deque()
+
+            for first, last, data in ranges:
+                window.append(
+                    (
+                        first,
+                        last,
+                        pool.submit(
+                            _parse_and_chunk_range,
+                            name,
+                            data,
+                            self.chunk_size,
+                            self.chunk_overlap,
+                            first,
+                        ),
+                    )
+                )
+                if len(window) >= self.max_workers:
+                    first, last, future = window.popleft()
+                    yield result_for(first, last, future.result())
+
+            while window:
+                first, last, future = window.popleft()
+                yield result_for(first, last, future.result())
+
+    def _embed_range(self, result: IngestionResult) -> None:
+        for stage, seconds in result.timings.items():
+            observe_seconds(f"ingest_{stage}", seconds)
+
+        if not result.documents:
+            return
+
+        start = time.perf_counter()
+        result.vectors = self._embedder.embed_documents(result.documents)
+        result.timings["embed"] = time.perf_counter() - start
+        observe_seconds("ingest_embed", result.timings["embed"])
+
+    @staticmethod
+    def _record(source_file: SourceFile, result: IngestionResult) -> None:
+        """
+        Export per-file stage timings and sizes to the metrics registry.
+        """
+
+        status = "failed" if not result.ok else "cached" if result.cached else "ok"
+        EVENTS.inc(event="ingest_file", status=status)
+
+        if not result.ok:
+            return
+
+        for stage, seconds in result.timings.items():
+            observe_seconds(f"ingest_{stage}", seconds)
+
+        IngestionPipeline._record_bytes(len(source_file.data), result.seconds, status)
+        observe_size("ingest", "chunks", len(result.documents))
+
+    @staticmethod
+    def _record_bytes(num_bytes: int, seconds: float, status: str) -> None:
+        """
+        Ingested bytes as a counter (rate() gives throughput) plus a
+        per-file bytes/second histogram.
+        """
+
+        INGEST_BYTES.inc(num_bytes, status=status)
+        observe_size("ingest", "bytes", num_bytes)
+        if status == "ok" and seconds > 0:
+            observe_size("ingest", "bytes_per_s", num_bytes / seconds)
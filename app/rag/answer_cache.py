@@ -0,0 +1,155 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.core.logging import get_logger
+from app.core.config import settings
+from app.embeddings.embedder import Embedder
+
+logger = get_logger(__name__)
+
+
+class AnswerCache:
+    """
+    Bounded LRU cache of RAG results for repeated questions.
+
+    Lookups match on the normalized query text and, when an embedder is
+    supplied, fall back to the most similar cached query whose cosine
+    similarity reaches ``similarity_threshold``. Every entry belongs to one
+    index version; when the vector store changes the cache is cleared.
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        embedder: Embedder | None = None,
+        similarity_threshold: float | None = None,
+    ) -> None:
+        self.max_entries = (
+            settings.ANSWER_CACHE_SIZE if max_entries is None else max_entries
+        )
+        self.similarity_threshold = (
+            settings.ANSWER_CACHE_SIMILARITY_THRESHOLD
+            if similarity_threshold is None
+            else similarity_threshold
+        )
+        self._embedder = embedder
+
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._index_version: int | None = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        Lower-case, collapse whitespace and drop trailing punctuation.
+        """
+        return re.sub(r"\s+", " ", query).strip().lower().rstrip("?.! ")
+
+    def get(self, query: str, index_version: int) -> Optional[Dict]:
+        """
+        Return the cached result for a query, or None on a miss.
+        """
+
+        key = self.normalize(query)
+
+        with self._lock:
+            self._check_version(index_version)
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                logger.info("Answer cache hit | match=exact")
+                return self._entries[key]
+
+        match = self._semantic_match(query)
+
+        with self._lock:
+            if match is not None and match in self._entries:
+                self._entries.move_to_end(match)
+                self.hits += 1
+                logger.info("Answer cache hit | match=semantic")
+                return self._entries[match]
+
+            self.misses += 1
+            return None
+
+    def put(self, query: str, result: Dict, index_version: int) -> None:
+        """
+        Store a result, evicting the least recently used entry when full.
+        """
+
+        if self.max_entries <= 0:
+            return
+
+        key = self.normalize(query)
+        vector = self._embed(query)
+
+        with self._lock:
+            self._check_version(index_version)
+
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            if vector is not None:
+                self._vectors[key] = vector
+
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._vectors.pop(evicted, None)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._vectors.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
+
+    def _check_version(self, index_version: int) -> None:
+        # Caller holds the lock
+        if index_version != self._index_version:
+            if self._entries:
+                logger.info("Answer cache invalidated | reason=index_changed")
+            self._entries.clear()
+            self._vectors.clear()
+            self._index_version = index_version
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        if self._embedder is None:
+            return None
+
+        vector = np.asarray(self._embedder.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _semantic_match(self, query: str) -> Optional[str]:
+        if self._embedder is None:
+            return None
+
+        with self._lock:
+            if not self._vectors:
+                return None
+            keys = list(self._vectors)
+            matrix = np.vstack([self._vectors[k] for k in keys])
+
+        scores = matrix @ self._embed(query)
+        best = int(np.argmax(scores))
+
+        if scores[best] >= self.similarity_threshold:
+            return keys[best]
+
+        return None
@@ -0,0 +1,211 @@
+import math
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Set
+
+from langchain_core.documents import Document
+
+from app.core.logging import get_logger
+from app.core.config import settings
+
+logger = get_logger(__name__)
+
+# Rough characters per token for English prose when no tokenizer is set
+CHARS_PER_TOKEN = 4
+
+
+def format_context_doc(doc: Document) -> str:
+    """
+    How a chunk appears in the prompt; the packer budgets exactly this.
+    """
+
+    return (
+        f"(Source: {doc.metadata.get('source')}, Page: {doc.metadata.get('page')})\n"
+        f"{doc.page_content}"
+    )
+
+
+class TokenCounter:
+    """
+    Counts tokens with the generation model's Hugging Face tokenizer
+    (``settings.LLM_TOKENIZER``), falling back to a character estimate
+    when none is configured or it cannot be loaded. The estimate is
+    padded by ``settings.LLM_TOKEN_ESTIMATE_MARGIN`` so numbers, tables
+    and non-English text do not overflow the context window.
+    """
+
+    def __init__(self, tokenizer_name: Optional[str] = None) -> None:
+        self.tokenizer_name = (
+            settings.LLM_TOKENIZER if tokenizer_name is None else tokenizer_name
+        )
+        self._encode: Optional[Callable[[str], List[int]]] = None
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _encoder(self) -> Optional[Callable[[str], List[int]]]:
+        with self._lock:
+            if not self._loaded:
+                self._loaded = True
+                if self.tokenizer_name:
+                    try:
+                        from transformers import AutoTokenizer
+
+                        tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_name)
+                        self._encode = lambda text: tokenizer.encode(
+                            text, add_special_tokens=False
+                        )
+                    except Exception:
+                        logger.warning(
+                            "Tokenizer unavailable, estimating tokens | tokenizer=%s",
+                            self.tokenizer_name,
+                            exc_info=True,
+                        )
+            return self._encode
+
+    def count(self, text: str) -> int:
+        encode = self._encoder()
+        if encode is None:
+            return math.ceil(
+                len(text) / CHARS_PER_TOKEN * (1 + settings.LLM_TOKEN_ESTIMATE_MARGIN)
+            )
+        return len(encode(text))
+
+
+@dataclass
+class PackedContext:
+    """
+    Chunks selected for the prompt and what happened to the rest.
+    """
+
+    documents: List[Document] = field(default_factory=list)
+    tokens: int = 0
+    budget: int = 0
+    duplicates: int = 0
+    trimmed: int = 0
+    skipped: int = 0
+
+
+class ContextPacker:
+    """
+    Fills a token budget with retrieved chunks, best first.
+
+    Chunks are taken in retrieval order; near-duplicates of an already
+    selected chunk (word-shingle Jaccard above ``dedup_threshold``) are
+    dropped, tables longer than ``max_table_tokens`` are cut to their
+    leading rows, and a chunk that does not fit is skipped so smaller,
+    lower-ranked chunks can still use the remaining space.
+    """
+
+    def __init__(
+        self,
+        counter: Optional[TokenCounter] = None,
+        max_table_tokens: Optional[int] = None,
+        dedup_threshold: Optional[float] = None,
+    ) -> None:
+        self.counter = counter or TokenCounter()
+        self.max_table_tokens = max_table_tokens or settings.CONTEXT_MAX_TABLE_TOKENS
+        self.dedup_threshold = (
+            settings.CONTEXT_DEDUP_THRESHOLD
+            if dedup_threshold is None
+            else dedup_threshold
+        )
+
+    def budget_for(self, prompt_overhead: str) -> int:
+        """
+        Context tokens left once the prompt template (with the question)
+        and the reserved answer length are accounted for.
+        """
+
+        return max(
+            0,
+            settings.LLM_CONTEXT_WINDOW
+            - settings.LLM_MAX_ANSWER_TOKENS
+            - self.counter.count(prompt_overhead),
+        )
+
+    def pack(self, docs: List[Document], budget: int) -> PackedContext:
+        packed = PackedContext(budget=budget)
+        selected_shingles: List[Set[str]] = []
+        # Chunks are joined with a blank line
+        separator = self.counter.count("\n\n")
+
+        for doc in docs:
+            shingles = _shingles(doc.page_content)
+            if any(_jaccard(shingles, s) >= self.dedup_threshold for s in selected_shingles):
+                packed.duplicates += 1
+                continue
+
+            if doc.metadata.get("category") == "TABLE":
+                trimmed = self._trim_table(doc)
+                if trimmed is not doc:
+                    packed.trimmed += 1
+                doc = trimmed
+
+            cost = self.counter.count(format_context_doc(doc))
+            if packed.documents:
+                cost += separator
+
+            if packed.tokens + cost > budget:
+                packed.skipped += 1
+                continue
+
+            packed.documents.append(doc)
+            packed.tokens += cost
+            selected_shingles.append(shingles)
+
+        logger.info(
+            "Context packed | docs=%d/%d | tokens=%d/%d | duplicates=%d | trimmed=%d | skipped=%d",
+            len(packed.documents),
+            len(docs),
+            packed.tokens,
+            budget,
+            packed.duplicates,
+            packed.trimmed,
+            packed.skipped,
+        )
+
+        return packed
+
+    def _trim_table(self, doc: Document) -> Document:
+        """
+        Keep the header and as many leading rows as fit; tables parsed
+        without line breaks are cut at a word boundary instead.
+        """
+
+        if self.counter.count(doc.page_content) <= self.max_table_tokens:
+            return doc
+
+        lines = doc.page_content.splitlines()
+        units, joiner = (lines, "\n") if len(lines) > 1 else (doc.page_content.split(), " ")
+
+        # Summing per-unit counts slightly overestimates, which is safe
+        kept: List[str] = []
+        tokens = 0
+        for unit in units:
+            tokens += self.counter.count(joiner + unit)
+            if kept and tokens > self.max_table_tokens:
+                break
+            kept.append(unit)
+
+        omitted = len(units) - len(kept)
+        what = "rows" if joiner == "\n" else "words"
+        text = joiner.join(kept) + f"\n[table truncated: {omitted} more {what}]"
+
+        return Document(
+            page_content=text,
+            metadata={**doc.metadata, "truncated": True},
+        )
+
+
+def _shingles(text: str, size: int = 3) -> Set[str]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
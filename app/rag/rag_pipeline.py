@@ -1,14 +1,24 @@
-from typing import Dict, List, TypedDict, Generator
+import asyncio
+import re
+import time
+from pathlib import Path
+from typing import Annotated, AsyncIterator, Dict, Iterator, List, TypedDict, Generator
 
 from langgraph.graph import StateGraph
 from langchain_core.documents import Document
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
 
 from app.core.logging import get_logger
 from app.core.exceptions import RetrievalError, RAGGenerationError
 from app.core.config import settings
+from app.core.metrics import EVENTS, observe_seconds, observe_size, timed
 from app.vectorstore.faiss_store import FAISSStore
+from app.vectorstore.filters import SearchFilter
+from app.rag.answer_cache import AnswerCache
+from app.rag.context_packer import ContextPacker, PackedContext, format_context_doc
+from app.rag.reranker import CrossEncoderReranker
 
 logger = get_logger(__name__)
 
@@ -17,12 +27,21 @@ logger = get_logger(__name__)
 # Graph State Definition
 # ============================================================
 
+def merge_trace(left: Dict, right: Dict) -> Dict:
+    return {**left, **right}
+
+
 class RAGState(TypedDict):
     query: str
     retrieved_docs: List[Document]
+    # The subset of retrieved_docs that fit the prompt, as sent to the LLM
+    context_docs: List[Document]
     answer: str
     citations: List[Dict]
     retrieval_mode: str
+    source_filter: List[str]
+    # Per-request timings and sizes, merged across nodes
+    trace: Annotated[Dict, merge_trace]
 
 
 # ============================================================
@@ -44,73 +63,320 @@ def is_comparative_query(query: str) -> bool:
     return any(k in q for k in keywords)
 
 
+# Words too common in report titles and questions to identify a report
+GENERIC_NAME_WORDS = {
+    "project", "projects", "report", "reports", "plant", "plants",
+    "station", "facility", "generating", "manufacturing", "grassroot",
+    "grassroots", "the", "and", "pdf",
+}
+
+
+def detect_sources(query: str, sources: List[str]) -> List[str]:
+    """
+    Return the indexed sources a query names explicitly.
+
+    A source's distinctive words are the words of its file name that no
+    other source shares and that are not generic. It matches when the
+    query contains at least two of them, or all of them if it has fewer,
+    e.g. "Racine coal station timeline" names "Racine_Coal_Station.pdf".
+    One ordinary word such as "coal" or "assessment" is not enough, since
+    a wrong match would hide every other report from retrieval.
+    """
+
+    def words(text: str) -> set:
+        return {w for w in re.findall(r"[a-z0-9]+", text.lower()) if len(w) >= 4}
+
+    name_words = {source: words(Path(source).stem) for source in sources}
+    query_words = words(query)
+
+    matched = []
+    for source, own in name_words.items():
+        shared = set().union(*(w for s, w in name_words.items() if s != source))
+        distinctive = own - shared - GENERIC_NAME_WORDS
+        hits = len(distinctive & query_words)
+        if hits and hits >= min(2, len(distinctive)):
+            matched.append(source)
+
+    return matched
+
+
 # ============================================================
 # RAG Pipeline
 # ============================================================
 
 class RAGPipeline:
-    def __init__(self, vectorstore: FAISSStore) -> None:
+    def __init__(
+        self,
+        vectorstore: FAISSStore,
+        answer_cache: AnswerCache | None = None,
+        llm: ChatOpenAI | None = None,
+        reranker: CrossEncoderReranker | None = None,
+        context_packer: ContextPacker | None = None,
+    ) -> None:
         self.vectorstore = vectorstore
 
-        # LM Studio (OpenAI-compatible, streaming enabled)
-        self.llm = ChatOpenAI(
+        if answer_cache is None and settings.ANSWER_CACHE_SIZE > 0:
+            answer_cache = AnswerCache(
+                embedder=(
+                    vectorstore.embedder if settings.ANSWER_CACHE_SEMANTIC else None
+                ),
+            )
+        self.answer_cache = answer_cache
+        self.context_packer = context_packer or ContextPacker()
+
+        if reranker is None and settings.RERANK_ENABLED:
+            reranker = CrossEncoderReranker()
+        self.reranker = reranker
+
+        # LM Studio (OpenAI-compatible, streaming enabled); pass a shared
+        # client to reuse its connection pool across pipelines
+        self.llm = llm or ChatOpenAI(
             model=settings.LMSTUDIO_MODEL,
             temperature=0,
             base_url=settings.LMSTUDIO_API_BASE.strip(),
             api_key=settings.LMSTUDIO_API_KEY,
+            max_tokens=settings.LLM_MAX_ANSWER_TOKENS,
             streaming=True,  # ✅ ENABLE STREAMING
         )
 
         self.graph = self._build_graph()
+        self.async_graph = self._build_async_graph()
 
     # --------------------------------------------------------
     # Retrieval Node
     # --------------------------------------------------------
 
+    @property
+    def _retrieval_k(self) -> int:
+        # Rerank a wider candidate set when the reranker is on
+        return settings.RERANK_CANDIDATES if self.reranker else settings.RETRIEVAL_K
+
     def _retrieve_node(self, state: RAGState) -> Dict:
         query = state["query"]
 
+        if state["retrieval_mode"]:
+            # Already retrieved together with other queries (run_batch)
+            return {}
+
+        trace: Dict = {}
+        k = self._retrieval_k
+
         try:
-            if is_comparative_query(query):
-                docs = self.vectorstore.mmr_search(query)
-                mode = "MMR"
-            else:
-                docs = self.vectorstore.similarity_search(query)
-                mode = "SIMILARITY"
+            with timed("retrieve", trace):
+                sources = self._sources_named_in(query)
+                search_filter = SearchFilter(sources=tuple(sources)) if sources else None
+
+                if is_comparative_query(query):
+                    docs = self.vectorstore.mmr_search(
+                        query,
+                        k=k,
+                        fetch_k=max(settings.MMR_FETCH_K, 3 * k),
+                        search_filter=search_filter,
+                    )
+                    mode = "MMR"
+                elif settings.RETRIEVAL_MODE == "hybrid":
+                    docs = self.vectorstore.hybrid_search(
+                        query,
+                        k=k,
+                        fetch_k=max(20, k),
+                        search_filter=search_filter,
+                    )
+                    mode = "HYBRID"
+                else:
+                    docs = self.vectorstore.similarity_search(
+                        query,
+                        k=k,
+                        search_filter=search_filter,
+                    )
+                    mode = "SIMILARITY"
+
+            observe_size("retrieve", "docs", len(docs), trace)
 
             logger.info(
-                "Retrieval completed | mode=%s | docs=%d",
+                "Retrieval completed | mode=%s | docs=%d | sources=%s",
                 mode,
                 len(docs),
+                sources or "all",
             )
 
             return {
                 "retrieved_docs": docs,
                 "retrieval_mode": mode,
+                "source_filter": sources,
+                "trace": trace,
             }
 
         except Exception as exc:
             logger.error("Retrieval failed", exc_info=True)
             raise RetrievalError("Document retrieval failed") from exc
 
+    async def _aretrieve_node(self, state: RAGState) -> Dict:
+        # Embedding and FAISS search are CPU-bound and release the GIL,
+        # so they run on a worker thread instead of the event loop
+        return await asyncio.to_thread(self._retrieve_node, state)
+
+    # --------------------------------------------------------
+    # Rerank Node (optional)
+    # --------------------------------------------------------
+
+    def _rerank_node(self, state: RAGState) -> Dict:
+        docs = state["retrieved_docs"]
+        trace: Dict = {}
+
+        if not docs:
+            return {"trace": trace}
+
+        try:
+            result = self.reranker.rerank(state["query"], docs)
+        except Exception:
+            # Reranking only refines the order; never fail the request
+            logger.error("Reranking failed, keeping retrieval order", exc_info=True)
+            EVENTS.inc(event="rerank", result="error")
+            return {
+                "retrieved_docs": docs[:settings.RETRIEVAL_K],
+                "trace": {"rerank_fallback": True},
+            }
+
+        observe_seconds("rerank", result.seconds, trace)
+        trace["rerank_fallback"] = not result.reranked
+        trace["rerank_cached"] = result.cached
+        EVENTS.inc(event="rerank", result="ok" if result.reranked else "over_budget")
+
+        logger.info(
+            "Rerank completed | candidates=%d | scored=%d | cached=%d | reranked=%s",
+            len(docs),
+            result.scored,
+            result.cached,
+            result.reranked,
+        )
+
+        return {
+            "retrieved_docs": result.documents[:settings.RETRIEVAL_K],
+            "trace": trace,
+        }
+
+    async def _arerank_node(self, state: RAGState) -> Dict:
+        return await asyncio.to_thread(self._rerank_node, state)
+
+    def _sources_named_in(self, query: str) -> List[str]:
+        """
+        Sources to restrict retrieval to, or [] to search everything.
+        """
+
+        if not settings.AUTO_SOURCE_FILTER:
+            return []
+
+        indexed = self.vectorstore.sources
+        matched = detect_sources(query, indexed)
+
+        # Naming every report is the same as naming none
+        return matched if len(matched) < len(indexed) else []
+
     # --------------------------------------------------------
     # Generation Node (STREAMING)
     # --------------------------------------------------------
 
     def _generate_node(self, state: RAGState) -> Dict:
-        docs = state["retrieved_docs"][:4]  # context limit for llama-2-7b
+        prompt = self._build_prompt(state["query"], state["context_docs"])
+        trace: Dict = {}
+        tokens: List[str] = []
+
+        try:
+            with timed("generate", trace):
+                start = time.perf_counter()
+                for token in self._stream_tokens(prompt):
+                    if not tokens:
+                        observe_seconds("ttft", time.perf_counter() - start, trace)
+                    tokens.append(token)
+
+            observe_size("generate", "prompt_chars", len(prompt), trace)
+            observe_size("generate", "tokens", len(tokens), trace)
+
+            return {
+                "answer": "".join(tokens),
+                "trace": trace,
+            }
+
+        except Exception as exc:
+            logger.error("LLM generation failed", exc_info=True)
+            raise RAGGenerationError("Answer generation failed") from exc
+
+    async def _agenerate_node(self, state: RAGState, config: RunnableConfig) -> Dict:
+        prompt = self._build_prompt(state["query"], state["context_docs"])
+        trace: Dict = {}
+        tokens: List[str] = []
+
+        try:
+            with timed("generate", trace):
+                start = time.perf_counter()
+                # config carries the graph callbacks that feed "messages" streaming
+                async for chunk in self.llm.astream(
+                    [HumanMessage(content=prompt)],
+                    config=config,
+                ):
+                    if not chunk.content:
+                        continue
+                    if not tokens:
+                        observe_seconds("ttft", time.perf_counter() - start, trace)
+                    tokens.append(chunk.content)
+
+            observe_size("generate", "prompt_chars", len(prompt), trace)
+            observe_size("generate", "tokens", len(tokens), trace)
+
+            return {
+                "answer": "".join(tokens),
+                "trace": trace,
+            }
+
+        except Exception as exc:
+            logger.error("LLM generation failed", exc_info=True)
+            raise RAGGenerationError("Answer generation failed") from exc
+
+    # --------------------------------------------------------
+    # Pack Node
+    # --------------------------------------------------------
+
+    def _pack_node(self, state: RAGState) -> Dict:
+        """
+        Select as many retrieved chunks as fit the model's context window
+        after the prompt template and the reserved answer length.
+        """
+
+        docs = state["retrieved_docs"]
         query = state["query"]
 
         if not docs:
             raise RAGGenerationError("No documents available for answer generation")
 
-        context = "\n\n".join(
-            f"(Source: {d.metadata.get('source')}, Page: {d.metadata.get('page')})\n"
-            f"{d.page_content}"
-            for d in docs
-        )
+        budget = self.context_packer.budget_for(self._build_prompt(query, []))
+        packed = self.context_packer.pack(docs, budget)
 
-        prompt = f"""
+        if not packed.documents:
+            raise RAGGenerationError("Retrieved context does not fit the model context window")
+
+        return {
+            "context_docs": packed.documents,
+            "trace": self._context_trace(packed),
+        }
+
+    async def _apack_node(self, state: RAGState) -> Dict:
+        # Token counting with a real tokenizer is CPU-bound
+        return await asyncio.to_thread(self._pack_node, state)
+
+    @staticmethod
+    def _context_trace(packed: PackedContext) -> Dict:
+        trace: Dict = {}
+        observe_size("context", "docs", len(packed.documents), trace)
+        observe_size("context", "tokens", packed.tokens, trace)
+        trace["context_budget_tokens"] = packed.budget
+        trace["context_dropped_duplicates"] = packed.duplicates
+        return trace
+
+    @staticmethod
+    def _build_prompt(query: str, docs: List[Document]) -> str:
+        context = "\n\n".join(format_context_doc(d) for d in docs)
+
+        return f"""
 Answer the question using ONLY the context below.
 
 Context:
@@ -122,52 +388,81 @@ Question:
 If the answer is not in the context, say "Not found in documents."
 """
 
-        try:
-            full_answer = ""
-
-            for chunk in self.llm.stream([HumanMessage(content=prompt)]):
-                if chunk.content:
-                    full_answer += chunk.content
-
-            return {"answer": full_answer}
-
-        except Exception as exc:
-            logger.error("LLM generation failed", exc_info=True)
-            raise RAGGenerationError("Answer generation failed") from exc
+    def _stream_tokens(self, prompt: str) -> Iterator[str]:
+        for chunk in self.llm.stream([HumanMessage(content=prompt)]):
+            if chunk.content:
+                yield chunk.content
 
     # --------------------------------------------------------
     # Citation Node
     # --------------------------------------------------------
 
     def _citation_node(self, state: RAGState) -> Dict:
-        citations = []
-
-        for d in state["retrieved_docs"]:
-            citations.append(
-                {
-                    "source": d.metadata.get("source"),
-                    "page": d.metadata.get("page"),
-                }
-            )
+        trace: Dict = {}
+
+        with timed("cite", trace):
+            citations = []
 
-        # Deduplicate citations
-        unique = [dict(t) for t in {tuple(c.items()) for c in citations}]
+            # Cite what the answer was generated from
+            for d in state["context_docs"] or state["retrieved_docs"]:
+                citations.append(
+                    {
+                        "source": d.metadata.get("source"),
+                        "page": d.metadata.get("page"),
+                    }
+                )
 
-        return {"citations": unique}
+            # Deduplicate citations
+            unique = [dict(t) for t in {tuple(c.items()) for c in citations}]
+
+        observe_size("cite", "citations", len(unique), trace)
+
+        return {"citations": unique, "trace": trace}
 
     # --------------------------------------------------------
     # Graph Builder
     # --------------------------------------------------------
 
     def _build_graph(self):
+        return self._compile_graph(
+            self._retrieve_node,
+            self._pack_node,
+            self._generate_node,
+            self._citation_node,
+            self._rerank_node if self.reranker else None,
+        )
+
+    def _build_async_graph(self):
+        """
+        Same topology with asyncio-native nodes, for ``ainvoke``/``astream``.
+        Citation building is trivial and stays synchronous.
+        """
+
+        return self._compile_graph(
+            self._aretrieve_node,
+            self._apack_node,
+            self._agenerate_node,
+            self._citation_node,
+            self._arerank_node if self.reranker else None,
+        )
+
+    @staticmethod
+    def _compile_graph(retrieve, pack, generate, cite, rerank=None):
         graph = StateGraph(RAGState)
 
-        graph.add_node("retrieve", self._retrieve_node)
-        graph.add_node("generate", self._generate_node)
-        graph.add_node("cite", self._citation_node)
+        graph.add_node("retrieve", retrieve)
+        graph.add_node("pack", pack)
+        graph.add_node("generate", generate)
+        graph.add_node("cite", cite)
 
         graph.set_entry_point("retrieve")
-        graph.add_edge("retrieve", "generate")
+        if rerank is not None:
+            graph.add_node("rerank", rerank)
+            graph.add_edge("retrieve", "rerank")
+            graph.add_edge("rerank", "pack")
+        else:
+            graph.add_edge("retrieve", "pack")
+        graph.add_edge("pack", "generate")
         graph.add_edge("generate", "cite")
 
         return graph.compile()
@@ -176,18 +471,57 @@ If the answer is not in the context, say "Not found in documents."
     # Public API
     # --------------------------------------------------------
 
-    def run(self, query: str) -> Dict:
-        logger.info("RAG pipeline invoked")
-
-        initial_state: RAGState = {
+    @staticmethod
+    def _initial_state(query: str) -> RAGState:
+        return {
             "query": query,
             "retrieved_docs": [],
+            "context_docs": [],
             "answer": "",
             "citations": [],
             "retrieval_mode": "",
+            "source_filter": [],
+            "trace": {},
         }
 
-        result = self.graph.invoke(initial_state)
+    def _cached(self, query: str) -> Dict | None:
+        if self.answer_cache is None:
+            return None
+
+        trace: Dict = {}
+        with timed("answer_cache", trace):
+            cached = self.answer_cache.get(query, self.vectorstore.version)
+
+        EVENTS.inc(event="answer_cache", result="miss" if cached is None else "hit")
+
+        if cached is None:
+            return None
+
+        return {**cached, "query": query, "trace": {**trace, "answer_cache_hit": True}}
+
+    def _remember(self, query: str, result: Dict, version: int) -> None:
+        """
+        Cache an answer under the store version read before retrieval, so
+        one computed while the store changed is never served as current.
+        """
+
+        if self.answer_cache is not None:
+            self.answer_cache.put(query, result, version)
+
+    def run(self, query: str) -> Dict:
+        logger.info("RAG pipeline invoked")
+
+        cached = self._cached(query)
+        if cached is not None:
+            return cached
+
+        version = self.vectorstore.version
+        trace: Dict = {}
+        with timed("request", trace):
+            result = self.graph.invoke(self._initial_state(query))
+        result["trace"] = {**result["trace"], **trace}
+
+        self._remember(query, result, version)
 
         logger.info(
             "RAG pipeline completed | retrieval_mode=%s",
@@ -195,3 +529,243 @@ If the answer is not in the context, say "Not found in documents."
         )
 
         return result
+
+    def stream(self, query: str) -> Generator[Dict, None, None]:
+        """
+        Run the graph and yield events as they become available.
+
+        Events, in order:
+        - ``{"type": "retrieval", "retrieved_docs": [...], "context_docs": [...],
+          "retrieval_mode": str}`` once retrieval, reranking and context
+          packing are done: ``retrieved_docs`` in final (reranked) order,
+          ``context_docs`` the ones sent to the LLM
+        - ``{"type": "token", "content": str}`` for each generated token
+        - ``{"type": "citations", "citations": [...]}``
+        - ``{"type": "trace", "trace": {...}}`` with per-stage timings
+        """
+
+        logger.info("RAG pipeline invoked (streaming)")
+
+        cached = self._cached(query)
+        if cached is not None:
+            yield from self._cached_events(cached)
+            return
+
+        version = self.vectorstore.version
+        result = self._initial_state(query)
+        start = time.perf_counter()
+
+        for mode, payload in self.graph.stream(
+            self._initial_state(query),
+            stream_mode=["updates", "messages"],
+        ):
+            yield from self._stream_events(mode, payload, result)
+
+        observe_seconds("request", time.perf_counter() - start, result["trace"])
+        yield {"type": "trace", "trace": result["trace"]}
+
+        self._remember(query, result, version)
+
+        logger.info("RAG pipeline completed (streaming)")
+
+    async def arun(self, query: str) -> Dict:
+        """
+        Async ``run``: the LLM is called with native async streaming and
+        retrieval runs on a worker thread, so one event loop can serve
+        many concurrent requests.
+        """
+
+        logger.info("RAG pipeline invoked (async)")
+
+        cached = await asyncio.to_thread(self._cached, query)
+        if cached is not None:
+            return cached
+
+        version = self.vectorstore.version
+        trace: Dict = {}
+        with timed("request", trace):
+            result = await self.async_graph.ainvoke(self._initial_state(query))
+        result["trace"] = {**result["trace"], **trace}
+
+        await asyncio.to_thread(self._remember, query, result, version)
+
+        logger.info(
+            "RAG pipeline completed (async) | retrieval_mode=%s",
+            result.get("retrieval_mode"),
+        )
+
+        return result
+
+    async def astream(self, query: str) -> AsyncIterator[Dict]:
+        """
+        Async ``stream``; yields the same events in the same order.
+        """
+
+        logger.info("RAG pipeline invoked (async streaming)")
+
+        cached = await asyncio.to_thread(self._cached, query)
+        if cached is not None:
+            for event in self._cached_events(cached):
+                yield event
+            return
+
+        version = self.vectorstore.version
+        result = self._initial_state(query)
+        start = time.perf_counter()
+
+        async for mode, payload in self.async_graph.astream(
+            self._initial_state(query),
+            stream_mode=["updates", "messages"],
+        ):
+            for event in self._stream_events(mode, payload, result):
+                yield event
+
+        observe_seconds("request", time.perf_counter() - start, result["trace"])
+        yield {"type": "trace", "trace": result["trace"]}
+
+        await asyncio.to_thread(self._remember, query, result, version)
+
+        logger.info("RAG pipeline completed (async streaming)")
+
+    def run_batch(
+        self,
+        queries: List[str],
+        max_concurrency: int | None = None,
+        return_exceptions: bool = False,
+    ) -> List[Dict]:
+        """
+        Answer many questions; results are in input order.
+
+        All queries are embedded in one model call, and the dense
+        searches of those without MMR or a source filter share one
+        batched FAISS search (in hybrid mode, BM25 and fusion then run
+        per query). The graphs then run concurrently, so up to
+        ``max_concurrency`` (default ``settings.LLM_MAX_CONCURRENCY``) LLM
+        calls overlap. With ``return_exceptions`` a failed question yields
+        its exception instead of failing the batch.
+        """
+
+        logger.info("RAG pipeline invoked (batch) | queries=%d", len(queries))
+
+        results: List = [self._cached(query) for query in queries]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+
+        version = self.vectorstore.version
+        trace: Dict = {}
+        with timed("request_batch", trace):
+            states = self._prefetched_states([queries[i] for i in pending])
+            outputs = self.graph.batch(
+                states,
+                config={"max_concurrency": max_concurrency or settings.LLM_MAX_CONCURRENCY},
+                return_exceptions=return_exceptions,
+            )
+
+        for i, result in zip(pending, outputs):
+            if isinstance(result, Exception):
+                results[i] = result
+                continue
+
+            result["trace"] = {**result["trace"], **trace, "batch_size": len(pending)}
+            self._remember(queries[i], result, version)
+            results[i] = result
+
+        logger.info(
+            "RAG pipeline completed (batch) | queries=%d | cached=%d | seconds=%.2f",
+            len(queries),
+            len(queries) - len(pending),
+            trace.get("request_batch_s", 0.0),
+        )
+
+        return results
+
+    def _prefetched_states(self, queries: List[str]) -> List[RAGState]:
+        """
+        Initial states, with retrieval already done for queries that need
+        neither MMR nor a source filter. The dense searches of those
+        queries share one batched FAISS search; in hybrid mode BM25 and
+        fusion then run per query.
+        """
+
+        states = [self._initial_state(query) for query in queries]
+        k = self._retrieval_k
+
+        try:
+            # Warms the query cache, so per-query retrieval skips the model
+            self.vectorstore.embedder.embed_queries(queries)
+
+            plain = [
+                state for state in states
+                if not is_comparative_query(state["query"])
+                and not self._sources_named_in(state["query"])
+            ]
+            if not plain:
+                return states
+
+            plain_queries = [state["query"] for state in plain]
+            trace: Dict = {}
+            with timed("retrieve", trace):
+                if settings.RETRIEVAL_MODE == "hybrid":
+                    batches = self.vectorstore.batch_hybrid_search(
+                        plain_queries,
+                        k=k,
+                        fetch_k=max(20, k),
+                    )
+                    mode = "HYBRID"
+                else:
+                    batches = self.vectorstore.batch_similarity_search(plain_queries, k=k)
+                    mode = "SIMILARITY"
+        except Exception:
+            # The graph retrieves each query itself instead
+            logger.error("Batch retrieval failed, retrieving per query", exc_info=True)
+            return states
+
+        for state, docs in zip(plain, batches):
+            state["retrieved_docs"] = docs
+            state["retrieval_mode"] = mode
+            state["trace"] = {**trace, "retrieve_batched": len(plain)}
+            observe_size("retrieve", "docs", len(docs), state["trace"])
+
+        return states
+
+    @staticmethod
+    def _cached_events(cached: Dict) -> List[Dict]:
+        return [
+            {
+                "type": "retrieval",
+                "retrieved_docs": cached["retrieved_docs"],
+                "context_docs": cached["context_docs"],
+                "retrieval_mode": cached["retrieval_mode"],
+            },
+            {"type": "token", "content": cached["answer"]},
+            {"type": "citations", "citations": cached["citations"]},
+            {"type": "trace", "trace": cached["trace"]},
+        ]
+
+    @staticmethod
+    def _stream_events(mode: str, payload, result: Dict) -> List[Dict]:
+        """
+        Translate one graph stream item into UI events, folding node
+        updates into ``result`` along the way.
+        """
+
+        if mode == "messages":
+            chunk, _ = payload
+            return [{"type": "token", "content": chunk.content}] if chunk.content else []
+
+        for update in payload.values():
+            trace = merge_trace(result["trace"], update.get("trace", {}))
+            result.update(update)
+            result["trace"] = trace
+
+        if "pack" in payload:
+            return [{
+                "type": "retrieval",
+                "retrieved_docs": result["retrieved_docs"],
+                "context_docs": result["context_docs"],
+                "retrieval_mode": result["retrieval_mode"],
+            }]
+        if "cite" in payload:
+            return [{"type": "citations", "citations": payload["cite"]["citations"]}]
+        return []
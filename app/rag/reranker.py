@@ -0,0 +1,165 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from app.core.logging import get_logger
+from app.core.config import settings
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RerankResult:
+    """
+    Reordered documents plus what the reranker did to produce them.
+    """
+
+    documents: List[Document]
+    reranked: bool
+    cached: int = 0
+    scored: int = 0
+    seconds: float = 0.0
+
+
+class CrossEncoderReranker:
+    """
+    Reorders retrieved chunks by a cross-encoder relevance score.
+
+    All uncached (query, chunk) pairs are scored in one batched
+    ``predict`` call on a dedicated worker thread. If that does not finish
+    within ``time_budget_s`` the original retrieval order is returned;
+    scoring that already started completes in the background and lands in
+    the score cache, so a repeated question is reranked without waiting.
+    While the worker is busy, new pairs are not queued behind it (cached
+    scores are still used), so a slow model cannot build up a backlog.
+
+    Create one per process (``ResourceRegistry.reranker``) and share it:
+    every instance loads its own model and worker thread.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        time_budget_s: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        cache_size: Optional[int] = None,
+    ) -> None:
+        self.model_name = model_name or settings.RERANK_MODEL
+        self.time_budget_s = (
+            settings.RERANK_TIME_BUDGET_MS / 1000
+            if time_budget_s is None
+            else time_budget_s
+        )
+        self.batch_size = batch_size or settings.RERANK_BATCH_SIZE
+        self.cache_size = settings.RERANK_CACHE_SIZE if cache_size is None else cache_size
+
+        self._model = None
+        self._model_lock = threading.Lock()
+        # One worker: the model is CPU-bound and scoring calls queue
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+        self._busy: Optional[Future] = None
+        self._busy_lock = threading.Lock()
+
+        # (query, chunk hash) -> score
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._scores_lock = threading.Lock()
+
+    def _cross_encoder(self):
+        with self._model_lock:
+            if self._model is None:
+                from sentence_transformers import CrossEncoder
+
+                logger.info(
+                    "Initializing reranker model | model=%s",
+                    self.model_name,
+                )
+                self._model = CrossEncoder(self.model_name)
+            return self._model
+
+    @staticmethod
+    def _chunk_key(doc: Document) -> str:
+        return hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest()
+
+    def _score(self, query: str, pending: Dict[str, Document]) -> Dict[str, float]:
+        keys = list(pending)
+        scores = self._cross_encoder().predict(
+            [(query, pending[key].page_content) for key in keys],
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+        )
+
+        result = {key: float(score) for key, score in zip(keys, scores)}
+
+        if self.cache_size > 0:
+            with self._scores_lock:
+                for key, score in result.items():
+                    self._scores[(query, key)] = score
+                while len(self._scores) > self.cache_size:
+                    self._scores.popitem(last=False)
+
+        return result
+
+    def rerank(self, query: str, docs: List[Document]) -> RerankResult:
+        start = time.perf_counter()
+        query = " ".join(query.split())
+        keys = [self._chunk_key(d) for d in docs]
+
+        scores: Dict[str, float] = {}
+        with self._scores_lock:
+            for key in keys:
+                score = self._scores.get((query, key))
+                if score is not None:
+                    self._scores.move_to_end((query, key))
+                    scores[key] = score
+
+        cached = len(scores)
+        pending = {key: doc for key, doc in zip(keys, docs) if key not in scores}
+
+        if pending:
+            with self._busy_lock:
+                if self._busy is not None and not self._busy.done():
+                    logger.warning(
+                        "Reranker busy, keeping retrieval order | candidates=%d",
+                        len(docs),
+                    )
+                    return RerankResult(
+                        documents=docs,
+                        reranked=False,
+                        cached=cached,
+                        seconds=time.perf_counter() - start,
+                    )
+                future = self._busy = self._executor.submit(self._score, query, pending)
+
+            remaining = self.time_budget_s - (time.perf_counter() - start)
+
+            try:
+                scores.update(future.result(timeout=max(0.0, remaining)))
+            except FutureTimeout:
+                logger.warning(
+                    "Rerank over time budget, keeping retrieval order | candidates=%d | budget_ms=%d",
+                    len(docs),
+                    self.time_budget_s * 1000,
+                )
+                return RerankResult(
+                    documents=docs,
+                    reranked=False,
+                    cached=cached,
+                    seconds=time.perf_counter() - start,
+                )
+
+        # Stable sort: ties keep retrieval order
+        order = sorted(range(len(docs)), key=lambda i: -scores[keys[i]])
+
+        return RerankResult(
+            documents=[docs[i] for i in order],
+            reranked=True,
+            cached=cached,
+            scored=len(pending),
+            seconds=time.perf_counter() - start,
+        )
@@ -0,0 +1,106 @@
+import json
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+import requests
+from langchain_core.documents import Document
+
+from app.core.logging import get_logger
+from app.core.exceptions import IngestionError, RAGGenerationError
+
+logger = get_logger(__name__)
+
+
+class APIClient:
+    """
+    Thin client for the query service (app/api/server.py).
+
+    ``stream`` yields the same events as ``RAGPipeline.stream``, so the UI
+    can use either interchangeably. With ``collection`` every call goes
+    to that named collection instead of the default store.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 300.0,
+        collection: Optional[str] = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.collection = collection
+        self._session = requests.Session()
+
+    @property
+    def _params(self) -> Dict:
+        return {"collection": self.collection} if self.collection else {}
+
+    def sources(self) -> List[str]:
+        response = self._session.get(
+            f"{self.base_url}/sources",
+            params=self._params,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def ingest(self, files: List[Tuple[str, Union[bytes, BinaryIO]]]) -> List[Dict]:
+        """
+        Upload (name, bytes or binary file) pairs; returns one result dict
+        per file.
+        """
+
+        for _, data in files:
+            if hasattr(data, "seek"):
+                data.seek(0)
+
+        try:
+            response = self._session.post(
+                f"{self.base_url}/ingest",
+                files=[("files", (name, data, "application/pdf")) for name, data in files],
+                params=self._params,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            raise IngestionError(f"Ingestion request failed: {exc}") from exc
+
+        return response.json()
+
+    def remove_source(self, source_name: str) -> None:
+        response = self._session.delete(
+            f"{self.base_url}/sources/{requests.utils.quote(source_name, safe='')}",
+            params=self._params,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+
+    def stream(self, query: str) -> Iterator[Dict]:
+        try:
+            response = self._session.post(
+                f"{self.base_url}/query",
+                json={"query": query, "stream": True, "collection": self.collection},
+                stream=True,
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+        except requests.RequestException as exc:
+            raise RAGGenerationError(f"Query request failed: {exc}") from exc
+
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data: "):
+                    continue
+
+                event = json.loads(line[len("data: "):])
+
+                if event["type"] == "error":
+                    raise RAGGenerationError(event["detail"])
+
+                for key in ("retrieved_docs", "context_docs"):
+                    if key in event:
+                        event[key] = [
+                            Document(page_content=d["content"], metadata=d["metadata"])
+                            for d in event[key]
+                        ]
+
+                yield event
@@ -1,5 +1,5 @@
 import streamlit as st
-import tempfile
+import hashlib
 import sys
 from pathlib import Path
 
@@ -16,13 +16,12 @@ if str(ROOT_DIR) not in sys.path:
 # -------------------------------------------------
 
 from app.core.logging import setup_logging, get_logger
-from app.core.exceptions import ProjectReportAnalyzerError
-from app.ingestion.pdf_loader import PDFLoader
-from app.chunking.page_classifier import PageClassifier
-from app.chunking.hybrid_chunker import HybridChunker
-from app.vectorstore.faiss_store import FAISSStore
-from app.rag.rag_pipeline import RAGPipeline
-from app.embeddings.embedder import Embedder
+from app.core.exceptions import ProjectReportAnalyzerError, IngestionError
+from app.core.config import settings
+from app.core.metrics import start_metrics_server
+from app.ingestion.pipeline import SourceFile
+from app.api.service import QueryService
+from app.ui.api_client import APIClient
 
 
 # -------------------------------------------------
@@ -32,6 +31,9 @@ from app.embeddings.embedder import Embedder
 setup_logging()
 logger = get_logger(__name__)
 
+if settings.METRICS_PORT:
+    start_metrics_server(settings.METRICS_PORT)
+
 st.set_page_config(
     page_title="Project Report Analyzer",
     layout="wide",
@@ -40,15 +42,20 @@ st.set_page_config(
 st.title("📄 Project Report Analyzer")
 st.caption(
     "Upload project reports and ask questions. "
-    "Answers are generated strictly from the documents with citations."
+    "Answers are generated strictly from the documents with citations. "
+    "Reports are indexed in one shared index, so questions also search "
+    "reports uploaded in other sessions."
 )
 
 # -------------------------------------------------
 # Session state initialization
 # -------------------------------------------------
 
-if "vectorstore" not in st.session_state:
-    st.session_state.vectorstore = None
+if "own_sources" not in st.session_state:
+    st.session_state.own_sources = {}  # name -> content hash of reports this session indexed
+
+if "failed_files" not in st.session_state:
+    st.session_state.failed_files = set()  # (name, content hash)
 
 if "rag_pipeline" not in st.session_state:
     st.session_state.rag_pipeline = None
@@ -56,6 +63,28 @@ if "rag_pipeline" not in st.session_state:
 if "messages" not in st.session_state:
     st.session_state.messages = []  # chat history
 
+# With API_BASE_URL set, models and index live in the query service and
+# this app is a thin client of it
+api = APIClient(settings.API_BASE_URL) if settings.API_BASE_URL else None
+
+
+@st.cache_resource(show_spinner="Loading models and index...")
+def local_service() -> QueryService:
+    """
+    Embedding model, LLM client, index and pipeline shared by all
+    sessions of this server process.
+    """
+    return QueryService()
+
+
+def content_hash(uploaded_file) -> str:
+    # A file re-uploaded under the same name but changed gets a new hash
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+
+if api is not None and st.session_state.rag_pipeline is None:
+    st.session_state.rag_pipeline = api  # same stream() events as RAGPipeline
+
 # -------------------------------------------------
 # File upload
 # -------------------------------------------------
@@ -70,46 +99,130 @@ uploaded_files = st.file_uploader(
 # Ingestion & indexing
 # -------------------------------------------------
 
-if uploaded_files and st.session_state.vectorstore is None:
-    with st.spinner("Processing documents..."):
-        try:
-            loader = PDFLoader()
-            classifier = PageClassifier()
-            chunker = HybridChunker()
-            embedder = Embedder()
-            store = FAISSStore(embedder)
-
-
-            all_documents = []
-
-            for uploaded_file in uploaded_files:
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                    tmp.write(uploaded_file.read())
-                    pdf_path = Path(tmp.name)
-
-                elements = loader.load([uploaded_file])
-                classified = classifier.classify(elements)
-                documents = chunker.chunk(classified)
-
-                # Attach source metadata
-                for doc in documents:
-                    doc.metadata["source"] = uploaded_file.name
-
-                all_documents.extend(documents)
-
-            store.build(all_documents)
-            store.save()
-
-            rag_pipeline = RAGPipeline(store)
-
-            st.session_state.vectorstore = store
-            st.session_state.rag_pipeline = rag_pipeline
-
-            st.success("Documents indexed successfully. You can start chatting below.")
+if api is not None:
+    st.caption(
+        "The document index is shared through the query service: reports are "
+        "added (or replaced by a changed upload of the same name) but never "
+        "removed from here, so clearing the uploader keeps them indexed."
+    )
 
-        except ProjectReportAnalyzerError as exc:
-            logger.error("Document processing failed", exc_info=True)
-            st.error(str(exc))
+if uploaded_files and api is not None:
+    # The service index is shared, so files are only ever added from here
+    if "sent_files" not in st.session_state:
+        st.session_state.sent_files = set()
+
+    keys = {f.name: (f.name, content_hash(f)) for f in uploaded_files}
+    new_files = [
+        f for f in uploaded_files
+        if keys[f.name] not in st.session_state.sent_files
+        and keys[f.name] not in st.session_state.failed_files
+    ]
+
+    if new_files:
+        with st.spinner("Processing documents..."):
+            try:
+                # The upload buffers are streamed as-is, without copying;
+                # a changed file replaces its previous version
+                results = api.ingest([(f.name, f) for f in new_files])
+
+                for r in results:
+                    if r["ok"]:
+                        st.session_state.sent_files.add(keys[r["name"]])
+                        st.caption(
+                            f"{r['name']}: {r['chunks']} chunks in {r['seconds']:.1f}s"
+                            + (" (cached)" if r["cached"] else "")
+                        )
+                    else:
+                        st.session_state.failed_files.add(keys[r["name"]])
+                        st.warning(f"Skipped {r['name']}: {r['error']}")
+
+                st.success("Documents indexed successfully. You can start chatting below.")
+
+            except ProjectReportAnalyzerError as exc:
+                logger.error("Document processing failed", exc_info=True)
+                st.error(str(exc))
+
+elif api is None and (uploaded_files or st.session_state.own_sources):
+    # Also runs with no files, so clearing the uploader removes this
+    # session's reports
+    service = local_service()
+    indexed = set(service.store.sources)
+    own_sources = st.session_state.own_sources
+    hashes = {f.name: content_hash(f) for f in uploaded_files or []}
+
+    # New reports, and this session's reports re-uploaded with changes
+    # (ingesting a known name replaces the previous version)
+    new_files = [
+        f for f in uploaded_files or []
+        if (f.name, hashes[f.name]) not in st.session_state.failed_files
+        and (
+            f.name not in indexed
+            or own_sources.get(f.name, hashes[f.name]) != hashes[f.name]
+        )
+    ]
+    # The index is shared between sessions: only remove what this session added
+    removed_sources = (set(own_sources) & indexed) - set(hashes)
+
+    # Another session's report is neither replaced nor removed from here
+    for name in sorted((set(hashes) & indexed) - set(own_sources)):
+        st.warning(
+            f"{name} is already in the shared index (added by another session "
+            "or an earlier run); this upload is not used. Rename the file to "
+            "index your version."
+        )
+
+    if new_files or removed_sources:
+        with st.spinner("Processing documents..."):
+            try:
+                for source_name in removed_sources:
+                    service.remove_source(source_name)
+                    own_sources.pop(source_name, None)
+
+                if new_files:
+                    progress_bar = st.empty()
+
+                    def show_progress(name: str, done: int, total: int) -> None:
+                        # Large reports are searchable range by range
+                        progress_bar.progress(done / total, text=f"{name}: page {done} of {total}")
+
+                    # getvalue() returns the upload's own buffer (no copy);
+                    # it is the only read of the file
+                    results = service.ingest(
+                        [SourceFile(name=f.name, data=f.getvalue()) for f in new_files],
+                        progress=show_progress,
+                    )
+                    progress_bar.empty()
+
+                    for r in results:
+                        if r.ok:
+                            own_sources[r.name] = hashes[r.name]
+                            st.caption(
+                                f"{r.name}: {len(r.documents)} chunks in {r.seconds:.1f}s"
+                                + (" (cached)" if r.cached else "")
+                            )
+                        else:
+                            st.session_state.failed_files.add((r.name, hashes[r.name]))
+                            st.warning(f"Skipped {r.name}: {r.error}")
+
+                    if not any(r.ok for r in results) and not service.ready:
+                        raise IngestionError("None of the uploaded documents could be processed")
+
+                st.success("Documents indexed successfully. You can start chatting below.")
+
+            except ProjectReportAnalyzerError as exc:
+                logger.error("Document processing failed", exc_info=True)
+                st.error(str(exc))
+
+if api is None:
+    try:
+        # Picks up indexes saved by other processes (cheap when unchanged)
+        local_service().refresh()
+
+        if st.session_state.rag_pipeline is None and local_service().ready:
+            st.session_state.rag_pipeline = local_service().pipeline
+    except ProjectReportAnalyzerError as exc:
+        logger.error("Loading the shared index failed", exc_info=True)
+        st.error(f"The document index could not be loaded: {exc}")
 
 # -------------------------------------------------
 # Render chat history
@@ -145,16 +258,22 @@ if query and st.session_state.rag_pipeline:
         full_answer = ""
 
         try:
-            result = st.session_state.rag_pipeline.run(query)
+            citations = []
+
+            for event in st.session_state.rag_pipeline.stream(query):
+                if event["type"] == "token":
+                    # Appending avoids re-joining every token on each update
+                    full_answer += event["content"]
+                    placeholder.markdown(full_answer + "▌")
+                elif event["type"] == "citations":
+                    citations = event["citations"]
 
-            # Render streamed / accumulated answer
-            full_answer = result["answer"]
             placeholder.markdown(full_answer)
 
             # Show sources below the answer
-            if result.get("citations"):
+            if citations:
                 st.markdown("**Sources:**")
-                for c in result["citations"]:
+                for c in citations:
                     st.markdown(
                         f"- **{c.get('source')}**, Page {c.get('page')}"
                     )
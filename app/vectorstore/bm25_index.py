@@ -0,0 +1,168 @@
+import heapq
+import json
+import math
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Words plus codes such as "EPC-2041/B" or "1.2", kept whole
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[./\-][a-z0-9]+)*")
+_THOUSANDS_RE = re.compile(r"(?<=\d),(?=\d{3})")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-case tokens for keyword matching.
+
+    Thousands separators are dropped so "1,250,000" matches "1250000",
+    and compound codes are indexed both whole and by their parts.
+    """
+
+    tokens: List[str] = []
+
+    for token in _TOKEN_RE.findall(_THOUSANDS_RE.sub("", text.lower())):
+        tokens.append(token)
+        if not token.isalnum():
+            tokens.extend(re.split(r"[./\-]", token))
+
+    return tokens
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[str]],
+    k: int = 60,
+) -> List[str]:
+    """
+    Fuse several ranked id lists: score(d) = sum(1 / (k + rank(d))).
+    """
+
+    scores: Dict[str, float] = {}
+
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+class BM25Index:
+    """
+    Incremental inverted index with Okapi BM25 scoring.
+
+    Built from the same chunks as the FAISS index and keyed by the same
+    docstore ids, so keyword and vector rankings can be fused directly.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        # term -> {doc_id: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add(self, doc_ids: Sequence[str], texts: Sequence[str]) -> None:
+        for doc_id, text in zip(doc_ids, texts):
+            counts = Counter(tokenize(text))
+
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+
+            length = sum(counts.values())
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+
+    def remove(self, doc_ids: Iterable[str]) -> None:
+        removed = set(doc_ids) & self._doc_lengths.keys()
+        if not removed:
+            return
+
+        for doc_id in removed:
+            self._total_length -= self._doc_lengths.pop(doc_id)
+
+        for term in list(self._postings):
+            postings = self._postings[term]
+            for doc_id in removed & postings.keys():
+                del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def search(
+        self,
+        query: str,
+        k: int,
+        allowed: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Return up to ``k`` (doc_id, score) pairs, best first.
+
+        When ``allowed`` is given only those documents are scored.
+        """
+
+        num_docs = len(self._doc_lengths)
+        if not num_docs:
+            return []
+
+        avg_length = self._total_length / num_docs
+        scores: Dict[str, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+
+            df = len(postings)
+            idf = math.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+
+            for doc_id, tf in postings.items():
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def save(self, path: Path) -> None:
+        tmp_path = Path(path).with_suffix(".tmp")
+
+        try:
+            with tmp_path.open("w", encoding="utf-8") as fh:
+                json.dump(
+                    {
+                        "k1": self.k1,
+                        "b": self.b,
+                        "postings": self._postings,
+                        "doc_lengths": self._doc_lengths,
+                    },
+                    fh,
+                )
+
+            tmp_path.replace(path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        with Path(path).open("r", encoding="utf-8") as fh:
+            data = json.load(fh)
+
+        index = cls(k1=data["k1"], b=data["b"])
+        index._postings = data["postings"]
+        index._doc_lengths = data["doc_lengths"]
+        index._total_length = sum(index._doc_lengths.values())
+
+        logger.info(
+            "BM25 index loaded | documents=%d | terms=%d",
+            len(index._doc_lengths),
+            len(index._postings),
+        )
+
+        return index
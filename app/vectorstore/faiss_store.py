@@ -1,44 +1,192 @@
+import functools
+import json
+import os
+import threading
+import uuid
+from itertools import islice
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import faiss
+import numpy as np
 
 from langchain_core.documents import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
 
 from app.core.logging import get_logger
 from app.core.exceptions import VectorStoreError
 from app.core.config import settings
+from app.core.concurrency import ReadWriteLock
+from app.core.metrics import timed
 from app.embeddings.embedder import Embedder
+from app.vectorstore.index_factory import (
+    TRAINED_TYPES,
+    configure_search,
+    create_index,
+    enable_reconstruct,
+    index_type_of,
+    min_training_vectors,
+    nlist_outgrown,
+)
+from app.vectorstore.sqlite_docstore import SQLiteDocstore
+from app.vectorstore.bm25_index import BM25Index, reciprocal_rank_fusion
+from app.vectorstore.filters import SearchFilter
+from app.vectorstore.mmr import maximal_marginal_relevance
 
 logger = get_logger(__name__)
 
+INDEX_FILE = "index.faiss"
+DOCSTORE_FILE = "docstore.sqlite"
+LEGACY_DOCSTORE_FILE = "index.pkl"
+BM25_FILE = "bm25.json"
+# Names the files of the current save; replacing it switches versions
+MANIFEST_FILE = "manifest.json"
+
+
+def persisted_files(path: Path) -> Optional[Dict[str, Path]]:
+    """
+    Files of the store saved in ``path`` (keys ``index``, ``docstore``
+    and ``bm25``), None if nothing was saved there.
+
+    Stores saved before manifests were introduced use fixed file names.
+    """
+
+    try:
+        names = json.loads((path / MANIFEST_FILE).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        if not (path / INDEX_FILE).exists():
+            return None
+        names = {"index": INDEX_FILE, "docstore": DOCSTORE_FILE, "bm25": BM25_FILE}
+
+    return {key: path / name for key, name in names.items()}
+
+
+def _remove_files(paths: List[Path]) -> None:
+    for file_path in paths:
+        try:
+            file_path.unlink(missing_ok=True)
+        except OSError:
+            # Still open elsewhere on some platforms; the file is harmless
+            logger.warning("Could not remove file | path=%s", file_path)
+
+
+@dataclass
+class SearchHits:
+    """
+    Nearest chunks to a query vector, closest first: docstore ids,
+    documents, squared L2 distances and, if requested, the stored vectors.
+    """
+
+    ids: List[str]
+    documents: List[Document]
+    distances: np.ndarray
+    vectors: Optional[np.ndarray] = None
+
+
+def _locked(mode: str):
+    """
+    Run a FAISSStore method under the store's read or write lock.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with getattr(self._lock, mode)():
+                return method(self, *args, **kwargs)
+        return wrapper
+
+    return decorator
+
 
 class FAISSStore:
     """
     FAISS vector store wrapper for indexing and retrieval.
+
+    The index type (flat, IVF-Flat, HNSW or IVF-PQ) is chosen through
+    ``settings.FAISS_INDEX_TYPE`` unless passed explicitly, and the store
+    persists to ``path`` (default ``settings.VECTOR_STORE_DIR``).
+
+    Safe to share between threads: searches run concurrently, while
+    build, add, remove and load hold the index exclusively.
     """
 
-    def __init__(self, embedder: Embedder) -> None:
+    def __init__(
+        self,
+        embedder: Embedder,
+        index_type: str | None = None,
+        path: str | Path | None = None,
+    ) -> None:
         self._embedder = embedder
+        self.index_type = (index_type or settings.FAISS_INDEX_TYPE).lower()
+        self.path = Path(path or settings.VECTOR_STORE_DIR)
         self._vectorstore: FAISS | None = None
+        # source file name -> docstore ids of its chunks
+        self._source_ids: Dict[str, List[str]] = {}
+        # docstore id -> (source, page, category), for filtering
+        self._doc_meta: Dict[str, Tuple] = {}
+        # docstore id -> FAISS position, rebuilt lazily per version
+        self._positions: Dict[str, int] = {}
+        self._positions_version = -1
+        # Bumped on every index change so caches can detect staleness
+        self.version = 0
+        # True while the index is memory-mapped from disk
+        self._read_only = False
+        # Keyword index over the same chunks and ids
+        self._bm25 = BM25Index()
+        # Searches share the index; changes to it are exclusive
+        self._lock = ReadWriteLock()
+        self._save_lock = threading.Lock()
+
+    @property
+    def embedder(self) -> Embedder:
+        return self._embedder
 
-    def build(self, documents: List[Document]) -> None:
+    @property
+    def sources(self) -> List[str]:
+        """
+        Names of the source files currently indexed.
+        """
+        return list(self._source_ids)
+
+    @_locked("write")
+    def build(
+        self,
+        documents: List[Document],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> None:
         """
         Build a FAISS index from documents.
+
+        Vectors come from ``Embedder`` unless ``embeddings`` is given
+        (one row per document, e.g. restored from the ingestion cache).
         """
 
         if not documents:
             raise VectorStoreError("No documents provided for indexing")
 
         logger.info(
-            "Building FAISS index | documents=%d",
+            "Building FAISS index | documents=%d | type=%s",
             len(documents),
+            self.index_type,
         )
 
+        vectors = self._vectors_for(documents, embeddings)
+
         try:
-            self._vectorstore = FAISS.from_documents(
-                documents=documents,
-                embedding=self._embedder._embedding_model,
+            self._vectorstore = FAISS(
+                embedding_function=self._embedder._embedding_model,
+                index=create_index(vectors, self.index_type),
+                docstore=InMemoryDocstore(),
+                index_to_docstore_id={},
             )
+            self._read_only = False
+            self._source_ids = {}
+            self._doc_meta = {}
+            self._bm25 = BM25Index()
+            with timed("index_build"):
+                self._append(documents, vectors)
         except Exception as exc:
             logger.error(
                 "FAISS index creation failed",
@@ -48,15 +196,325 @@ class FAISSStore:
 
         logger.info("FAISS index built successfully")
 
-    def save(self) -> None:
+    @_locked("write")
+    def add_documents(
+        self,
+        documents: List[Document],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> None:
         """
-        Persist the FAISS index to disk.
+        Add documents to the existing index without rebuilding it.
+
+        Only the new documents are embedded (or ``embeddings`` is used),
+        so the cost is proportional to the added content. Builds a new
+        index if none exists yet.
+        """
+
+        if not documents:
+            raise VectorStoreError("No documents provided for indexing")
+
+        if not self._vectorstore:
+            self.build(documents, embeddings=embeddings)
+            return
+
+        logger.info(
+            "Adding documents to FAISS index | documents=%d",
+            len(documents),
+        )
+
+        vectors = self._vectors_for(documents, embeddings)
+
+        try:
+            with timed("index_add"):
+                self._append(documents, vectors)
+                self._train_if_due()
+        except Exception as exc:
+            logger.error(
+                "Adding documents to FAISS index failed",
+                exc_info=True,
+            )
+            raise VectorStoreError("Failed to add documents to FAISS index") from exc
+
+        logger.info(
+            "Documents added | total=%d",
+            self._vectorstore.index.ntotal,
+        )
+
+    def _train_if_due(self) -> None:
+        """
+        Train the requested IVF type once the store has grown enough:
+        replace the flat index that stands in for it (too few vectors at
+        build time), and retrain IVF-Flat when its automatic list count
+        has been outgrown. Vectors keep their positions.
+
+        IVF-PQ only stores compressed codes, so retraining it from them
+        would compound the loss; a warning asks for a rebuild instead.
+        """
+
+        index = self._vectorstore.index
+        current = index_type_of(index)
+        if self.index_type not in TRAINED_TYPES:
+            return
+
+        if current == "flat":
+            if index.ntotal < min_training_vectors(self.index_type, index.ntotal):
+                return
+        elif current == self.index_type and nlist_outgrown(index):
+            if current == "ivf_pq":
+                logger.warning(
+                    "IVF-PQ index has outgrown its list count; rebuild the store "
+                    "to retrain it | vectors=%d | nlist=%d",
+                    index.ntotal,
+                    faiss.extract_index_ivf(index).nlist,
+                )
+                return
+        else:
+            return
+
+        vectors = self._vectors_at(np.arange(index.ntotal))
+        new_index = create_index(vectors, self.index_type)
+        new_index.add(vectors)
+        self._vectorstore.index = new_index
+
+        logger.info(
+            "FAISS index trained | type=%s | vectors=%d",
+            self.index_type,
+            new_index.ntotal,
+        )
+
+    def _vectors_for(
+        self,
+        documents: List[Document],
+        embeddings: Optional[np.ndarray],
+    ) -> np.ndarray:
+        """
+        Return a contiguous float32 matrix with one row per document.
+        """
+
+        if embeddings is None:
+            return self._embedder.embed_documents(documents)
+
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        if vectors.ndim != 2 or len(vectors) != len(documents):
+            raise VectorStoreError(
+                "Number of embeddings does not match number of documents"
+            )
+
+        return vectors
+
+    def _append(self, documents: List[Document], vectors: np.ndarray) -> None:
+        """
+        Add vectors to the FAISS index and register their documents.
+        """
+
+        self._ensure_writable()
+
+        ids = [str(uuid.uuid4()) for _ in documents]
+        offset = self._vectorstore.index.ntotal
+
+        self._vectorstore.index.add(vectors)
+        self._vectorstore.docstore.add(dict(zip(ids, documents)))
+        self._vectorstore.index_to_docstore_id.update(
+            {offset + i: doc_id for i, doc_id in enumerate(ids)}
+        )
+
+        self._bm25.add(ids, [doc.page_content for doc in documents])
+        self._track(documents, ids)
+        self.version += 1
+
+    @_locked("write")
+    def remove_source(self, source_name: str) -> int:
+        """
+        Remove every chunk of a source file from the index.
+
+        Returns the number of removed chunks.
+        """
+
+        if not self._vectorstore:
+            raise VectorStoreError("FAISS index is not initialized")
+
+        ids = self._source_ids.get(source_name)
+        if not ids:
+            raise VectorStoreError(f"Source not found in index: {source_name}")
+
+        logger.info(
+            "Removing source from FAISS index | source=%s | chunks=%d",
+            source_name,
+            len(ids),
+        )
+
+        self._ensure_writable()
+
+        try:
+            if index_type_of(self._vectorstore.index) == "flat":
+                # Flat removal compacts positions, as LangChain's id map does
+                self._vectorstore.delete(ids)
+            else:
+                # HNSW graphs do not support removal, and IVF removal keeps
+                # the original positions, which would no longer match the
+                # compacted id map
+                self._rebuild_without(set(ids))
+        except Exception as exc:
+            logger.error(
+                "Removing source from FAISS index failed",
+                exc_info=True,
+            )
+            raise VectorStoreError(
+                f"Failed to remove source from FAISS index: {source_name}"
+            ) from exc
+
+        self._bm25.remove(ids)
+        for doc_id in ids:
+            self._doc_meta.pop(doc_id, None)
+        del self._source_ids[source_name]
+        self.version += 1
+
+        return len(ids)
+
+    @_locked("read")
+    def export_source(self, source_name: str) -> Tuple[List[Document], np.ndarray]:
+        """
+        Return the chunks of a source file and their stored vectors, in a
+        form ``add_documents`` accepts, e.g. to restore a replaced report.
+
+        IVF-PQ stores compressed codes, so its vectors are approximations.
+        """
+
+        if not self._vectorstore:
+            raise VectorStoreError("FAISS index is not initialized")
+
+        ids = self._source_ids.get(source_name)
+        if not ids:
+            raise VectorStoreError(f"Source not found in index: {source_name}")
+
+        lookup = self._position_lookup()
+        positions = np.array([lookup[doc_id] for doc_id in ids], dtype=np.int64)
+        documents = [doc for _, doc in self._lookup(ids)]
+
+        return documents, np.array(self._vectors_at(positions), dtype=np.float32)
+
+    def _rebuild_without(self, removed_ids: set) -> None:
+        """
+        Rebuild the index from its own stored vectors, minus some ids, so
+        the kept vectors sit at positions 0..n-1 in id-map order.
+
+        IVF indexes keep their trained quantizer; IVF-PQ vectors are
+        re-encoded from their decoded codes, which is close to lossless.
+        """
+
+        index = self._vectorstore.index
+        docstore = self._vectorstore.docstore
+
+        keep = [
+            (position, doc_id)
+            for position, doc_id in sorted(self._vectorstore.index_to_docstore_id.items())
+            if doc_id not in removed_ids
+        ]
+        vectors = (
+            index.reconstruct_batch(np.array([position for position, _ in keep], dtype=np.int64))
+            if keep
+            else np.empty((0, index.d), dtype=np.float32)
+        )
+
+        if index_type_of(index) == "hnsw":
+            new_index = create_index(vectors, "hnsw")
+        else:
+            new_index = faiss.clone_index(index)
+            new_index.reset()
+            enable_reconstruct(new_index)
+            configure_search(new_index)
+
+        if keep:
+            new_index.add(vectors)
+
+        docstore.delete(list(removed_ids))
+        self._vectorstore.index = new_index
+        self._vectorstore.index_to_docstore_id = {
+            i: doc_id for i, (_, doc_id) in enumerate(keep)
+        }
+
+    def _track(self, documents: List[Document], ids: List[str]) -> None:
+        for doc, doc_id in zip(documents, ids):
+            self._register(
+                doc_id,
+                doc.metadata.get("source"),
+                doc.metadata.get("page"),
+                doc.metadata.get("category"),
+            )
+
+    def _register(
+        self,
+        doc_id: str,
+        source: Optional[str],
+        page: Optional[int],
+        category: Optional[str],
+    ) -> None:
+        self._source_ids.setdefault(source, []).append(doc_id)
+        self._doc_meta[doc_id] = (source, page, category)
+
+    def _rebuild_source_index(self) -> None:
+        """
+        Recreate the per-source id index from the loaded docstore.
+        """
+
+        self._source_ids = {}
+        self._doc_meta = {}
+        docstore = self._vectorstore.docstore
+
+        if isinstance(docstore, SQLiteDocstore):
+            # Metadata columns only, no chunk text
+            for doc_id, source, page, category in docstore.iter_metadata():
+                self._register(doc_id, source, page, category)
+            return
+
+        for doc_id in self._vectorstore.index_to_docstore_id.values():
+            doc = docstore.search(doc_id)
+            if isinstance(doc, Document):
+                self._register(
+                    doc_id,
+                    doc.metadata.get("source"),
+                    doc.metadata.get("page"),
+                    doc.metadata.get("category"),
+                )
+
+    def _ensure_writable(self) -> None:
+        """
+        Swap a memory-mapped, read-only store for private in-memory copies
+        before the first modification. Pages stay shared until then.
+        """
+
+        if not self._read_only:
+            return
+
+        logger.info("Copying memory-mapped FAISS index into memory for writing")
+
+        index = faiss.deserialize_index(
+            faiss.serialize_index(self._vectorstore.index)
+        )
+        configure_search(index)
+
+        self._vectorstore.index = index
+        self._ensure_in_memory_docstore()
+        self._read_only = False
+
+    @_locked("read")
+    def save(self, path: str | Path | None = None) -> None:
+        """
+        Persist the FAISS index to ``path`` (default ``self.path``).
+
+        Writes a new version of ``index-*.faiss`` (native FAISS format),
+        ``docstore-*.sqlite`` (chunk text, metadata and the position -> id
+        map) and ``bm25-*.json``, then points ``manifest.json`` at them
+        with a single rename. Readers see the old or the new version,
+        never a mix; the old files are removed afterwards. No pickle is
+        involved.
         """
 
         if not self._vectorstore:
             raise VectorStoreError("FAISS index is not initialized")
 
-        path = Path(settings.VECTOR_STORE_DIR)
+        path = Path(path) if path else self.path
         path.mkdir(parents=True, exist_ok=True)
 
         logger.info(
@@ -65,7 +523,9 @@ class FAISSStore:
         )
 
         try:
-            self._vectorstore.save_local(str(path))
+            # Searches may continue while saving; concurrent saves may not
+            with self._save_lock:
+                self._save_version(path)
         except Exception as exc:
             logger.error(
                 "Failed to save FAISS index",
@@ -73,12 +533,53 @@ class FAISSStore:
             )
             raise VectorStoreError("Failed to save FAISS index") from exc
 
-    def load(self) -> None:
+    def _save_version(self, path: Path) -> None:
+        previous = persisted_files(path)
+        version = uuid.uuid4().hex[:12]
+        names = {
+            "index": f"index-{version}.faiss",
+            "docstore": f"docstore-{version}.sqlite",
+            "bm25": f"bm25-{version}.json",
+        }
+        manifest_tmp = path / f"{MANIFEST_FILE}.{version}.tmp"
+        switched = False
+
+        try:
+            faiss.write_index(self._vectorstore.index, str(path / names["index"]))
+            SQLiteDocstore.write(
+                path / names["docstore"],
+                self._vectorstore.index_to_docstore_id,
+                self._vectorstore.docstore,
+            )
+            self._bm25.save(path / names["bm25"])
+
+            manifest_tmp.write_text(json.dumps(names), encoding="utf-8")
+            os.replace(manifest_tmp, path / MANIFEST_FILE)
+            switched = True
+        finally:
+            if switched:
+                # Open handles keep the old version readable until released
+                superseded = list(previous.values()) if previous else []
+                superseded.append(path / LEGACY_DOCSTORE_FILE)
+            else:
+                superseded = [path / name for name in names.values()]
+                superseded.append(manifest_tmp)
+            _remove_files(superseded)
+
+    @_locked("write")
+    def load(self, mmap: bool | None = None, path: str | Path | None = None) -> None:
         """
-        Load a persisted FAISS index from disk.
+        Load a persisted FAISS index from ``path`` (default ``self.path``),
+        which becomes the store's path.
+
+        With ``mmap`` (default ``settings.VECTOR_STORE_MMAP``) the index is
+        memory-mapped read-only and chunks are read from SQLite on demand,
+        so start-up is near-instant and processes share pages. The store
+        switches to private copies on the first modification.
         """
 
-        path = Path(settings.VECTOR_STORE_DIR)
+        path = Path(path) if path else self.path
+        mmap = settings.VECTOR_STORE_MMAP if mmap is None else mmap
 
         if not path.exists():
             raise VectorStoreError(
@@ -86,16 +587,47 @@ class FAISSStore:
             )
 
         logger.info(
-            "Loading FAISS index | path=%s",
+            "Loading FAISS index | path=%s | mmap=%s",
             path.resolve(),
+            mmap,
         )
 
+        files = persisted_files(path)
+        if files is None:
+            raise VectorStoreError(f"No saved FAISS index in {path}")
+
         try:
-            self._vectorstore = FAISS.load_local(
-                str(path),
-                self._embedder._embedding_model,
-                allow_dangerous_deserialization=True,
-            )
+            if files["docstore"].exists():
+                index = self._read_index(files["index"], mmap)
+                docstore = SQLiteDocstore(files["docstore"], read_only=True)
+
+                self._vectorstore = FAISS(
+                    embedding_function=self._embedder._embedding_model,
+                    index=index,
+                    docstore=docstore,
+                    index_to_docstore_id=docstore.load_index_map(),
+                )
+                self._read_only = mmap
+
+                if not mmap:
+                    self._ensure_in_memory_docstore()
+
+            elif settings.VECTOR_STORE_ALLOW_PICKLE:
+                logger.warning("Loading legacy pickle docstore | path=%s", path)
+
+                self._vectorstore = FAISS.load_local(
+                    str(path),
+                    self._embedder._embedding_model,
+                    allow_dangerous_deserialization=True,
+                )
+                self._read_only = False
+            else:
+                raise VectorStoreError(
+                    f"No {DOCSTORE_FILE} in {path}. Legacy pickle stores need "
+                    "VECTOR_STORE_ALLOW_PICKLE=true once; saving converts them."
+                )
+        except VectorStoreError:
+            raise
         except Exception as exc:
             logger.error(
                 "Failed to load FAISS index",
@@ -103,24 +635,342 @@ class FAISSStore:
             )
             raise VectorStoreError("Failed to load FAISS index") from exc
 
+        # Indexes saved with a hashtable direct map cannot reconstruct
+        enable_reconstruct(self._vectorstore.index)
+        configure_search(self._vectorstore.index)
+        loaded_type = index_type_of(self._vectorstore.index)
+        if loaded_type != "flat" or self.index_type not in TRAINED_TYPES:
+            # A flat index may stand in for an untrained IVF type
+            self.index_type = loaded_type
+        self._rebuild_source_index()
+        self._load_bm25(files["bm25"])
+        self.path = path
+        self.version += 1
+
         logger.info("FAISS index loaded successfully")
 
-    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+    @staticmethod
+    def _read_index(index_path: Path, mmap: bool) -> faiss.Index:
+        if not mmap:
+            return faiss.read_index(str(index_path))
+
+        flags = (
+            faiss.IO_FLAG_MMAP
+            | faiss.IO_FLAG_READ_ONLY
+            # Memory-maps flat codes as well (newer FAISS releases)
+            | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+        )
+
+        try:
+            return faiss.read_index(str(index_path), flags)
+        except RuntimeError:
+            logger.warning(
+                "Memory-mapped read not supported for this index, reading into memory",
+                exc_info=True,
+            )
+            return faiss.read_index(str(index_path))
+
+    def _load_bm25(self, bm25_path: Path) -> None:
+        if bm25_path.exists():
+            self._bm25 = BM25Index.load(bm25_path)
+            return
+
+        logger.info("No keyword index on disk, rebuilding from docstore")
+
+        docstore = self._vectorstore.docstore
+        doc_ids = list(self._vectorstore.index_to_docstore_id.values())
+        texts = []
+        for doc_id in doc_ids:
+            doc = docstore.search(doc_id)
+            texts.append(doc.page_content if isinstance(doc, Document) else "")
+
+        self._bm25 = BM25Index()
+        self._bm25.add(doc_ids, texts)
+
+    def _ensure_in_memory_docstore(self) -> None:
+        sqlite_docstore = self._vectorstore.docstore
+
+        if not isinstance(sqlite_docstore, SQLiteDocstore):
+            return
+
+        self._vectorstore.docstore = InMemoryDocstore(
+            dict(sqlite_docstore.iter_documents())
+        )
+        sqlite_docstore.close()
+
+    # --------------------------------------------------------
+    # Search
+    # --------------------------------------------------------
+
+    def _position_lookup(self) -> Dict[str, int]:
+        """
+        docstore id -> FAISS position. Positions shift when ids are
+        removed, so the map is rebuilt whenever the index version changes.
+        """
+
+        if self._positions_version != self.version:
+            self._positions = {
+                doc_id: position
+                for position, doc_id in self._vectorstore.index_to_docstore_id.items()
+            }
+            self._positions_version = self.version
+
+        return self._positions
+
+    def _candidate_ids(self, search_filter: SearchFilter) -> List[str]:
+        """
+        Ids matching a filter. Source filters start from the per-source
+        id index, so other reports are never touched.
+        """
+
+        if search_filter.sources is not None:
+            ids = [
+                doc_id
+                for source in search_filter.sources
+                for doc_id in self._source_ids.get(source, [])
+            ]
+        else:
+            ids = list(self._doc_meta)
+
+        if search_filter.page_range is None and search_filter.category is None:
+            return ids
+
+        return [
+            doc_id
+            for doc_id in ids
+            if search_filter.matches(*self._doc_meta[doc_id])
+        ]
+
+    @staticmethod
+    def _search_params(index: faiss.Index, selector: faiss.IDSelector):
+        # Explicit params override the index defaults, so carry them over
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+
+        if hasattr(index, "hnsw"):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+
+        return faiss.SearchParameters(sel=selector)
+
+    def _search(
+        self,
+        vector: np.ndarray,
+        k: int,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (distances, positions) of the nearest neighbours.
+        """
+
+        distances, positions = self._search_many(vector, k, search_filter)
+        found = positions[0] != -1
+        return distances[0][found], positions[0][found]
+
+    def _search_many(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (distances, positions), one row per query vector, from a
+        single FAISS search; rows are padded with position -1.
+
+        With a filter, FAISS only scores the matching positions (through
+        an ``IDSelector``) instead of over-fetching and discarding.
+        """
+
+        index = self._vectorstore.index
+        queries = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, index.d)
+
+        if search_filter is None:
+            return index.search(queries, k)
+
+        lookup = self._position_lookup()
+        candidates = np.fromiter(
+            (lookup[doc_id] for doc_id in self._candidate_ids(search_filter)),
+            dtype=np.int64,
+        )
+
+        if not len(candidates):
+            return (
+                np.empty((len(queries), 0), dtype=np.float32),
+                np.empty((len(queries), 0), dtype=np.int64),
+            )
+
+        selector = faiss.IDSelectorBatch(candidates)
+        return index.search(
+            queries,
+            min(k, len(candidates)),
+            params=self._search_params(index, selector),
+        )
+
+    def _documents_at(self, positions: np.ndarray) -> List[Document]:
+        index_to_id = self._vectorstore.index_to_docstore_id
+        docstore = self._vectorstore.docstore
+
+        return [docstore.search(index_to_id[int(p)]) for p in positions]
+
+    def _lookup(self, doc_ids: List[str]) -> Iterator[Tuple[str, Document]]:
+        """
+        Yield (id, document) for ids found in the docstore, in order.
+
+        Keyword index entries can outlive their chunks; the docstore
+        answers a missing id with a message string, so those are skipped.
+        """
+
+        docstore = self._vectorstore.docstore
+
+        for doc_id in doc_ids:
+            doc = docstore.search(doc_id)
+            if isinstance(doc, Document):
+                yield doc_id, doc
+            else:
+                logger.warning("Skipping stale docstore id | id=%s", doc_id)
+
+    def _vectors_at(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Stored vectors at FAISS positions, one float32 row each.
+
+        Flat indexes are read through a zero-copy view of their vector
+        array; other types reconstruct all rows in one batched call.
+        """
+
+        index = self._vectorstore.index
+        positions = np.asarray(positions, dtype=np.int64)
+
+        if isinstance(index, faiss.IndexFlat):
+            stored = faiss.rev_swig_ptr(index.get_xb(), index.ntotal * index.d)
+            return stored.reshape(index.ntotal, index.d)[positions]
+
+        return index.reconstruct_batch(positions)
+
+    @_locked("read")
+    def search_by_vector(
+        self,
+        vector: np.ndarray,
+        k: int = 4,
+        search_filter: Optional[SearchFilter] = None,
+        with_vectors: bool = False,
+    ) -> SearchHits:
+        """
+        Nearest chunks to an already embedded query.
+
+        Used where the query is embedded once and searched in several
+        stores (e.g. the shards of a ``ShardedStore``).
+        """
+
+        return self._hits(vector, k, search_filter, with_vectors)[0]
+
+    @_locked("read")
+    def batch_search_by_vector(
+        self,
+        vectors: np.ndarray,
+        k: int = 4,
+        search_filter: Optional[SearchFilter] = None,
+        with_vectors: bool = False,
+    ) -> List[SearchHits]:
+        """
+        ``search_by_vector`` for each row of ``vectors``, in one FAISS search.
+        """
+
+        return self._hits(vectors, k, search_filter, with_vectors)
+
+    def _hits(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        search_filter: Optional[SearchFilter],
+        with_vectors: bool,
+    ) -> List[SearchHits]:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        num_queries = 1 if vectors.ndim == 1 else len(vectors)
+
+        if not self._vectorstore:
+            return [
+                SearchHits(ids=[], documents=[], distances=np.empty(0, dtype=np.float32))
+                for _ in range(num_queries)
+            ]
+
+        try:
+            distances, positions = self._search_many(vectors, k, search_filter)
+            index_to_id = self._vectorstore.index_to_docstore_id
+            hits = []
+
+            for row_distances, row_positions in zip(distances, positions):
+                found = row_positions != -1
+                row_positions = row_positions[found]
+                hits.append(SearchHits(
+                    ids=[index_to_id[int(p)] for p in row_positions],
+                    documents=self._documents_at(row_positions),
+                    distances=row_distances[found],
+                    vectors=(
+                        self._vectors_at(row_positions)
+                        if with_vectors and len(row_positions)
+                        else None
+                    ),
+                ))
+
+            return hits
+        except Exception as exc:
+            logger.error(
+                "Vector search failed",
+                exc_info=True,
+            )
+            raise VectorStoreError("Vector search failed") from exc
+
+    @_locked("read")
+    def keyword_search(
+        self,
+        query: str,
+        k: int = 4,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[Tuple[str, Document, float]]:
+        """
+        Best BM25 matches as (docstore id, document, score), best first.
+        """
+
+        if not self._vectorstore:
+            return []
+
+        allowed = self._allowed_ids(search_filter)
+        scores = dict(self._bm25.search(query, k, allowed=allowed))
+
+        return [
+            (doc_id, doc, scores[doc_id])
+            for doc_id, doc in self._lookup(list(scores))
+        ]
+
+    @_locked("read")
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[Document]:
         """
-        Perform similarity search.
+        Perform similarity search, optionally restricted by metadata.
         """
 
         if not self._vectorstore:
             raise VectorStoreError("FAISS index is not initialized")
 
         logger.info(
-            "Similarity search | k=%d | query='%s'",
+            "Similarity search | k=%d | filter=%s | query='%s'",
             k,
+            search_filter,
             query,
         )
 
         try:
-            return self._vectorstore.similarity_search(query, k=k)
+            with timed("search_similarity"):
+                _, positions = self._search(
+                    self._embedder.embed_query(query),
+                    k,
+                    search_filter,
+                )
+                return self._documents_at(positions)
         except Exception as exc:
             logger.error(
                 "Similarity search failed",
@@ -128,37 +978,226 @@ class FAISSStore:
             )
             raise VectorStoreError("Similarity search failed") from exc
 
+    @_locked("read")
+    def batch_similarity_search(
+        self,
+        queries: List[str],
+        k: int = 4,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[List[Document]]:
+        """
+        ``similarity_search`` for many queries: all of them are embedded
+        in one model call and searched with one FAISS search over the
+        query matrix. Results are in query order.
+        """
+
+        if not self._vectorstore:
+            raise VectorStoreError("FAISS index is not initialized")
+
+        if not queries:
+            return []
+
+        logger.info(
+            "Batch similarity search | queries=%d | k=%d | filter=%s",
+            len(queries),
+            k,
+            search_filter,
+        )
+
+        try:
+            with timed("search_similarity_batch"):
+                _, positions = self._search_many(
+                    self._embedder.embed_queries(queries),
+                    k,
+                    search_filter,
+                )
+                return [self._documents_at(row[row != -1]) for row in positions]
+        except Exception as exc:
+            logger.error(
+                "Batch similarity search failed",
+                exc_info=True,
+            )
+            raise VectorStoreError("Batch similarity search failed") from exc
+
+    @_locked("read")
     def mmr_search(
         self,
         query: str,
         k: int = 6,
         fetch_k: int = 20,
         lambda_mult: float = 0.5,
+        search_filter: Optional[SearchFilter] = None,
     ) -> List[Document]:
         """
         Perform Max Marginal Relevance (MMR) search.
+
+        The ``fetch_k`` candidate vectors are read in one batch and
+        diversified with a vectorized MMR, so ``fetch_k`` in the hundreds
+        costs little more than the nearest-neighbour search itself.
         """
 
         if not self._vectorstore:
             raise VectorStoreError("FAISS index is not initialized")
 
         logger.info(
-            "MMR search | k=%d | fetch_k=%d | lambda=%s",
+            "MMR search | k=%d | fetch_k=%d | lambda=%s | filter=%s",
             k,
             fetch_k,
             lambda_mult,
+            search_filter,
         )
 
         try:
-            return self._vectorstore.max_marginal_relevance_search(
-                query=query,
-                k=k,
-                fetch_k=fetch_k,
-                lambda_mult=lambda_mult,
-            )
+            with timed("search_mmr"):
+                vector = np.asarray(self._embedder.embed_query(query), dtype=np.float32)
+                _, positions = self._search(vector, fetch_k, search_filter)
+
+                if not len(positions):
+                    return []
+
+                selected = maximal_marginal_relevance(
+                    vector,
+                    self._vectors_at(positions),
+                    k=k,
+                    lambda_mult=lambda_mult,
+                )
+
+                return self._documents_at(positions[selected])
         except Exception as exc:
             logger.error(
                 "MMR search failed",
                 exc_info=True,
             )
             raise VectorStoreError("MMR search failed") from exc
+
+    @_locked("read")
+    def hybrid_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        rrf_k: int = 60,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[Document]:
+        """
+        Fuse vector and BM25 keyword rankings with reciprocal rank fusion.
+
+        Exact-match material (budgets, table cells, contract ids) that the
+        dense ranking misses is pulled up by the keyword ranking.
+        """
+
+        if not self._vectorstore:
+            raise VectorStoreError("FAISS index is not initialized")
+
+        logger.info(
+            "Hybrid search | k=%d | fetch_k=%d | filter=%s | query='%s'",
+            k,
+            fetch_k,
+            search_filter,
+            query,
+        )
+
+        try:
+            with timed("search_dense"):
+                _, positions = self._search(
+                    self._embedder.embed_query(query),
+                    fetch_k,
+                    search_filter,
+                )
+
+            return self._fused(
+                query,
+                positions,
+                k,
+                fetch_k,
+                rrf_k,
+                self._allowed_ids(search_filter),
+            )
+        except Exception as exc:
+            logger.error(
+                "Hybrid search failed",
+                exc_info=True,
+            )
+            raise VectorStoreError("Hybrid search failed") from exc
+
+    @_locked("read")
+    def batch_hybrid_search(
+        self,
+        queries: List[str],
+        k: int = 4,
+        fetch_k: int = 20,
+        rrf_k: int = 60,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[List[Document]]:
+        """
+        ``hybrid_search`` for many queries: the dense half is one model
+        call and one FAISS search over the query matrix; BM25 and fusion
+        then run per query. Results are in query order.
+        """
+
+        if not self._vectorstore:
+            raise VectorStoreError("FAISS index is not initialized")
+
+        if not queries:
+            return []
+
+        logger.info(
+            "Batch hybrid search | queries=%d | k=%d | fetch_k=%d | filter=%s",
+            len(queries),
+            k,
+            fetch_k,
+            search_filter,
+        )
+
+        try:
+            with timed("search_dense_batch"):
+                _, positions = self._search_many(
+                    self._embedder.embed_queries(queries),
+                    fetch_k,
+                    search_filter,
+                )
+
+            allowed = self._allowed_ids(search_filter)
+
+            return [
+                self._fused(query, row[row != -1], k, fetch_k, rrf_k, allowed)
+                for query, row in zip(queries, positions)
+            ]
+        except Exception as exc:
+            logger.error(
+                "Batch hybrid search failed",
+                exc_info=True,
+            )
+            raise VectorStoreError("Batch hybrid search failed") from exc
+
+    def _allowed_ids(self, search_filter: Optional[SearchFilter]) -> Optional[set]:
+        if search_filter is None:
+            return None
+        return set(self._candidate_ids(search_filter))
+
+    def _fused(
+        self,
+        query: str,
+        positions: np.ndarray,
+        k: int,
+        fetch_k: int,
+        rrf_k: int,
+        allowed: Optional[set],
+    ) -> List[Document]:
+        """
+        Fuse the dense hits at ``positions`` with the query's BM25 ranking.
+        """
+
+        index_to_id = self._vectorstore.index_to_docstore_id
+        dense_ids = [index_to_id[int(p)] for p in positions]
+
+        with timed("search_keyword"):
+            keyword_ids = [
+                doc_id
+                for doc_id, _ in self._bm25.search(query, fetch_k, allowed=allowed)
+            ]
+
+        fused = reciprocal_rank_fusion([dense_ids, keyword_ids], k=rrf_k)
+
+        # Stale ids are skipped, so read past k until k documents are found
+        return [doc for _, doc in islice(self._lookup(fused), k)]
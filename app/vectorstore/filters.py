@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass(frozen=True)
+class SearchFilter:
+    """
+    Restricts retrieval to chunks whose metadata matches.
+
+    ``sources`` are source file names, ``page_range`` is an inclusive
+    (first, last) page pair and ``category`` is TABLE or NARRATIVE.
+    Unset fields do not restrict.
+    """
+
+    sources: Optional[Tuple[str, ...]] = None
+    page_range: Optional[Tuple[int, int]] = None
+    category: Optional[str] = None
+
+    def matches(
+        self,
+        source: Optional[str],
+        page: Optional[int],
+        category: Optional[str],
+    ) -> bool:
+        if self.sources is not None and source not in self.sources:
+            return False
+
+        if self.page_range is not None:
+            first, last = self.page_range
+            if page is None or not first <= page <= last:
+                return False
+
+        if self.category is not None and category != self.category:
+            return False
+
+        return True
@@ -0,0 +1,205 @@
+import faiss
+import numpy as np
+
+from app.core.logging import get_logger
+from app.core.exceptions import VectorStoreError
+from app.core.config import settings
+
+logger = get_logger(__name__)
+
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+# Types that need training; below their minimum a flat index stands in
+TRAINED_TYPES = ("ivf_flat", "ivf_pq")
+
+# FAISS warns below ~39 training points per centroid
+MIN_POINTS_PER_CENTROID = 39
+
+# With fewer lists each probe scans a large share of the corpus, so IVF
+# is no faster than flat; automatic sizing waits for enough vectors
+MIN_AUTO_NLIST = 64
+
+# Retrain once the automatic list count has grown this much
+NLIST_GROWTH_FACTOR = 2
+
+
+def auto_nlist(num_vectors: int) -> int:
+    """
+    Pick an IVF list count of roughly 4 * sqrt(n), bounded by the number
+    of training points available per centroid.
+    """
+    return max(
+        1,
+        min(int(4 * np.sqrt(num_vectors)), num_vectors // MIN_POINTS_PER_CENTROID),
+    )
+
+
+def min_training_vectors(
+    index_type: str,
+    num_vectors: int,
+    nlist: int | None = None,
+    pq_nbits: int | None = None,
+) -> int:
+    """
+    Vectors needed to train ``index_type`` for a corpus of
+    ``num_vectors``; 0 for types that need no training.
+
+    With an automatic list count that is at least ``MIN_AUTO_NLIST``
+    lists' worth of training points.
+    """
+
+    if index_type not in TRAINED_TYPES:
+        return 0
+
+    nlist = nlist or settings.FAISS_NLIST or max(auto_nlist(num_vectors), MIN_AUTO_NLIST)
+    min_train = nlist * MIN_POINTS_PER_CENTROID
+
+    if index_type == "ivf_pq":
+        pq_nbits = pq_nbits or settings.FAISS_PQ_NBITS
+        min_train = max(min_train, (2 ** pq_nbits) * MIN_POINTS_PER_CENTROID)
+
+    return min_train
+
+
+def nlist_outgrown(index: faiss.Index) -> bool:
+    """
+    Whether an IVF index with an automatic list count now holds far more
+    vectors than its lists were sized for, so probes scan long lists.
+    """
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None or settings.FAISS_NLIST:
+        return False
+    return auto_nlist(index.ntotal) >= NLIST_GROWTH_FACTOR * ivf.nlist
+
+
+def create_index(
+    vectors: np.ndarray,
+    index_type: str | None = None,
+    nlist: int | None = None,
+    hnsw_m: int | None = None,
+    ef_construction: int | None = None,
+    pq_m: int | None = None,
+    pq_nbits: int | None = None,
+    train_sample_size: int | None = None,
+) -> faiss.Index:
+    """
+    Create an empty, trained FAISS index suited to ``vectors``.
+
+    IVF indexes are trained on a random sample of at most
+    ``train_sample_size`` rows. When there are too few vectors to train
+    the requested index the flat index is used instead (``FAISSStore``
+    trains the requested type once enough vectors have been added).
+    Vectors are not added; the caller does that so ids stay in its
+    control.
+    """
+
+    index_type = (index_type or settings.FAISS_INDEX_TYPE).lower()
+    num_vectors, dim = vectors.shape
+
+    if index_type not in INDEX_TYPES:
+        raise VectorStoreError(
+            f"Unknown FAISS index type: {index_type} (expected one of {INDEX_TYPES})"
+        )
+
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, hnsw_m or settings.FAISS_HNSW_M)
+        index.hnsw.efConstruction = ef_construction or settings.FAISS_EF_CONSTRUCTION
+        configure_search(index)
+        return index
+
+    pq_nbits = pq_nbits or settings.FAISS_PQ_NBITS
+    min_train = min_training_vectors(index_type, num_vectors, nlist, pq_nbits)
+    nlist = nlist or settings.FAISS_NLIST or auto_nlist(num_vectors)
+
+    if index_type == "ivf_flat":
+        description = f"IVF{nlist},Flat"
+    else:
+        pq_m = pq_m or settings.FAISS_PQ_M
+
+        if dim % pq_m:
+            raise VectorStoreError(
+                f"FAISS_PQ_M={pq_m} must divide the embedding dimension {dim}"
+            )
+
+        description = f"IVF{nlist},PQ{pq_m}x{pq_nbits}"
+
+    if num_vectors < min_train:
+        logger.warning(
+            "Too few vectors to train index, using flat until enough are added "
+            "| type=%s | vectors=%d | required=%d",
+            index_type,
+            num_vectors,
+            min_train,
+        )
+        return faiss.IndexFlatL2(dim)
+
+    sample_size = min(num_vectors, train_sample_size or settings.FAISS_TRAIN_SAMPLE_SIZE)
+    sample_size = max(sample_size, min_train)
+    sample = vectors
+    if sample_size < num_vectors:
+        rows = np.random.default_rng(0).choice(num_vectors, sample_size, replace=False)
+        sample = vectors[np.sort(rows)]
+
+    logger.info(
+        "Training FAISS index | factory=%s | sample=%d",
+        description,
+        len(sample),
+    )
+
+    index = faiss.index_factory(dim, description, faiss.METRIC_L2)
+    index.train(np.ascontiguousarray(sample, dtype=np.float32))
+    enable_reconstruct(index)
+    configure_search(index)
+
+    return index
+
+
+def enable_reconstruct(index: faiss.Index) -> None:
+    """
+    Let IVF indexes reconstruct stored vectors by position (MMR, removal).
+
+    Positions are always assigned sequentially by ``add``, so an array
+    direct map is enough; removal rebuilds the index rather than calling
+    ``remove_ids``.
+    """
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and ivf.direct_map.type != faiss.DirectMap.Array:
+        ivf.set_direct_map_type(faiss.DirectMap.Array)
+
+
+def configure_search(
+    index: faiss.Index,
+    nprobe: int | None = None,
+    ef_search: int | None = None,
+) -> None:
+    """
+    Apply query-time parameters (``nprobe`` for IVF, ``efSearch`` for
+    HNSW). These are not reliably persisted, so call this after loading.
+    """
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe or settings.FAISS_NPROBE, ivf.nlist)
+
+    if hasattr(index, "hnsw"):
+        index.hnsw.efSearch = ef_search or settings.FAISS_EF_SEARCH
+
+
+def index_type_of(index: faiss.Index) -> str:
+    """
+    Infer the index type name of an existing FAISS index.
+    """
+
+    if hasattr(index, "hnsw"):
+        return "hnsw"
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf = faiss.downcast_index(ivf)
+        return "ivf_pq" if isinstance(ivf, faiss.IndexIVFPQ) else "ivf_flat"
+
+    return "flat"
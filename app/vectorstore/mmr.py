@@ -0,0 +1,64 @@
+from typing import List
+
+import numpy as np
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Unit-length rows as a contiguous float32 array; zero rows stay zero.
+    """
+
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+
+    return vectors / norms
+
+
+def maximal_marginal_relevance(
+    query: np.ndarray,
+    candidates: np.ndarray,
+    k: int = 4,
+    lambda_mult: float = 0.5,
+) -> List[int]:
+    """
+    Indices of ``k`` candidates chosen by Maximal Marginal Relevance.
+
+    Each step picks the candidate maximising
+    ``lambda_mult * sim(query, c) - (1 - lambda_mult) * max sim(c, selected)``
+    with cosine similarity. All candidate-to-candidate similarities come
+    from one matrix product, and the redundancy term is updated with one
+    row per pick, so the selection loop does O(fetch_k) work per step.
+    Selections match ``langchain``'s ``maximal_marginal_relevance``.
+    """
+
+    num_candidates = len(candidates)
+    k = min(k, num_candidates)
+    if k <= 0:
+        return []
+
+    vectors = normalize_rows(candidates)
+    relevance = vectors @ normalize_rows(query)[0]
+    similarity = vectors @ vectors.T
+
+    first = int(np.argmax(relevance))
+    selected = [first]
+
+    # Highest similarity of each candidate to anything selected so far
+    redundancy = similarity[first].copy()
+    taken = np.zeros(num_candidates, dtype=bool)
+    taken[first] = True
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[taken] = -np.inf
+
+        best = int(np.argmax(scores))
+        selected.append(best)
+        taken[best] = True
+        np.maximum(redundancy, similarity[best], out=redundancy)
+
+    return selected
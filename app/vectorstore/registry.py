@@ -0,0 +1,332 @@
+import re
+import shutil
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.logging import get_logger
+from app.core.exceptions import VectorStoreError
+from app.core.config import settings
+from app.core.metrics import EVENTS
+from app.embeddings.embedder import Embedder
+from app.vectorstore.faiss_store import FAISSStore, persisted_files
+
+logger = get_logger(__name__)
+
+# Collection names become directory names
+COLLECTION_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+
+def persisted_mtime(path: Path) -> Optional[int]:
+    """
+    Modification time of the index saved in ``path``, None if there is none.
+    """
+
+    files = persisted_files(path)
+    if files is None:
+        return None
+
+    try:
+        return files["index"].stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def persisted_footprint(path: Path) -> int:
+    """
+    Bytes a loaded store occupies, estimated from its saved files.
+
+    The FAISS index and the keyword index are held in memory (or mapped)
+    at about their on-disk size; chunk text stays in SQLite.
+    """
+
+    files = persisted_files(path)
+    if files is None:
+        return 0
+
+    total = 0
+    for key in ("index", "bm25"):
+        try:
+            total += files[key].stat().st_size
+        except FileNotFoundError:
+            pass
+    return total
+
+
+@dataclass
+class _Loaded:
+    store: FAISSStore
+    footprint: int
+    mtime: Optional[int]
+
+
+class CollectionRegistry:
+    """
+    Named vector stores, each persisted in its own directory under
+    ``root`` (default ``settings.COLLECTIONS_DIR``).
+
+    A collection is loaded on first use and kept in LRU order. When the
+    loaded stores together exceed ``memory_budget_bytes``, the least
+    recently used ones are unloaded; they are loaded again from disk on
+    their next use. Collections being written to (``lock(name)`` held)
+    are never unloaded.
+    """
+
+    def __init__(
+        self,
+        embedder_factory: Callable[[], Embedder],
+        root: Optional[str | Path] = None,
+        memory_budget_bytes: Optional[int] = None,
+    ) -> None:
+        self._embedder_factory = embedder_factory
+        self.root = Path(
+            root
+            or settings.COLLECTIONS_DIR
+            or Path(settings.VECTOR_STORE_DIR) / "collections"
+        )
+        self.memory_budget_bytes = (
+            settings.COLLECTIONS_MEMORY_BUDGET_MB * 1024 * 1024
+            if memory_budget_bytes is None
+            else memory_budget_bytes
+        )
+
+        self._lock = threading.RLock()
+        # name -> loaded store, least recently used first
+        self._loaded: "OrderedDict[str, _Loaded]" = OrderedDict()
+        # Loading one collection must not block queries on the others
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._write_locks: Dict[str, threading.Lock] = {}
+        self._evict_listeners: List[Callable[[str], None]] = []
+
+    # --------------------------------------------------------
+    # Lookup
+    # --------------------------------------------------------
+
+    def path_for(self, name: str) -> Path:
+        if not COLLECTION_NAME.match(name or ""):
+            raise VectorStoreError(
+                f"Invalid collection name: {name!r} "
+                "(letters, digits, '.', '_' and '-'; at most 64 characters)"
+            )
+        return self.root / name
+
+    def names(self) -> List[str]:
+        """
+        Persisted and loaded collections, sorted by name.
+        """
+
+        persisted = set()
+        if self.root.exists():
+            persisted = {
+                p.name for p in self.root.iterdir()
+                if p.is_dir() and COLLECTION_NAME.match(p.name)
+            }
+
+        with self._lock:
+            return sorted(persisted | set(self._loaded))
+
+    def loaded(self) -> Dict[str, int]:
+        """
+        Loaded collections and their estimated footprint in bytes, least
+        recently used first.
+        """
+
+        with self._lock:
+            return {name: entry.footprint for name, entry in self._loaded.items()}
+
+    @property
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.footprint for entry in self._loaded.values())
+
+    def get(self, name: str, create: bool = False) -> FAISSStore:
+        """
+        The store of collection ``name``, loading it if needed.
+
+        Unknown collections raise VectorStoreError unless ``create``, in
+        which case an empty store is returned; it is persisted on its
+        first save.
+        """
+
+        path = self.path_for(name)
+
+        with self._lock:
+            entry = self._loaded.get(name)
+            if entry is not None:
+                self._loaded.move_to_end(name)
+                EVENTS.inc(event="collection", result="hit")
+                return entry.store
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                entry = self._loaded.get(name)
+                if entry is not None:
+                    self._loaded.move_to_end(name)
+                    return entry.store
+
+            store = FAISSStore(self._embedder_factory(), path=path)
+            mtime = persisted_mtime(path)
+
+            if mtime is not None:
+                store.load()
+            elif not create:
+                raise VectorStoreError(f"Collection not found: {name}")
+
+            entry = _Loaded(store=store, footprint=persisted_footprint(path), mtime=mtime)
+            EVENTS.inc(event="collection", result="load")
+
+            with self._lock:
+                self._loaded[name] = entry
+                evicted = self._pop_over_budget(keep=name)
+
+        self._notify_evicted(evicted)
+
+        logger.info(
+            "Collection loaded | name=%s | sources=%d | bytes=%d | loaded=%d",
+            name,
+            len(store.sources),
+            entry.footprint,
+            len(self._loaded),
+        )
+
+        return store
+
+    def lock(self, name: str) -> threading.Lock:
+        """
+        Serializes multi-step changes to one collection (ingest or
+        remove, then save); held locks also pin the collection in memory.
+        """
+
+        self.path_for(name)
+        with self._lock:
+            return self._write_locks.setdefault(name, threading.Lock())
+
+    # --------------------------------------------------------
+    # Persistence
+    # --------------------------------------------------------
+
+    def refresh(self, name: str, force: bool = False) -> bool:
+        """
+        Reload a loaded collection if another process saved a newer index
+        since it was loaded or saved here. Returns True on reload.
+        """
+
+        if not (force or settings.VECTOR_STORE_AUTO_RELOAD):
+            return False
+
+        with self._lock:
+            entry = self._loaded.get(name)
+        if entry is None:
+            return False
+
+        mtime = persisted_mtime(entry.store.path)
+        if mtime is None or mtime == entry.mtime:
+            return False
+
+        entry.store.load()
+        with self._lock:
+            entry.mtime = mtime
+            entry.footprint = persisted_footprint(entry.store.path)
+            evicted = self._pop_over_budget(keep=name)
+
+        self._notify_evicted(evicted)
+        logger.info("Collection reloaded | name=%s | version=%d", name, entry.store.version)
+        return True
+
+    def save(self, name: str, store: Optional[FAISSStore] = None) -> None:
+        """
+        Persist collection ``name``: ``store`` if given (the object that
+        was changed), otherwise the loaded store.
+        """
+
+        if store is None:
+            store = self.get(name)
+        store.save()
+
+        evicted: List[Tuple[str, _Loaded]] = []
+        with self._lock:
+            entry = self._loaded.get(name)
+            if entry is not None and entry.store is store:
+                # Our own save is not a reason to reload
+                entry.mtime = persisted_mtime(store.path)
+                entry.footprint = persisted_footprint(store.path)
+                evicted = self._pop_over_budget(keep=name)
+
+        self._notify_evicted(evicted)
+
+    # --------------------------------------------------------
+    # Eviction
+    # --------------------------------------------------------
+
+    def on_evict(self, callback: Callable[[str], None]) -> None:
+        """
+        Call ``callback(name)`` whenever a collection is unloaded, so
+        objects built on its store can be dropped too.
+        """
+
+        self._evict_listeners.append(callback)
+
+    def evict(self, name: str) -> bool:
+        with self._lock:
+            entry = self._loaded.pop(name, None)
+        if entry is None:
+            return False
+
+        self._notify_evicted([(name, entry)])
+        return True
+
+    def delete(self, name: str) -> bool:
+        """
+        Unload a collection and remove its directory. Returns False if
+        there was nothing to delete.
+        """
+
+        path = self.path_for(name)
+
+        with self.lock(name):
+            evicted = self.evict(name)
+            if not path.exists():
+                return evicted
+            shutil.rmtree(path)
+
+        logger.info("Collection deleted | name=%s", name)
+        return True
+
+    def _pop_over_budget(self, keep: str) -> List[Tuple[str, _Loaded]]:
+        # Called with self._lock held; listeners run after it is released
+        total = sum(entry.footprint for entry in self._loaded.values())
+        evicted: List[Tuple[str, _Loaded]] = []
+
+        for name in list(self._loaded):
+            if total <= self.memory_budget_bytes:
+                break
+
+            write_lock = self._write_locks.get(name)
+            if name == keep or (write_lock is not None and write_lock.locked()):
+                continue
+
+            entry = self._loaded.pop(name)
+            total -= entry.footprint
+            evicted.append((name, entry))
+
+        if total > self.memory_budget_bytes:
+            logger.warning(
+                "Collections over memory budget | bytes=%d | budget=%d | loaded=%d",
+                total,
+                self.memory_budget_bytes,
+                len(self._loaded),
+            )
+
+        return evicted
+
+    def _notify_evicted(self, evicted: List[Tuple[str, _Loaded]]) -> None:
+        # Requests still holding a store finish on it; it is freed after
+        for name, entry in evicted:
+            for callback in self._evict_listeners:
+                callback(name)
+
+            EVENTS.inc(event="collection", result="evict")
+            logger.info("Collection unloaded | name=%s | bytes=%d", name, entry.footprint)
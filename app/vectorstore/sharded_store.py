@@ -0,0 +1,1029 @@
+"""
+Vector store partitioned by source document across worker processes.
+
+Every chunk of a report lives on one shard, chosen by a hash of its
+source name. Each shard is a ``FAISSStore`` in its own process, either
+started locally by ``ShardedStore`` or running as a shard server on
+another node:
+
+    SHARD_AUTHKEY=<secret> python -m app.vectorstore.sharded_store \
+        --host 10.0.0.5 --port 7001 --path /data/shard-0
+
+Queries are embedded once by the coordinator, searched on all shards in
+parallel and merged into a global top-k; MMR runs over the merged
+candidates, so diversity is judged across shards rather than per shard.
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.core.logging import get_logger, setup_logging
+from app.core.exceptions import VectorStoreError
+from app.core.config import settings
+from app.core.metrics import timed
+from app.embeddings.embedder import Embedder
+from app.vectorstore.bm25_index import reciprocal_rank_fusion
+from app.vectorstore.faiss_store import FAISSStore, SearchHits
+from app.vectorstore.filters import SearchFilter
+from app.vectorstore.mmr import maximal_marginal_relevance
+from app.vectorstore.registry import persisted_mtime
+
+logger = get_logger(__name__)
+
+
+# ============================================================
+# Shard side
+# ============================================================
+
+class VectorOnlyEmbeddings(Embeddings):
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        raise VectorStoreError("Shards only accept precomputed vectors")
+
+    def embed_query(self, text: str) -> List[float]:
+        raise VectorStoreError("Shards only accept precomputed vectors")
+
+
+class VectorOnlyEmbedder:
+    """
+    Stands in for ``Embedder`` inside a shard: queries arrive embedded and
+    documents arrive with their vectors, so no model is loaded per shard.
+    """
+
+    def __init__(self) -> None:
+        self._embedding_model = VectorOnlyEmbeddings()
+
+    def embed_documents(self, documents: List[Document]) -> np.ndarray:
+        raise VectorStoreError("Shards only accept precomputed vectors")
+
+    def embed_query(self, query: str) -> np.ndarray:
+        raise VectorStoreError("Shards only accept precomputed vectors")
+
+
+class _Shard:
+    """
+    One shard's store; the coordinator may call the methods listed in
+    ``_SHARD_METHODS``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        index_type: Optional[str] = None,
+        mmap: Optional[bool] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.index_type = index_type
+        self.mmap = mmap
+        self.store = self._new_store()
+        # Store version last loaded or saved; None forces the next save
+        self._saved_version: Optional[int] = None
+        # Modification time of the files last loaded or saved here
+        self._mtime: Optional[int] = None
+        self.load()
+
+    def _new_store(self) -> FAISSStore:
+        return FAISSStore(VectorOnlyEmbedder(), index_type=self.index_type, path=self.path)
+
+    def reset(self) -> None:
+        version = self.store.version
+        self.store = self._new_store()
+        # Versions never repeat, so coordinators always see the change
+        self.store.version = version + 1
+        self._saved_version = None
+
+    def load(self) -> List[str]:
+        if persisted_mtime(self.path) is not None:
+            self.store.load(mmap=self.mmap)
+        else:
+            self.reset()
+        self._saved_version = self.store.version
+        self._mtime = persisted_mtime(self.path)
+        return self.store.sources
+
+    def refresh(self) -> int:
+        """
+        Reload if another process saved this shard since it was loaded or
+        saved here (the local shards of another coordinator). Returns the
+        store version.
+        """
+
+        mtime = persisted_mtime(self.path)
+        if mtime is not None and mtime != self._mtime:
+            self.load()
+        return self.store.version
+
+    def sources(self) -> List[str]:
+        return self.store.sources
+
+    def add_documents(self, documents: List[Document], embeddings: np.ndarray) -> int:
+        self.store.add_documents(documents, embeddings=embeddings)
+        return len(documents)
+
+    def remove_source(self, source_name: str) -> int:
+        return self.store.remove_source(source_name)
+
+    def export_source(self, source_name: str) -> Tuple[List[Document], np.ndarray]:
+        return self.store.export_source(source_name)
+
+    def save(self) -> bool:
+        """
+        Persist the shard if it changed since it was loaded or saved.
+        Returns True if it was written.
+        """
+
+        version = self.store.version
+        if version == self._saved_version:
+            return False
+
+        # A shard that never received a document has nothing to persist
+        if not self.store.sources and persisted_mtime(self.path) is None:
+            return False
+
+        self.store.save()
+        self._saved_version = version
+        self._mtime = persisted_mtime(self.path)
+        return True
+
+    def search_by_vector(
+        self,
+        vector: np.ndarray,
+        k: int,
+        search_filter: Optional[SearchFilter] = None,
+        with_vectors: bool = False,
+    ) -> SearchHits:
+        return self.store.search_by_vector(vector, k, search_filter, with_vectors)
+
+    def batch_search_by_vector(
+        self,
+        vectors: np.ndarray,
+        k: int,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[SearchHits]:
+        return self.store.batch_search_by_vector(vectors, k, search_filter)
+
+    def keyword_search(
+        self,
+        query: str,
+        k: int,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[Tuple[str, Document, float]]:
+        return self.store.keyword_search(query, k, search_filter)
+
+
+# Everything a coordinator may call on a shard
+_SHARD_METHODS = frozenset({
+    "reset",
+    "load",
+    "refresh",
+    "sources",
+    "add_documents",
+    "remove_source",
+    "export_source",
+    "save",
+    "search_by_vector",
+    "batch_search_by_vector",
+    "keyword_search",
+})
+
+
+def _serve_connection(conn: Connection, shard: _Shard, threads: int) -> None:
+    """
+    Answer (request id, method, args, kwargs) messages until the peer
+    closes the connection. Requests run concurrently and replies may
+    arrive out of order; the request id ties them together.
+    """
+
+    send_lock = threading.Lock()
+
+    def handle(req_id: int, method: str, args: tuple, kwargs: dict) -> None:
+        try:
+            if method not in _SHARD_METHODS:
+                raise VectorStoreError(f"Unknown shard method: {method}")
+            reply = (req_id, True, getattr(shard, method)(*args, **kwargs))
+        except Exception as exc:
+            logger.error("Shard request failed | method=%s", method, exc_info=True)
+            reply = (req_id, False, f"{type(exc).__name__}: {exc}")
+
+        with send_lock:
+            conn.send(reply)
+
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix="shard") as pool:
+        while True:
+            try:
+                request = conn.recv()
+            except (EOFError, OSError):
+                break
+            if request is None:
+                break
+            pool.submit(handle, *request)
+
+
+def _run_shard_process(
+    conn: Connection,
+    path: str,
+    index_type: Optional[str],
+    mmap: Optional[bool],
+    threads: int,
+) -> None:
+    setup_logging()
+    try:
+        _serve_connection(conn, _Shard(path, index_type, mmap), threads)
+    finally:
+        conn.close()
+
+
+def serve_shard(
+    address: Tuple[str, int],
+    path: str,
+    authkey: Optional[str] = None,
+    threads: Optional[int] = None,
+) -> None:
+    """
+    Serve one shard to ``ShardedStore`` coordinators on other nodes.
+
+    Connections are authenticated with ``authkey`` (default
+    ``settings.SHARD_AUTHKEY``), which must be set: requests are
+    unpickled, so anyone holding the key can run code on this node.
+    """
+
+    authkey = authkey or settings.SHARD_AUTHKEY
+    if not authkey:
+        raise VectorStoreError("Refusing to serve a shard without SHARD_AUTHKEY")
+
+    shard = _Shard(path)
+
+    with Listener(address, authkey=authkey.encode("utf-8")) as listener:
+        logger.info(
+            "Shard server listening | address=%s:%d | path=%s | sources=%d",
+            address[0],
+            address[1],
+            path,
+            len(shard.sources()),
+        )
+
+        while True:
+            conn = listener.accept()
+            threading.Thread(
+                target=_serve_connection,
+                args=(conn, shard, threads or settings.SHARD_THREADS),
+                daemon=True,
+            ).start()
+
+
+# ============================================================
+# Coordinator side
+# ============================================================
+
+class _ShardClient:
+    """
+    Connection to one shard. Calls return futures, so a query can be sent
+    to every shard before waiting on any of them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        conn: Connection,
+        process: Optional[multiprocessing.Process] = None,
+    ) -> None:
+        self.name = name
+        self._conn = conn
+        self._process = process
+        self._send_lock = threading.Lock()
+        self._pending: Dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._closed = False
+
+        self._reader = threading.Thread(
+            target=self._read_replies,
+            name=f"{name}-reader",
+            daemon=True,
+        )
+        self._reader.start()
+
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        future: Future = Future()
+        req_id = next(self._ids)
+        self._pending[req_id] = future
+
+        try:
+            if self._closed:
+                raise OSError("connection closed")
+            with self._send_lock:
+                self._conn.send((req_id, method, args, kwargs))
+        except (OSError, ValueError) as exc:
+            self._pending.pop(req_id, None)
+            raise VectorStoreError(f"Shard unavailable: {self.name}") from exc
+
+        return future
+
+    def _read_replies(self) -> None:
+        while True:
+            try:
+                req_id, ok, payload = self._conn.recv()
+            except (EOFError, OSError):
+                break
+
+            future = self._pending.pop(req_id, None)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(VectorStoreError(f"{self.name}: {payload}"))
+
+        self._closed = True
+        for req_id in list(self._pending):
+            future = self._pending.pop(req_id, None)
+            if future is not None:
+                future.set_exception(VectorStoreError(f"Shard connection closed: {self.name}"))
+
+    def close(self) -> None:
+        try:
+            with self._send_lock:
+                self._conn.send(None)
+        except (OSError, ValueError):
+            pass
+
+        if self._process is not None:
+            self._process.join(timeout=10)
+            if self._process.is_alive():
+                self._process.terminate()
+
+        self._conn.close()
+
+
+def _results(futures: Sequence[Future], timeout: float) -> List:
+    """
+    Results of shard calls sent in parallel, waiting at most ``timeout``
+    seconds in total, so one hung shard cannot block the caller forever.
+    """
+
+    deadline = time.monotonic() + timeout
+    results = []
+
+    for future in futures:
+        try:
+            results.append(future.result(timeout=max(0.0, deadline - time.monotonic())))
+        except FutureTimeout as exc:
+            raise VectorStoreError(f"No reply from shard within {timeout:g}s") from exc
+
+    return results
+
+
+def _parse_addresses(value: str) -> List[Tuple[str, int]]:
+    addresses = []
+    for item in value.split(","):
+        if item.strip():
+            host, _, port = item.strip().rpartition(":")
+            addresses.append((host or "localhost", int(port)))
+    return addresses
+
+
+def _merge_hits(hits: Sequence[SearchHits], k: int) -> SearchHits:
+    """
+    Global top-k by distance over per-shard results.
+    """
+
+    hits = [h for h in hits if h.ids]
+    if not hits:
+        return SearchHits(ids=[], documents=[], distances=np.empty(0, dtype=np.float32))
+
+    distances = np.concatenate([h.distances for h in hits])
+    order = np.argsort(distances, kind="stable")[:k]
+
+    ids = [doc_id for h in hits for doc_id in h.ids]
+    documents = [doc for h in hits for doc in h.documents]
+    vectors = (
+        np.vstack([h.vectors for h in hits])[order]
+        if all(h.vectors is not None for h in hits)
+        else None
+    )
+
+    return SearchHits(
+        ids=[ids[i] for i in order],
+        documents=[documents[i] for i in order],
+        distances=distances[order],
+        vectors=vectors,
+    )
+
+
+def _fuse_hits(
+    dense: SearchHits,
+    keyword: Sequence[Sequence[Tuple[str, Document, float]]],
+    k: int,
+    fetch_k: int,
+    rrf_k: int,
+) -> List[Document]:
+    """
+    Reciprocal rank fusion of merged dense hits and per-shard BM25 hits.
+    """
+
+    keyword_hits = sorted(
+        (hit for hits in keyword for hit in hits),
+        key=lambda hit: hit[2],
+        reverse=True,
+    )[:fetch_k]
+
+    documents = dict(zip(dense.ids, dense.documents))
+    documents.update((doc_id, doc) for doc_id, doc, _ in keyword_hits)
+
+    fused = reciprocal_rank_fusion(
+        [dense.ids, [doc_id for doc_id, _, _ in keyword_hits]],
+        k=rrf_k,
+    )
+
+    return [documents[doc_id] for doc_id in fused[:k]]
+
+
+class ShardedStore:
+    """
+    ``FAISSStore``-compatible store whose chunks are partitioned by source
+    over several shards, so the corpus can outgrow one process.
+
+    Without ``addresses`` (default ``settings.SHARD_ADDRESSES``) it starts
+    ``num_shards`` local worker processes persisting to
+    ``root/shard-<i>``; otherwise it connects to shard servers started
+    with ``serve_shard``. Searches restricted to some sources only go to
+    the shards holding them.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder,
+        num_shards: Optional[int] = None,
+        root: Optional[str | Path] = None,
+        addresses: Optional[List[Tuple[str, int]]] = None,
+        index_type: Optional[str] = None,
+    ) -> None:
+        self._embedder = embedder
+        self.path = Path(
+            root or settings.SHARD_DIR or Path(settings.VECTOR_STORE_DIR) / "shards"
+        )
+
+        if addresses is None:
+            addresses = _parse_addresses(settings.SHARD_ADDRESSES)
+
+        if addresses:
+            if not settings.SHARD_AUTHKEY:
+                raise VectorStoreError("SHARD_AUTHKEY is required to connect to shard servers")
+            authkey = settings.SHARD_AUTHKEY.encode("utf-8")
+            self._shards = [
+                _ShardClient(f"shard-{host}:{port}", Client((host, port), authkey=authkey))
+                for host, port in addresses
+            ]
+        else:
+            self._shards = self._start_local(
+                num_shards or settings.SHARD_COUNT,
+                index_type,
+            )
+
+        # source file name -> shard number
+        self._source_shard: Dict[str, int] = {}
+        self._write_lock = threading.Lock()
+        # Bumped on every change, here or (seen by refresh) elsewhere
+        self.version = 0
+        # Shard store versions at the last refresh
+        self._shard_versions: Tuple[int, ...] = ()
+
+        self.refresh()
+
+        logger.info(
+            "Sharded store ready | shards=%d | sources=%d",
+            len(self._shards),
+            len(self._source_shard),
+        )
+
+    def _start_local(self, num_shards: int, index_type: Optional[str]) -> List[_ShardClient]:
+        # spawn: FAISS and torch thread pools do not survive fork
+        context = multiprocessing.get_context("spawn")
+        shards = []
+
+        for i in range(num_shards):
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_run_shard_process,
+                args=(
+                    child_conn,
+                    str(self.path / f"shard-{i}"),
+                    index_type,
+                    settings.VECTOR_STORE_MMAP,
+                    settings.SHARD_THREADS,
+                ),
+                name=f"shard-{i}",
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            shards.append(_ShardClient(f"shard-{i}", parent_conn, process))
+
+        return shards
+
+    def close(self) -> None:
+        for shard in self._shards:
+            shard.close()
+
+    def __enter__(self) -> "ShardedStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def embedder(self) -> Embedder:
+        return self._embedder
+
+    @property
+    def num_shards(self) -> int:
+        return len(self._shards)
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._source_shard)
+
+    def shard_for(self, source_name: str) -> int:
+        shard = self._source_shard.get(source_name)
+        if shard is None:
+            shard = zlib.crc32(source_name.encode("utf-8")) % len(self._shards)
+        return shard
+
+    # --------------------------------------------------------
+    # Fan-out
+    # --------------------------------------------------------
+
+    def _call(
+        self,
+        shards: Sequence[int],
+        method: str,
+        *args,
+        timeout: Optional[float] = None,
+        **kwargs,
+    ) -> List:
+        """
+        Send one request to each shard, then wait for all replies, at
+        most ``timeout`` seconds (default ``settings.SHARD_TIMEOUT_S``).
+        """
+
+        futures = [self._shards[i].submit(method, *args, **kwargs) for i in shards]
+        return _results(futures, timeout or settings.SHARD_TIMEOUT_S)
+
+    def _shards_for(self, search_filter: Optional[SearchFilter]) -> List[int]:
+        if search_filter is None or search_filter.sources is None:
+            return list(range(len(self._shards)))
+        return sorted({
+            self._source_shard[source]
+            for source in search_filter.sources
+            if source in self._source_shard
+        })
+
+    def _refresh_sources(self) -> None:
+        self._source_shard = {
+            source: shard
+            for shard, sources in enumerate(
+                # Shards may still be loading their indexes
+                self._call(
+                    range(len(self._shards)),
+                    "sources",
+                    timeout=settings.SHARD_WRITE_TIMEOUT_S,
+                )
+            )
+            for source in sources
+        }
+
+    # --------------------------------------------------------
+    # Changes and persistence
+    # --------------------------------------------------------
+
+    def build(
+        self,
+        documents: List[Document],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Replace the contents of every shard with ``documents``.
+        """
+
+        if not documents:
+            raise VectorStoreError("No documents provided for indexing")
+
+        with self._write_lock:
+            self._call(range(len(self._shards)), "reset", timeout=settings.SHARD_WRITE_TIMEOUT_S)
+            self._source_shard = {}
+            self._add(documents, embeddings)
+
+    def add_documents(
+        self,
+        documents: List[Document],
+        embeddings: Optional[np.ndarray] = None,
+    ) -> None:
+        if not documents:
+            raise VectorStoreError("No documents provided for indexing")
+
+        with self._write_lock:
+            self._add(documents, embeddings)
+
+    def _add(self, documents: List[Document], embeddings: Optional[np.ndarray]) -> None:
+        if embeddings is None:
+            embeddings = self._embedder.embed_documents(documents)
+
+        vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(documents):
+            raise VectorStoreError(
+                "Number of embeddings does not match number of documents"
+            )
+
+        by_shard: Dict[int, List[int]] = {}
+        for i, doc in enumerate(documents):
+            shard = self.shard_for(doc.metadata.get("source") or "")
+            by_shard.setdefault(shard, []).append(i)
+
+        logger.info(
+            "Adding documents to shards | documents=%d | shards=%d",
+            len(documents),
+            len(by_shard),
+        )
+
+        with timed("index_add"):
+            futures = [
+                self._shards[shard].submit(
+                    "add_documents",
+                    [documents[i] for i in rows],
+                    vectors[rows],
+                )
+                for shard, rows in by_shard.items()
+            ]
+            _results(futures, settings.SHARD_WRITE_TIMEOUT_S)
+
+        for shard, rows in by_shard.items():
+            for i in rows:
+                self._source_shard[documents[i].metadata.get("source") or ""] = shard
+        self.version += 1
+
+    def remove_source(self, source_name: str) -> int:
+        with self._write_lock:
+            shard = self._source_shard.get(source_name)
+            if shard is None:
+                raise VectorStoreError(f"Source not found in index: {source_name}")
+
+            removed = _results(
+                [self._shards[shard].submit("remove_source", source_name)],
+                settings.SHARD_WRITE_TIMEOUT_S,
+            )[0]
+            del self._source_shard[source_name]
+            self.version += 1
+
+        return removed
+
+    def export_source(self, source_name: str) -> Tuple[List[Document], np.ndarray]:
+        shard = self._source_shard.get(source_name)
+        if shard is None:
+            raise VectorStoreError(f"Source not found in index: {source_name}")
+
+        return _results(
+            [self._shards[shard].submit("export_source", source_name)],
+            settings.SHARD_WRITE_TIMEOUT_S,
+        )[0]
+
+    def save(self) -> None:
+        # Shards skip the write when nothing changed on them
+        written = self._call(
+            range(len(self._shards)),
+            "save",
+            timeout=settings.SHARD_WRITE_TIMEOUT_S,
+        )
+        logger.info(
+            "Sharded store saved | shards=%d | written=%d",
+            len(self._shards),
+            sum(written),
+        )
+
+    def refresh(self) -> bool:
+        """
+        Pick up changes made through other coordinators: shards reload
+        indexes that other processes saved, and the source map follows
+        the shards. Returns True if any shard changed since the last
+        refresh (changes made here count once more).
+
+        Skipped while a change through this coordinator is in progress,
+        so queries never wait for an ingest.
+        """
+
+        if not self._write_lock.acquire(blocking=False):
+            return False
+
+        try:
+            versions = tuple(self._call(
+                range(len(self._shards)),
+                "refresh",
+                timeout=settings.SHARD_WRITE_TIMEOUT_S,
+            ))
+            if versions == self._shard_versions:
+                return False
+
+            self._shard_versions = versions
+            self._refresh_sources()
+            self.version += 1
+        finally:
+            self._write_lock.release()
+
+        logger.info(
+            "Sharded store refreshed | sources=%d | version=%d",
+            len(self._source_shard),
+            self.version,
+        )
+        return True
+
+    def load(self) -> None:
+        with self._write_lock:
+            self._call(range(len(self._shards)), "load", timeout=settings.SHARD_WRITE_TIMEOUT_S)
+            self._refresh_sources()
+            self.version += 1
+
+    # --------------------------------------------------------
+    # Search
+    # --------------------------------------------------------
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[Document]:
+        logger.info(
+            "Sharded similarity search | k=%d | filter=%s | query='%s'",
+            k,
+            search_filter,
+            query,
+        )
+
+        try:
+            with timed("search_similarity"):
+                vector = self._embedder.embed_query(query)
+                hits = self._call(
+                    self._shards_for(search_filter),
+                    "search_by_vector",
+                    vector,
+                    k,
+                    search_filter,
+                )
+                return _merge_hits(hits, k).documents
+        except Exception as exc:
+            logger.error(
+                "Sharded similarity search failed",
+                exc_info=True,
+            )
+            raise VectorStoreError("Similarity search failed") from exc
+
+    def batch_similarity_search(
+        self,
+        queries: List[str],
+        k: int = 4,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[List[Document]]:
+        """
+        One embedding call, then one batched search per shard; results
+        are merged per query and returned in query order.
+        """
+
+        if not queries:
+            return []
+
+        logger.info(
+            "Sharded batch similarity search | queries=%d | k=%d | filter=%s",
+            len(queries),
+            k,
+            search_filter,
+        )
+
+        try:
+            with timed("search_similarity_batch"):
+                vectors = self._embedder.embed_queries(queries)
+                per_shard = self._call(
+                    self._shards_for(search_filter),
+                    "batch_search_by_vector",
+                    vectors,
+                    k,
+                    search_filter,
+                )
+                return [
+                    _merge_hits([hits[i] for hits in per_shard], k).documents
+                    for i in range(len(queries))
+                ]
+        except Exception as exc:
+            logger.error(
+                "Sharded batch similarity search failed",
+                exc_info=True,
+            )
+            raise VectorStoreError("Batch similarity search failed") from exc
+
+    def mmr_search(
+        self,
+        query: str,
+        k: int = 6,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[Document]:
+        """
+        MMR over the global ``fetch_k`` nearest chunks of all shards.
+        """
+
+        logger.info(
+            "Sharded MMR search | k=%d | fetch_k=%d | lambda=%s | filter=%s",
+            k,
+            fetch_k,
+            lambda_mult,
+            search_filter,
+        )
+
+        try:
+            with timed("search_mmr"):
+                vector = np.asarray(self._embedder.embed_query(query), dtype=np.float32)
+                hits = _merge_hits(
+                    self._call(
+                        self._shards_for(search_filter),
+                        "search_by_vector",
+                        vector,
+                        fetch_k,
+                        search_filter,
+                        with_vectors=True,
+                    ),
+                    fetch_k,
+                )
+
+                if not hits.ids:
+                    return []
+
+                selected = maximal_marginal_relevance(
+                    vector,
+                    hits.vectors,
+                    k=k,
+                    lambda_mult=lambda_mult,
+                )
+
+                return [hits.documents[i] for i in selected]
+        except Exception as exc:
+            logger.error(
+                "Sharded MMR search failed",
+                exc_info=True,
+            )
+            raise VectorStoreError("MMR search failed") from exc
+
+    def hybrid_search(
+        self,
+        query: str,
+        k: int = 4,
+        fetch_k: int = 20,
+        rrf_k: int = 60,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[Document]:
+        """
+        Reciprocal rank fusion of the merged dense and keyword rankings.
+
+        BM25 statistics are per shard, so keyword scores are comparable
+        across shards only approximately; ranks within each shard are exact.
+        """
+
+        logger.info(
+            "Sharded hybrid search | k=%d | fetch_k=%d | filter=%s | query='%s'",
+            k,
+            fetch_k,
+            search_filter,
+            query,
+        )
+
+        shards = self._shards_for(search_filter)
+
+        try:
+            vector = self._embedder.embed_query(query)
+
+            dense_futures = [
+                self._shards[i].submit("search_by_vector", vector, fetch_k, search_filter)
+                for i in shards
+            ]
+            keyword_futures = [
+                self._shards[i].submit("keyword_search", query, fetch_k, search_filter)
+                for i in shards
+            ]
+
+            with timed("search_dense"):
+                dense = _merge_hits(
+                    _results(dense_futures, settings.SHARD_TIMEOUT_S),
+                    fetch_k,
+                )
+
+            with timed("search_keyword"):
+                keyword = _results(keyword_futures, settings.SHARD_TIMEOUT_S)
+
+            return _fuse_hits(dense, keyword, k, fetch_k, rrf_k)
+        except Exception as exc:
+            logger.error(
+                "Sharded hybrid search failed",
+                exc_info=True,
+            )
+            raise VectorStoreError("Hybrid search failed") from exc
+
+    def batch_hybrid_search(
+        self,
+        queries: List[str],
+        k: int = 4,
+        fetch_k: int = 20,
+        rrf_k: int = 60,
+        search_filter: Optional[SearchFilter] = None,
+    ) -> List[List[Document]]:
+        """
+        ``hybrid_search`` for many queries: one embedding call and one
+        batched dense search per shard, with the per-query keyword
+        searches running alongside. Results are in query order.
+        """
+
+        if not queries:
+            return []
+
+        logger.info(
+            "Sharded batch hybrid search | queries=%d | k=%d | fetch_k=%d | filter=%s",
+            len(queries),
+            k,
+            fetch_k,
+            search_filter,
+        )
+
+        shards = self._shards_for(search_filter)
+
+        try:
+            vectors = self._embedder.embed_queries(queries)
+
+            dense_futures = [
+                self._shards[i].submit("batch_search_by_vector", vectors, fetch_k, search_filter)
+                for i in shards
+            ]
+            keyword_futures = [
+                [
+                    self._shards[i].submit("keyword_search", query, fetch_k, search_filter)
+                    for i in shards
+                ]
+                for query in queries
+            ]
+
+            with timed("search_dense_batch"):
+                per_shard = _results(dense_futures, settings.SHARD_TIMEOUT_S)
+
+            with timed("search_keyword"):
+                flat = _results(
+                    [f for futures in keyword_futures for f in futures],
+                    settings.SHARD_TIMEOUT_S,
+                )
+                keyword = [
+                    flat[i * len(shards):(i + 1) * len(shards)]
+                    for i in range(len(queries))
+                ]
+
+            return [
+                _fuse_hits(
+                    _merge_hits([hits[i] for hits in per_shard], fetch_k),
+                    keyword[i],
+                    k,
+                    fetch_k,
+                    rrf_k,
+                )
+                for i in range(len(queries))
+            ]
+        except Exception as exc:
+            logger.error(
+                "Sharded batch hybrid search failed",
+                exc_info=True,
+            )
+            raise VectorStoreError("Batch hybrid search failed") from exc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve one vector store shard")
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Interface to listen on; expose it only on a trusted network",
+    )
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--path", required=True, help="Directory the shard persists to")
+    args = parser.parse_args()
+
+    setup_logging()
+    serve_shard((args.host, args.port), args.path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+
+from langchain_core.documents import Document
+from langchain_community.docstore.base import AddableMixin, Docstore
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    doc_id   TEXT PRIMARY KEY,
+    source   TEXT,
+    page     INTEGER,
+    category TEXT,
+    text     TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS index_map (
+    position INTEGER PRIMARY KEY,
+    doc_id   TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS chunks_source ON chunks (source);
+"""
+
+
+class SQLiteDocstore(Docstore, AddableMixin):
+    """
+    LangChain docstore backed by a SQLite file.
+
+    Chunk text and metadata are read per lookup instead of unpickling the
+    whole corpus into memory, so opening a large store is cheap and the
+    OS page cache is shared between processes reading the same file.
+    ``source``, ``page`` and ``category`` are kept as plain columns for
+    cheap metadata scans.
+    """
+
+    def __init__(self, path: Union[str, Path], read_only: bool = False) -> None:
+        self.path = Path(path)
+
+        if read_only:
+            uri = f"file:{self.path.resolve().as_posix()}?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.executescript(SCHEMA)
+
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------------
+    # Docstore interface
+    # --------------------------------------------------------
+
+    def search(self, search: str) -> Union[str, Document]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, metadata FROM chunks WHERE doc_id = ?",
+                (search,),
+            ).fetchone()
+
+        if row is None:
+            return f"ID {search} not found."
+
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?)",
+                (_row(doc_id, doc) for doc_id, doc in texts.items()),
+            )
+
+    def delete(self, ids: List) -> None:
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM chunks WHERE doc_id = ?",
+                ((doc_id,) for doc_id in ids),
+            )
+
+    # --------------------------------------------------------
+    # Store-level helpers
+    # --------------------------------------------------------
+
+    def load_index_map(self) -> Dict[int, str]:
+        """
+        Return the FAISS position -> doc_id mapping.
+        """
+
+        with self._lock:
+            return dict(
+                self._conn.execute("SELECT position, doc_id FROM index_map")
+            )
+
+    def iter_metadata(self) -> Iterator[Tuple[str, str, int, str]]:
+        """
+        Yield (doc_id, source, page, category) without reading chunk text.
+        """
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc_id, source, page, category FROM chunks"
+            ).fetchall()
+
+        yield from rows
+
+    def iter_documents(self) -> Iterator[Tuple[str, Document]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT doc_id, text, metadata FROM chunks"
+            ).fetchall()
+
+        for doc_id, text, metadata in rows:
+            yield doc_id, Document(page_content=text, metadata=json.loads(metadata))
+
+    def close(self) -> None:
+        self._conn.close()
+
+    @classmethod
+    def write(
+        cls,
+        path: Union[str, Path],
+        index_to_docstore_id: Dict[int, str],
+        docstore: Docstore,
+    ) -> None:
+        """
+        Write a complete docstore file atomically.
+
+        The file is built next to ``path`` and moved into place, so readers
+        of the previous version keep a consistent view.
+        """
+
+        path = Path(path)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.unlink(missing_ok=True)
+
+        try:
+            conn = sqlite3.connect(str(tmp_path))
+            try:
+                conn.executescript(SCHEMA)
+                with conn:
+                    conn.executemany(
+                        "INSERT INTO index_map VALUES (?, ?)",
+                        index_to_docstore_id.items(),
+                    )
+                    conn.executemany(
+                        "INSERT INTO chunks VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            _row(doc_id, docstore.search(doc_id))
+                            for doc_id in index_to_docstore_id.values()
+                        ),
+                    )
+            finally:
+                conn.close()
+
+            os.replace(tmp_path, path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+
+def _row(doc_id: str, doc: Document) -> Tuple:
+    metadata = doc.metadata
+    return (
+        doc_id,
+        metadata.get("source"),
+        metadata.get("page"),
+        metadata.get("category"),
+        doc.page_content,
+        json.dumps(metadata),
+    )